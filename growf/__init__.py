@@ -0,0 +1,17 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+# The growth simulation, importable without Blender:
+#   from growf import Tree
+#   t = Tree(seed_r="GrowF")
+#   t.plant(growth_steps=30)
+# Tree.show() and Tree.make_skeleton() load the Blender adapter (growf.blender) on first use.
+
+from .vector import Vector, Quaternion, Color, BACKEND
+from .core import (
+    GrowthRandom, Param, Schedule, ScheduledParam, DNA, Cell, Slice, Settling, Tip, Shoot, Root, Tree,
+    Hormone, Auxin, Cytokinin, Gibberellins, Ethylene,
+    prng, p_log, p_log_r, p_rat, p_none, p_sin1, p_sin, p_square, p_square_y, p_sin2, p_cos1, p_cos,
+    p_spike, p_spike_y, p_bump, p_bump_y, p_rlog, p_tanh, p_tanh_r, p_random, p_random_int, p_lin, p_lin_r,
+    p_tuple_next, p_tuple_first, rot_q, WAVES, register_wave,
+)
@@ -0,0 +1,71 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+# Batch growing of many organisms across a process pool
+# A job is a (DNA, namespace, steps) tuple, DNA may be None for the default organism of Tree.begin.
+# Every job is grown from a private copy of its DNA (Tree.begin copies the Params it advances) and a Tree seeded with its
+# namespace, in the worker process that runs it, so the result of a job is bit-identical to growing it serially.
+#
+#   from growf.batch import grow_batch
+#   stats = grow_batch([(None, "GrowF-%d" % i, 30) for i in range(1000)])
+#   stats = grow_batch(jobs, trace=True)                # every stats dict also gets its growth trace
+#   totals = growf.trace.aggregate([s["trace"] for s in stats])
+
+import functools
+from concurrent.futures import ProcessPoolExecutor
+
+from .core import Tree
+from .trace import Tracer
+
+def grow_tree(job, engine=False, settling=None, trace=False):
+    dna, namespace, steps = job
+    t = Tree(name=namespace, seed_r=namespace, engine=engine, settling=settling)
+    if dna is not None:
+        t.set_dna(dna)
+    if trace:
+        Tracer(t)
+    t.plant(growth_steps=steps)
+    return t
+
+def tree_stats(t):
+    # compact summary of a grown tree, plain Python values so it is cheap to send between processes
+    cells, slices = 0, 0
+    lo, hi = [float("inf")] * 3, [float("-inf")] * 3
+    for tip in t.tips:
+        slices += len(tip.branch)
+        cells += sum(len(slc) for slc in tip.branch)
+        for k, x in enumerate(tip.loc):
+            lo[k], hi[k] = min(lo[k], x), max(hi[k], x)
+    return {
+        "namespace": t.random_seed,
+        "age": t.age,
+        "tips": len(t.tips),
+        "slices": slices,
+        "cells": cells,
+        "bounds": (tuple(lo), tuple(hi)),   # of the tip positions
+    }
+
+def grow_job(job, output="stats", engine=False, settling=None, trace=False):
+    # output: "stats" for tree_stats, "mesh" for growf.mesh.MeshBuffers (numpy arrays, no loose tip vertices)
+    # trace: add the Tracer records of the growth to the stats under "trace"
+    if trace and output != "stats":
+        raise ValueError("batch traces come with output=\"stats\"")
+    t = grow_tree(job, engine=engine, settling=settling, trace=trace)
+    if output == "mesh":
+        from .mesh import mesh_buffers
+        return mesh_buffers(t, tip_verts=False)
+    if output == "stats":
+        stats = tree_stats(t)
+        if trace:
+            stats["trace"] = t.tracer.records
+        return stats
+    raise ValueError("unknown batch output: %r" % (output,))
+
+def grow_batch(jobs, workers=None, output="stats", engine=False, settling=None, chunksize=1, trace=False):
+    # Results come back in job order. workers=None uses one process per core, workers=0 grows in this process.
+    # Every Tree owns its random generator (seeded with the namespace), jobs never share one.
+    run = functools.partial(grow_job, output=output, engine=engine, settling=settling, trace=trace)
+    if workers == 0:
+        return [run(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run, jobs, chunksize=chunksize))
@@ -0,0 +1,196 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+# Benchmarks for the growth loop, the mesher and memory, over a sweep of tree sizes
+#
+#   python -m growf.bench --steps 10 20 40 --cell-res 8 16 --bifurcations 1 2 --out bench.json
+#   python -m growf.bench --save-baseline base.json        # on the reference build
+#   python -m growf.bench --baseline base.json             # later, exits with 1 when a phase got slower
+#
+# Every case grows in a fresh worker process, so its peak RSS is its own. Phases are timed separately:
+# begin (DNA and first Shoot), grow (Tree.grow), mesh (growf.mesh.mesh_buffers) and show (Tree.show, inside Blender only).
+# A case changes the default DNA of Tree.begin in three places: cell resolution, branches per bifurcation and the
+# steps between bifurcations (0 keeps the DNA's own schedule for the last two).
+
+import sys
+import json
+import time
+import argparse
+import platform
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+from .core import Tree, Param
+from .vector import BACKEND
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+PHASES = ("begin", "grow", "mesh", "show")
+
+def peak_rss_kb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss     # bytes on macOS, kilobytes elsewhere
+
+def case_key(case):
+    return (case["steps"], case["cell_res"], case["bifurcations"], case["period"], case["engine"], case["compiled"])
+
+def make_tree(case):
+    t = Tree(name="Bench", seed_r=case["seed"], engine=case["engine"], compiled=case["compiled"])
+    t.init_dna()    # fills in the default genome, begin() grows from what is changed here
+    cell = list(t.genome.get("cell"))
+    cell[1] = Param(case["cell_res"])
+    t.genome.put("cell", tuple(cell))
+    branch = list(t.genome.get("branch"))
+    if case["period"]:
+        branch[0] = Param(case["period"])
+    if case["bifurcations"]:
+        branch[1] = Param(case["bifurcations"])
+    t.genome.put("branch", tuple(branch))
+    return t
+
+def run_case(case):
+    best = None
+    for r in range(case["repeat"]):
+        t = make_tree(case)
+        phases = {}
+        s = time.perf_counter()
+        t.rng.seed(a=t.random_seed, version=2)     # what Tree.plant does, split into its phases
+        t.begin()
+        phases["begin"] = time.perf_counter() - s
+        s = time.perf_counter()
+        t.grow(steps=case["steps"])
+        phases["grow"] = time.perf_counter() - s
+        try:
+            from .mesh import mesh_buffers
+        except ImportError:
+            mesh_buffers = None
+        if mesh_buffers is not None:
+            s = time.perf_counter()
+            mesh_buffers(t)
+            phases["mesh"] = time.perf_counter() - s
+        if "bpy" in sys.modules:
+            s = time.perf_counter()
+            t.show()
+            phases["show"] = time.perf_counter() - s
+        if best is None:
+            best = phases
+        else:
+            best = {k: min(v, best[k]) for k, v in phases.items()}
+
+    slices = [slc for tip in t.tips for slc in tip.branch]
+    cell_steps = sum(slc.age * len(slc) for slc in slices)  # Cell.grow calls (or engine rows stepped)
+    grow = max(best["grow"], 1e-9)
+    result = dict(case)
+    result.update({
+        "phases": best,
+        "tips": len(t.tips),
+        "slices": len(slices),
+        "cells": sum(len(slc) for slc in slices),
+        "cell_steps": cell_steps,
+        "steps_per_s": case["steps"] / grow,
+        "cells_per_s": cell_steps / grow,
+        "peak_rss_kb": peak_rss_kb(),
+    })
+    return result
+
+def sweep(steps=(10, 20), cell_res=(16,), bifurcations=(0,), period=(0,), engine=False, compiled=False, seed="GrowF", repeat=1, isolate=True, log=None):
+    cases = [
+        {"steps": st, "cell_res": cr, "bifurcations": bf, "period": pd, "engine": engine, "compiled": compiled, "seed": seed, "repeat": repeat}
+        for st, cr, bf, pd in itertools.product(steps, cell_res, bifurcations, period)
+    ]
+    results = []
+    for case in cases:
+        if isolate:
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                r = pool.submit(run_case, case).result()
+        else:
+            r = run_case(case)
+        if log is not None:
+            log(format_result(r))
+        results.append(r)
+    return results
+
+def environment():
+    try:
+        import numpy
+        np_version = numpy.__version__
+    except ImportError:
+        np_version = None
+    return {"python": platform.python_version(), "machine": platform.machine(), "vector_backend": BACKEND, "numpy": np_version}
+
+def format_result(r):
+    phases = " ".join("%s %.3fs" % (k, r["phases"][k]) for k in PHASES if k in r["phases"])
+    return "steps %3d  cell_res %3d  bifurc %d/%d  tips %5d  cells %8d  %7.1f steps/s  %10.0f cells/s  rss %s kB  %s" % (
+        r["steps"], r["cell_res"], r["bifurcations"], r["period"], r["tips"], r["cells"],
+        r["steps_per_s"], r["cells_per_s"], r["peak_rss_kb"], phases)
+
+def compare(results, baseline, tolerance=0.2):
+    # [(case key, phase or "peak_rss_kb", old, new)] of everything more than tolerance (0.2 = 20%) worse than the baseline
+    # timings below a millisecond are too noisy to compare and skipped
+    old = {case_key(r): r for r in baseline["results"]}
+    worse = []
+    for r in results:
+        b = old.get(case_key(r))
+        if b is None:
+            continue
+        for k in PHASES:
+            if k in r["phases"] and k in b["phases"] and b["phases"][k] >= 1e-3:
+                if r["phases"][k] > b["phases"][k] * (1 + tolerance):
+                    worse.append((case_key(r), k, b["phases"][k], r["phases"][k]))
+        if r["peak_rss_kb"] and b.get("peak_rss_kb") and r["peak_rss_kb"] > b["peak_rss_kb"] * (1 + tolerance):
+            worse.append((case_key(r), "peak_rss_kb", b["peak_rss_kb"], r["peak_rss_kb"]))
+    return worse
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m growf.bench", description="Benchmark GrowF growth, meshing and memory")
+    ap.add_argument("--steps", type=int, nargs="+", default=[10, 20])
+    ap.add_argument("--cell-res", type=int, nargs="+", default=[16])
+    ap.add_argument("--bifurcations", type=int, nargs="+", default=[0], help="branches per bifurcation, 0 keeps the DNA default")
+    ap.add_argument("--period", type=int, nargs="+", default=[0], help="steps between bifurcations, 0 keeps the DNA default")
+    ap.add_argument("--engine", action="store_true", help="grow cells with the NumPy CellEngine")
+    ap.add_argument("--compiled", action="store_true", help="use compiled Param schedules")
+    ap.add_argument("--seed", default="GrowF")
+    ap.add_argument("--repeat", type=int, default=1, help="runs per case, the fastest time of each phase is kept")
+    ap.add_argument("--inline", action="store_true", help="run every case in this process (peak RSS is then cumulative)")
+    ap.add_argument("--out", help="write the JSON report here (default: stdout)")
+    ap.add_argument("--baseline", help="JSON report to compare against")
+    ap.add_argument("--save-baseline", help="also write the report here as the new baseline")
+    ap.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown against the baseline (0.2 = 20%%)")
+    args = ap.parse_args(argv)
+
+    log = lambda line: print(line, file=sys.stderr)
+    results = sweep(steps=args.steps, cell_res=args.cell_res, bifurcations=args.bifurcations, period=args.period,
+                    engine=args.engine, compiled=args.compiled, seed=args.seed, repeat=args.repeat, isolate=not args.inline, log=log)
+    report = {"environment": environment(), "results": results}
+
+    text = json.dumps(report, indent=1)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            f.write(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("environment") != report["environment"]:
+            log("baseline was recorded in a different environment: %r" % (baseline.get("environment"),))
+        worse = compare(results, baseline, tolerance=args.tolerance)
+        for key, k, a, b in worse:
+            log("REGRESSION steps %d cell_res %d bifurc %d/%d engine %s compiled %s: %s %.4g -> %.4g" % (key + (k, a, b)))
+        if worse:
+            return 1
+        log("no regressions against %s" % args.baseline)
+    return 0
+
+if __name__ == "__main__":
+    from growf.bench import main    # so the worker processes find run_case in growf.bench, not in __main__
+    sys.exit(main())
@@ -0,0 +1,170 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+# Blender adapter: turns grown Trees into bmesh objects in the current scene
+# Only this module imports bpy/bmesh, the core imports it lazily from Tree.show and Tree.make_skeleton
+
+import bpy
+import bmesh
+import mathutils
+import numpy as np
+
+from .core import Tree
+from .mesh import mesh_buffers, mesh_lods, RetainedMesh
+from .skeleton import skeleton
+
+# Mesh functions for bmesh
+
+def link_new_obj(name):
+    m = bpy.data.meshes.new(name)
+
+    # Instantiates a new object with the previous mesh specified by m
+    o = bpy.data.objects.new(name, m)
+
+    # Links object to scene's collection
+    scene = bpy.context.scene
+    scene.collection.objects.link(o)
+    return o, m
+
+def set_mesh(bm, m):
+    # Write data to mesh
+    bm.to_mesh(m)
+
+    # Destroy bmesh
+    bm.free()
+    
+def make_mesh(name):
+    # Instantiates a new type of mesh
+    o, m = link_new_obj(name)
+    
+    # Get bmesh
+    bm = bmesh.new()
+    bm.from_mesh(m)
+    cl = bm.loops.layers.color.new("color")
+    return o, m, bm, cl
+
+def make_skeleton(tree, tip_radius=None):
+    # The branching structure as a line mesh (see growf.skeleton), edge radii in a "radius" edge attribute
+    sk = skeleton(tree, tip_radius=tip_radius)
+    o, m = link_new_obj(tree.name)
+    m.vertices.add(len(sk.verts))
+    m.vertices.foreach_set("co", sk.verts.ravel())
+    m.edges.add(len(sk.edges))
+    m.edges.foreach_set("vertices", sk.edges.ravel())
+    if hasattr(m, "attributes"):
+        m.attributes.new("radius", "FLOAT", "EDGE").data.foreach_set("value", sk.radius)
+    m.update()
+    return o
+
+def color_layer(m):
+    layer = m.color_attributes.get("color") if hasattr(m, "color_attributes") else m.vertex_colors.get("color")
+    if layer is None:
+        if hasattr(m, "color_attributes"):
+            layer = m.color_attributes.new("color", "BYTE_COLOR", "CORNER")
+        else:
+            layer = m.vertex_colors.new(name="color")
+    return layer
+
+def set_buffers(m, buf):
+    # Fills a mesh from MeshBuffers in bulk (foreach_set) instead of one bm.verts.new/bm.faces.new per element
+    # Works on an empty mesh as well as on one that already holds a prefix of the buffers (see RetainedMesh)
+    # Rings run clockwise around the growth direction, so every quad is wound inward: its corners are written in reverse
+    # and the normals Blender derives point outward, no bmesh pass over the whole mesh when growth adds faces
+    nv, nf = len(buf.verts), len(buf.quads)
+    added = nf - len(m.polygons)
+    if nv > len(m.vertices):
+        m.vertices.add(nv - len(m.vertices))
+    m.vertices.foreach_set("co", buf.verts.ravel())
+    if added:
+        m.loops.add(added * 4)
+        m.loops.foreach_set("vertex_index", buf.quads[:, ::-1].ravel())
+        m.polygons.add(added)
+        m.polygons.foreach_set("loop_start", np.arange(0, nf * 4, 4, dtype=np.int32))
+        if hasattr(m.polygons, "loop_total"):
+            m.polygons.foreach_set("loop_total", np.full(nf, 4, dtype=np.int32))
+        m.update(calc_edges=True)
+    color_layer(m).data.foreach_set("color", buf.loop_colors().ravel())
+    m.update()
+
+def show(tree, lod=0):
+    # Cells are still linked to the cell below them like the old per-face skinning loop did
+    tree.link_columns()
+    buf = mesh_buffers(tree, lod=lod)
+    o, m = link_new_obj(tree.name)
+    tree.name = o.name
+    set_buffers(m, buf)
+    return o
+
+def show_lods(tree, lods=(0, 1, 2)):
+    # one object per level of detail of the same grown tree, named <tree name>_LOD<lod>
+    tree.link_columns()
+    objects = []
+    for lod, buf in mesh_lods(tree, lods).items():
+        o, m = link_new_obj("%s_LOD%d" % (tree.name, lod))
+        set_buffers(m, buf)
+        objects.append(o)
+    return objects
+
+def replace_mesh(obj_name, mesh):
+    # Swaps the mesh data of an object and frees the old mesh once nothing else uses it
+    o = bpy.data.objects[obj_name]
+    old = o.data
+    o.data = mesh
+    if old is not None and old.users == 0:
+        bpy.data.meshes.remove(old)
+    return o
+
+# Objects grown in place by anim_handler: object name -> (Tree, RetainedMesh)
+_animations = {}
+
+def animate(name="AnimTest", seed="GrowF", engine=False, settling=None):
+    # One object whose mesh grows with the timeline, Tree age follows the current frame
+    t = Tree(name=name, seed_r=seed, engine=engine, settling=settling)
+    t.plant(growth_steps=1)
+    rm = RetainedMesh(t)
+    rm.update()
+    o, m = link_new_obj(name)
+    set_buffers(m, rm.buffers())
+    _animations[o.name] = (t, rm)
+    if anim_handler not in bpy.app.handlers.frame_change_post:
+        bpy.app.handlers.frame_change_post.append(anim_handler)
+    return o
+
+def animation_test(name="AnimTest", seed="GrowF"):
+    return animate(name=name, seed=seed)
+
+def anim_handler(scene):
+    frame = scene.frame_current
+    for name, (t, rm) in list(_animations.items()):
+        o = bpy.data.objects.get(name)
+        if o is None:
+            del _animations[name]
+            continue
+        if frame <= t.age:
+            continue    # growth only runs forward, scrubbing back keeps the grown mesh
+        t.grow(steps=frame - t.age)
+        rm.update()
+        set_buffers(o.data, rm.buffers())
+
+def show_default(name, seed="GrowF", steps=20):
+    t = Tree(name=name, seed_r=seed)
+    t.plant(growth_steps=steps)
+    o = t.show()
+    t.describe()
+    return o
+
+def show_growth_procession(name, seed="GrowF", steps=20, space=4):
+    t = Tree(name=name, seed_r=seed)
+    t.plant(growth_steps=1)
+    rm = RetainedMesh(t)
+    m = steps * space
+    for i in range(0, steps):
+        # every step only appends its new slices to the retained buffers instead of re-meshing the whole tree
+        rm.update()
+        o, me = link_new_obj(name)
+        set_buffers(me, rm.buffers())
+        o.location = mathutils.Vector((m - (i * space), 0.0, 0.0))
+        t.grow()
+    t.describe()
+
+
@@ -0,0 +1,112 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+# Content-addressed cache of grown trees on disk
+# Growth is deterministic in the DNA, the namespace (Tree.random_seed), the growth mode (engine, compact, compiled,
+# skeleton, settling, hormones, light, spatial hash) and the number of steps, so a grown tree can be stored as a snapshot
+# (growf.state) under a hash of those.
+# Tree.plant looks into the cache it was given:
+#
+#   cache = GrowthCache("~/.cache/growf", max_bytes=2 << 30)
+#   t = Tree(seed_r="GrowF", cache=cache)
+#   t.plant(growth_steps=30)    # grown and stored
+#   t = Tree(seed_r="GrowF", cache=cache)
+#   t.plant(growth_steps=40)    # restored at step 30 and grown 10 more steps, then stored as well
+#
+# Entries are files named <key>-<steps>.gfs, the least recently used ones (by modification time, which a hit renews)
+# are removed once the cache is bigger than max_bytes. Several processes can share one cache directory.
+# Trees whose settling policy has an on_freeze callback are not cached, the callback would miss the cached steps.
+
+import os
+import hashlib
+
+from . import state
+
+SUFFIX = ".gfs"
+
+class GrowthCache():
+    def __init__(self, path, max_bytes=1 << 30):
+        self.path = os.path.expanduser(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.path, exist_ok=True)
+
+    def key(self, tree):
+        # hash of everything but the steps that decides how tree grows, None when it can't be cached
+        # (call before Tree.begin, which advances the DNA)
+        s = tree.settling
+        if s is not None and s.on_freeze is not None:
+            return None
+        try:
+            dna = tree.init_dna().serialize()
+        except ValueError:
+            return None     # a wave function that isn't registered
+        h = hashlib.sha1(dna)
+        mode = (tree.random_seed, bool(tree.use_engine), bool(tree.compact), bool(tree.compiled), bool(tree.skeleton), None if s is None else (s.max_age, s.epsilon), None if tree.hormones is None else tree.hormones.key(), None if tree.light is None else tree.light.key(), None if tree.spatial is None else tree.spatial.key(), state.VERSION)
+        h.update(repr(mode).encode("utf-8"))
+        return h.hexdigest()
+
+    def entry(self, key, steps):
+        return os.path.join(self.path, "%s-%d%s" % (key, steps, SUFFIX))
+
+    def steps(self, key):
+        # the step counts stored for key
+        out = []
+        prefix = key + "-"
+        for name in os.listdir(self.path):
+            if name.startswith(prefix) and name.endswith(SUFFIX):
+                n = name[len(prefix):-len(SUFFIX)]
+                if n.isdigit():
+                    out.append(int(n))
+        return sorted(out)
+
+    def restore(self, tree, key, steps):
+        # restores tree from the entry of key with the most steps up to steps, returns those steps (0 for a miss)
+        for n in reversed(self.steps(key)):
+            if n > steps:
+                continue
+            path = self.entry(key, n)
+            try:
+                state.load(path, tree, keep=state.IDENTITY)    # a hit hands over growth, not the tree's name
+                os.utime(path)
+            except FileNotFoundError:
+                continue    # evicted by another process in the meantime
+            self.hits += 1
+            return n
+        self.misses += 1
+        return 0
+
+    def store(self, tree, key, steps):
+        state.save(tree, self.entry(key, steps))
+        self.evict(keep=self.entry(key, steps))
+
+    def evict(self, keep=None):
+        # removes least recently used entries until the cache fits in max_bytes (never keep, the entry just stored)
+        entries = []
+        total = 0
+        for e in os.scandir(self.path):
+            if e.name.endswith(SUFFIX):
+                try:
+                    st = e.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, e.path, st.st_size))
+                total += st.st_size
+        entries.sort()
+        for mtime, path, size in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        return total
+
+    def clear(self):
+        for e in os.scandir(self.path):
+            if e.name.endswith(SUFFIX):
+                os.remove(e.path)
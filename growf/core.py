@@ -0,0 +1,1318 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+# Copyright 2021 Solana Wallet: 2VEvjzNYHG56fJHNcUPnMTpi1cuRTipqgu78YNtZhnAK
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the "Software"), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import os
+import math
+import random
+import types
+import colorsys
+
+from .vector import Vector, Color
+
+_Z = Vector((0.0, 0.0, 1.0)) # Eventually will be moved, just a way to know which way is the template normal
+
+def _numpy():
+    # numpy is optional for the core and only imported once something needs it, so importing growf stays cheap
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+# Change the below variable to False to freeze every Param at its first value
+# (to only model the branching structure of your organism, grow it with Tree(skeleton=True), see growf.skeleton)
+_params_live = True
+
+_BLOCK_NUMPY = 512   # vectors from which GrowthRandom.block draws in one numpy call, handing the state over costs ~0.1 ms
+
+# GrowthRandom is the random generator a Tree owns and hands down to its Tips, Slices, Cells and DNA Params
+# Seeded with the Tree's namespace it gives the same stream the global random module used to (random.seed(a, version=2)),
+# but two trees no longer share it, so they can grow side by side (threads, batches) and stay reproducible.
+class GrowthRandom(random.Random):
+    def vector(self, vmax):
+        # (x, y, z) each uniform in [-vmax, vmax), same draws and arithmetic as Cell.random_vector always did
+        rnd = self.random
+        return (rnd() * (vmax * 2) - vmax, rnd() * (vmax * 2) - vmax, rnd() * (vmax * 2) - vmax)
+
+    def block(self, n):
+        # (n, 3) ndarray of raw uniform draws, e.g. one random vector for every cell of a slice: exactly the next n * 3
+        # values random() would give, so a block can stand in for per-cell draws and replays and snapshots stay exact
+        np = _numpy()
+        if n < _BLOCK_NUMPY:
+            rnd = self.random
+            return np.fromiter((rnd() for _ in range(n * 3)), np.float64, n * 3).reshape(n, 3)
+        # large blocks: numpy's MT19937 makes doubles the way random() does, the twister state is handed over and back
+        version, state, gauss = self.getstate()
+        rs = np.random.RandomState()
+        rs.set_state(("MT19937", np.array(state[:-1], dtype=np.uint32), state[-1]))
+        out = rs.random_sample((n, 3))
+        key, pos = rs.get_state()[1:3]
+        self.setstate((version, tuple(key.tolist()) + (pos,), gauss))
+        return out
+
+# Param is the basic unit of growth instruction, it uses any infinite wave function(s) to define step-increments of value, along with limits of that value
+class Param():
+    def __init__(self, value, vmin=None, vmax=None, func=None, steps=None, freq=1.0, sequence=None, inherit=True):
+        self.value = value
+        self.orig = value
+        self.min = vmin
+        self.max = vmax
+        self.func = func
+        self.steps = steps
+        self.freq = freq
+        self.sequence = sequence    # Use sequence for a repeating list
+        self.inherit = inherit
+
+        self.cfunc = 0
+        self.count = 0
+        self.rng = None     # random generator for random wave functions (p_random), bound by Tree.begin
+        
+    def next_func(self):
+        lf = len(self.func)
+        f = self.func[self.cfunc]
+        o = f if type(f) != types.FunctionType else f(self)
+        self.cfunc += 1
+        if self.cfunc >= lf:
+            self.cfunc = 0
+        return o
+        
+    def next(self):
+        if not _params_live:
+            return self.value
+        if self.max is not None:
+            if type(self.func) == types.FunctionType:
+                self.value = self.func(self)
+            else:
+                self.value = self.next_func()
+        self.count += 1
+        return self.value
+    
+    def first(self):
+        return self.orig
+    
+    def copy(self, inherit=True):
+        p = Param(self.orig, vmin=self.min, vmax=self.max, func=self.func, steps=self.steps, freq=self.freq, sequence=self.sequence)
+        if self.inherit or inherit:
+            p.count = self.count
+            p.cfunc = self.cfunc
+        p.rng = self.rng
+        return p
+
+# Schedule is a compiled Param: one copy of it is run ahead and every state it goes through is recorded, so the value
+# after any number of next() calls is a list lookup. Only Params whose wave functions don't draw random numbers can be
+# replayed like this (everything but p_random and p_random_int), they depend on count, freq, min and max alone.
+# Nothing has to refuse the others: DNA.copy_param hands out plain copies of them and the CellEngine keeps them per row
+# (growf.engine.ParamRows), so every wave grows compiled and with the engine.
+class Schedule():
+    def __init__(self, param):
+        if not Schedule.replayable(param):
+            raise ValueError("a Schedule can't replay a Param that draws random numbers")
+        self.source = param
+        self.origin = (param.count, param.cfunc)    # state of the source when compiled, see DNA.schedule
+        self.param = param.copy()
+        self.first = (self.param.value, self.param.count, self.param.cfunc)
+        self.states = []    # (value, count, cfunc) after each next()
+        self.values = []    # value after each next()
+
+    @staticmethod
+    def replayable(param):
+        funcs = param.func if type(param.func) == list else [param.func]
+        return p_random not in funcs and p_random_int not in funcs
+
+    def extend(self, n):
+        p = self.param
+        while len(self.states) < n:
+            v = p.next()
+            self.states.append((v, p.count, p.cfunc))
+            self.values.append(v)
+
+    def state(self, i):
+        # (value, count, cfunc) of a copy that has had next() called i times
+        if i == 0:
+            return self.first
+        if i > len(self.states):
+            self.extend(i)
+        return self.states[i - 1]
+
+    def value_at(self, i):
+        if i == 0:
+            return self.first[0]
+        if i > len(self.values):
+            self.extend(max(i, len(self.values) * 2))
+        return self.values[i - 1]
+
+    def view(self, offset=0):
+        return ScheduledParam(self, offset)
+
+# ScheduledParam stands in for a copy of a Param: it only holds its Schedule and how many times next() was called on it.
+# Everything else (min, max, func, ...) is read from the compiled Param.
+class ScheduledParam():
+    __slots__ = ("schedule", "offset")
+
+    def __init__(self, schedule, offset=0):
+        self.schedule = schedule
+        self.offset = offset
+
+    def __getattr__(self, k):
+        if k in ScheduledParam.__slots__:
+            raise AttributeError(k)
+        return getattr(self.schedule.param, k)
+
+    value = property(lambda p: p.schedule.value_at(p.offset))
+    count = property(lambda p: p.schedule.state(p.offset)[1])
+    cfunc = property(lambda p: p.schedule.state(p.offset)[2])
+
+    def next(self):
+        i = self.offset = self.offset + 1
+        values = self.schedule.values
+        return values[i - 1] if i <= len(values) else self.schedule.value_at(i)
+
+    def first(self):
+        return self.schedule.param.orig
+
+    def copy(self, inherit=True):
+        return ScheduledParam(self.schedule, self.offset)
+
+# DNA acts like the API for growth parameters, allowing copying, mixing, mutation, and serialization of any parameter space
+class DNA():
+    def __init__(self, namespace, data=None):
+        self.namespace = namespace  # Having a namespace allows different random seeds based on names
+                                    # should have the effect of chanigng all random phenomena so that
+                                    # the same DNA creates the same exact organism, only slightly different
+                                    # because randomness in the growth process can have great effects on outcome
+                                    # Think of it like a multiverse space of infinite multiverses in which same DNA, different outcome
+        self.data = {}
+        self.compiled = False       # hand out shared Schedule views instead of Param copies, see copy_param
+        self.schedules = {}         # (key, index) -> Schedule
+        if data is not None:
+            self.add_data(data)
+
+    def put(self, key, d):
+        self.data[key] = d
+        return d
+        
+    def get(self, key):
+        return self.data[key]
+
+    def setdefault(self, key, d):
+        # like put, but keeps what is already there (DNA handed in with Tree.set_dna wins over the defaults)
+        return self.data.setdefault(key, d)
+    
+    def add_data(self, data):
+        for k, d in data.items():
+            self.data[k] = d
+
+    def schedule(self, key, i):
+        # the Schedule of Param i of a DNA entry, compiled on first use and again when the Param was replaced or advanced
+        p = self.data[key][i]
+        s = self.schedules.get((key, i))
+        if s is None or s.source is not p or s.origin != (p.count, p.cfunc):
+            s = self.schedules[(key, i)] = Schedule(p)
+        return s
+
+    def copy_param(self, key, i, inherit=True):
+        # what a Cell or Slice takes from its DNA: a Param copy, or in compiled mode a view of the entry's shared Schedule
+        p = self.data[key][i]
+        if self.compiled and (inherit or p.inherit) and Schedule.replayable(p):
+            return self.schedule(key, i).view()
+        return p.copy(inherit=inherit)
+            
+    def serialize(self):
+        # compact versioned binary encoding of the namespace and every Param (see growf.genome)
+        from .genome import dumps
+        return dumps(self)
+
+    def unserialize(self, data):
+        # replaces namespace and Params with the ones encoded in data (bytes, or a memoryview into a population file)
+        from .genome import loads
+        dna = loads(data)
+        self.namespace = dna.namespace
+        self.data = dna.data
+        self.schedules = {}
+        return self
+    
+    def clone(self):
+        # a DNA with exact copies of every Param, growing it doesn't advance this one (see Tree.begin)
+        from .ga import clone
+        return clone(self)
+
+    def get_copy(self, mutation_rate=0.001, rng=None):
+        # a new DNA with this namespace and copies of every Param, each mutated with probability mutation_rate (see growf.ga)
+        from .ga import mutate
+        return mutate(self, mutation_rate, rng=rng)
+
+# Cell is a representation of collaborative growth and needs to be laid down on a 3D growth lattice like a Slice
+class Cell():
+    def __init__(self, x, y, dna=None, z=0.0, center=None, vector_up=None, rng=None):
+        self.rng = random if rng is None else rng                               # the Tree's GrowthRandom (global random when standalone)
+        self.x = x
+        self.y = y
+        self.z = z
+        self.center = center                                                    # the center or parent cell's location
+        self.vector_up = vector_up                                              # what this cell knows to be "up" or the opposite of gravity
+        self.origin = Vector((x, y, z))                               # the vector representing the origin or starting point at birth
+        self.origv = None if self.center is None else self.origin - self.center # the vector representing original growth orientation
+        
+        self.loc = Vector((x, y, z))
+        self.v = Vector((0.0, 0.0, 0.0))
+        self.nloc = self.loc
+        self.nv = self.v
+        
+        self.maxdev = 1
+        self.mindist = Param(0.001) if dna is None else dna.copy_param("cell", 2)
+        self.ease = Param(0.05) if dna is None else dna.copy_param("cell", 3)
+        self.ease_away = Param(0.01) if dna is None else dna.copy_param("cell", 4)
+        self.ease2, self.ease_away2 = 1.0, 1.0
+        self.age = 0
+        self.color = Color((0.3, 1.0, 0.2))    # rgba
+        self.hue = Param(0.848, vmin=0.375, vmax=0.848, func=p_sin, freq=0.5) if dna is None else dna.copy_param("cell", 5) #, vmin
+        self.saturation = Param(0.336, vmin=0.262, vmax=0.336, func=p_sin, freq=1.0) if dna is None else dna.copy_param("cell", 6)
+        self.brightness = Param(0.934, vmin=0.564, vmax=0.934, func=p_sin, freq=1.0) if dna is None else dna.copy_param("cell", 7)
+        self.rate_growth_radial = 5.0
+        self.set_color()
+        self.targets = [] # Can be turned into a way to react to target objects
+        self.slice = None   # the Slice this cell is part of and its index on the ring, neighbors follow from these
+        self.ring = 0
+        self.extra = None   # neighbors added with add_neighbor on top of the slice topology
+        self.hormones = []
+        self.engine = None  # set when a CellEngine adopts this cell, index is then its row in the engine arrays
+        self.index = -1
+        
+        self.v = self.random_vector()
+    
+    def set_color(self):
+        self.color.h, self.color.s, self.color.v = self.hue.value, self.saturation.value, self.brightness.value
+        #r, g, b = colorsys.hsv_to_rgb(self.hue.value, self.saturation.value, self.brightness.value)
+        #self.color = mathutils.Color((r, g, b))
+        
+    def random_vector(self, vmax=0.06):
+        rnd = self.rng.random
+        vx = rnd() * (vmax * 2) - vmax
+        vy = rnd() * (vmax * 2) - vmax
+        vz = rnd() * (vmax * 2) - vmax
+        return Vector((vx, vy, vz))
+    
+    @property
+    def neighbors(self):
+        # The slice topology is implied by indices, nothing is stored per cell: the cells kernel steps around the ring,
+        # then the cell at the same ring index of the slice below and above (once Tree.link_columns has linked them)
+        out = []
+        slc = self.slice
+        if slc is not None:
+            cells = slc.cells
+            n, i = len(cells), self.ring
+            out = [cells[(i + k) % n] for k in slc.kernel]
+            for other in (slc.below, slc.above):
+                if other is not None and i < len(other.cells):
+                    out.append(other.cells[i])
+        if self.extra:
+            out.extend(self.extra)
+        return out
+
+    def add_neighbor(self, n):
+        if self.extra is None:
+            self.extra = []
+        self.extra.append(n)
+        if self.engine is not None:
+            self.engine.dirty = True
+        
+    def grow(self, tracer=None):
+        # TODO: Option to make cell behavior completely controlled by evolved NN
+        self.ease.next()
+        self.ease_away.next()
+        
+        self.move_random(flat=False)
+        self.grow_radial()
+        if tracer is None:
+            self.move_boids()
+        else:
+            tracer.enter("boids")
+            self.move_boids()
+            tracer.leave()
+        #self.move_rest()
+        
+        self.growth_counters()
+        self.set_color()
+        
+    def grow_radial(self):
+        v = self.origv * (1 / (self.age + 1))
+        self.nv = v * self.rate_growth_radial
+        
+    def growth_counters(self):
+        self.hue.next()
+        self.brightness.next()
+        self.saturation.next()
+        self.nloc = self.loc + self.nv
+        self.age += 1
+
+    def update(self):
+        self.loc = self.nloc
+        self.v = self.nv
+                    
+    def move_random(self, flat=True):
+        self.nv = self.nv * self.random_vector(vmax=0.2)
+        if flat:
+            self.nv.z = 0.0
+        
+    def dist_origin(self):
+        v = self.loc - self.origin
+        return math.sqrt((v.x * v.x) + (v.y * v.y) + (v.z * v.z))
+            
+    def move_rest(self, ratio=0.5):
+        if self.dist_origin() > self.maxdev:
+            v = (self.loc + self.origin) / 2
+            e = v - self.loc
+            self.nv = self.nv + (e * ratio)
+            
+    def move_away(self, point, limit=0):
+        # point should be a tuple of 3 floats (x, y, z)
+        v = point # mathutils.Vector(point)
+        a = v - self.loc
+        if limit == 0 or a < limit:
+            n = a * self.ease_away.value * self.ease_away2
+            self.nv = self.nv + n
+        
+    def move_boids(self):
+        neighbors = self.neighbors     # built on every access, see Cell.neighbors
+        rn = 1 / len(neighbors)
+        al, av = self.loc, self.v
+        for n in neighbors:
+            al = al + n.loc
+            av = av + n.v
+            #self.nv = self.nv + (-n.loc * self.ease_away)
+            self.move_away(n.loc)
+        al = al * rn
+        av = av * rn
+        ad = al - self.loc
+        sr = 0.1
+        self.nv = self.nv + (av * self.ease.value * self.ease2)
+
+    # Cell interactions        
+
+    def give(self, other, hormone, volume_ratio):
+        # moves volume_ratio of this cell's hormone (a Hormone or its type) to other, when the tree transports
+        # hormones (see growf.hormones), returns the amount moved
+        field = None if self.engine is None else self.engine.hormones
+        if field is None:
+            return None
+        return field.give(self.index, other.index, hormone, volume_ratio)
+
+
+class Slice():
+    def __init__(self, neighbors, start_radius=(1, 1), detail_depth=0.1, center=Vector((0.0, 0.0, 0.0)), normal=Vector((0.0, 0.0, 1.0)), rate_growth_radial=None, mult_growth_radial=1.0, dna=None, engine=None, rng=None):
+        self.rng = rng
+        self.neighbors = neighbors
+        self.center = center
+        self.orientation = normal
+        self.rot_matrix = rot_q(self.orientation)
+        self.radius = (Param(1.0), Param(1.0)) if dna is None else (dna.copy_param("slice", 0, inherit=False), dna.copy_param("slice", 1, inherit=False))
+        self.rate_growth_radial = Param(1.0) if rate_growth_radial is None else rate_growth_radial
+        self.rate_ease_radial = Param(0.1) if dna is None else dna.copy_param("slice", 5)
+        self.rate_ease_away = Param(0.01) if dna is None else dna.copy_param("slice", 6)
+        self.mult_growth_radial = mult_growth_radial
+        self.ddepth = detail_depth / 2
+        self.dna = dna
+        self.cells = []
+        self.age = 0
+        self.displacement = 0.0     # largest distance any cell moved in the last growth step
+        self.frozen = None          # read-only (x, y, z, r, g, b) rows once the slice has settled, see Settling
+        self.order = 0              # position in its tip's branch
+        self.junction = False       # child tips start from this slice, see Tip.mark_junction
+        self.kernel = (-1, 1)       # ring offsets of the neighbors of a cell, see link
+        self.below = None           # the previous and next slice of the branch once Tree.link_columns has linked them
+        self.above = None
+
+        self.engine = engine
+        if engine is not None and engine.compact:
+            self.init_rows()
+            return
+        self.init_circular()
+        self.link()
+
+        if engine is not None:
+            engine.add_slice(self)
+    
+    def init_circular(self):
+        r = math.pi * 2 / self.neighbors
+        for i in range(0, self.neighbors):
+            x = math.sin(i * r) * self.radius[0].next()
+            y = math.cos(i * r) * self.radius[1].next()
+            v = Vector((x, y, 0.0))
+            v.rotate(self.rot_matrix.normalized())
+            v = v + self.center
+            c = Cell(v.x, v.y, z=v.z, center=self.center, dna=self.dna, rng=self.rng)
+            c.rate_growth_radial = self.growth_rate(i)
+            c.ease2 = self.rate_ease_radial.next()
+            c.ease_away2 = self.rate_ease_away.next()
+            self.cells.append(c)
+            
+    def init_rows(self):
+        # Compact mode: the cells init_circular would create, written straight into engine rows without Cell objects
+        # Params and random draws are taken in the same order, so the tree grows the same
+        r = math.pi * 2 / self.neighbors
+        center = self.center
+        vector = self.rng.vector
+        cells = []
+        for i in range(0, self.neighbors):
+            x = math.sin(i * r) * self.radius[0].next()
+            y = math.cos(i * r) * self.radius[1].next()
+            v = Vector((x, y, 0.0))
+            v.rotate(self.rot_matrix.normalized())
+            v = v + center
+            cells.append((tuple(v), tuple(v - center), vector(0.06), self.growth_rate(i), self.rate_ease_radial.next(), self.rate_ease_away.next()))
+        self.engine.add_rows(self, cells)
+
+    def growth_rate(self, index):
+        # get the growth rate for the cell
+        # index can be used to set a curve over the cells dropped in growth rate
+        # rgr * curve[index]
+        return self.rate_growth_radial.next() * self.mult_growth_radial
+        
+    def link(self, kernel=[-1, 1]): #[-3, -2, -1, 1, 2, 3]):
+        # Ring neighbors are implied by index: cell i neighbors cells (i + k) % len for every k of the kernel
+        # (see Cell.neighbors), so linking only records the kernel and where each cell sits on the ring
+        self.kernel = tuple(kernel)
+        for i, c in enumerate(self.cells):
+            c.slice = self
+            c.ring = i
+            
+    def get_vertices(self, z):
+        o = []
+        for i, v in enumerate(self.cells):
+            o.append([v.loc.x, v.loc.y, v.loc.z])
+        self.next()
+        return o
+    
+    def grow(self, tracer=None):
+        self.age += 1
+        if self.engine is not None:
+            # the engine grows all scheduled slices of the tree in one batch at the end of the step
+            self.engine.schedule(self)
+            return
+        for v in self.cells:
+            v.grow(tracer)
+        for v in self.cells:
+            v.update()
+        self.displacement = max(v.v.length for v in self.cells)
+
+    def freeze(self):
+        # Settled slices keep only their final positions and colors, the Cell objects are let go
+        # with the engine the rows are copied out as they are, the cells aren't synced first just to be dropped
+        if self.engine is not None:
+            self.frozen = self.engine.block(self)
+            self.frozen.flags.writeable = False
+            self.engine.release(self)
+            self.cells = []
+            return
+        rows = [(c.loc[0], c.loc[1], c.loc[2], c.color.r, c.color.g, c.color.b) for c in self.cells]
+        np = _numpy()
+        if np is not None:
+            self.frozen = np.array(rows, dtype=np.float32)
+            self.frozen.flags.writeable = False
+        else:
+            self.frozen = tuple(rows)
+        self.cells = []
+
+    def __len__(self):
+        if self.frozen is not None:
+            return len(self.frozen)
+        if self.engine is not None and self.engine.compact:
+            return self.span[1]
+        return len(self.cells)
+
+    def views(self):
+        # the cells of a growing slice: its Cell objects, or CellViews of the engine rows of a compact slice
+        if self.frozen is not None:
+            return []
+        if self.engine is not None and self.engine.compact:
+            from .engine import CellView
+            i0, n = self.span
+            return [CellView(self.engine, i, self) for i in range(i0, i0 + n)]
+        if self.engine is not None:
+            self.engine.sync(self.cells)
+        return self.cells
+
+    def points(self):
+        # [(location, (r, g, b)), ...] of the surface cells, for growing as well as frozen slices
+        if self.frozen is not None:
+            return [(tuple(row[:3]), tuple(row[3:])) for row in self.frozen]
+        if self.engine is not None and self.engine.compact:
+            return [(tuple(row[:3]), tuple(row[3:])) for row in self.engine.block(self)]
+        if self.engine is not None:
+            self.engine.sync(self.cells)
+        return [(c.loc, (c.color.r, c.color.g, c.color.b)) for c in self.cells]
+
+# Settling is the policy that decides when a slice is done growing and can be frozen
+# Cells slow down as 1 / (age + 1), so old slices hardly move but would otherwise be re-grown every step forever
+# max_age: freeze slices that have grown this many steps (0 = no limit)
+# epsilon: freeze slices whose cells all moved less than this in the last step (0.0 = no limit)
+# on_freeze: optional callback(tip, slice) run right after a slice is frozen (streaming exporters hook in here)
+# Frozen slices stop drawing random numbers, so a settled tree is not identical to an unsettled one of the same seed
+class Settling():
+    def __init__(self, max_age=0, epsilon=0.0, on_freeze=None):
+        self.max_age = max_age
+        self.epsilon = epsilon
+        self.on_freeze = on_freeze
+
+    def settled(self, slc):
+        if self.max_age and slc.age >= self.max_age:
+            return True
+        return self.epsilon > 0.0 and slc.age > 0 and slc.displacement < self.epsilon
+
+
+class Tip():
+    def __init__(self, branch, loc, dir=(0.0, 0.0, 1.0), speed=0.3, hormones=[], data={}, bifurcation=(4, 3, 0.5, 0.618, 0.4, 0.8, 0, 0, 10), cell_res=8, start_at_0=True, start_radius=(0.01, 0.01), cell_growth=None, dna=None, engine=None, settling=None, rng=None, skeleton=False):
+        
+        br = dna.get("branch")
+        
+        # Initial configuration (can be changed by factors that affect the tip)
+        self.parent = branch
+        self.direction = Vector(dir)
+        self.rq = self.update_q()
+        self.bifurc_period = br[0].copy()         # How many growth steps happen between bifurcations/branching
+        self.bifurcations = br[1].copy()          # How many new tips grow out of this
+        self.biphase_offset = br[2].copy()        # The radial offset angle (0.0-1.0) of successive bifurcations
+        self.bifurc_sr = br[3].copy()             # Initial speed ratio for bifurcated child tips
+        self.bifurc_inclination = br[4].copy()    # Inclination of child tips
+        self.bifurc_radius_ratio = br[5].copy()   # The ratio of 
+        self.bifurc_stop = br[6].copy()           # When to stop bifurcations on this branch
+        self.stop_age = br[7].copy()              # if set > 0, it will make the branch stop growing after this age
+        self.max_generation = br[8]               # Number of bifurcation generations allowed in entire organism
+        self.speed = Param(speed) if dna is None else br[9].copy()
+        self.speed_decay = Param(0.98) if dna is None else br[10].copy() #, vmin=0.818, vmax=1.16, func=p_random)     # ratio of decay of growth speed per growth
+        self.photolocate_ratio = Param(0.04) if dna is None else br[11].copy()
+        self.geolocate_ratio = Param(0.02) if dna is None else br[12].copy()
+        self.branch_growth_rate = Param(1.0) if dna is None else br[13].copy()         #if it uses .copy like the rest, it gets "normal" behavior, but if not, uses linked behavior
+        self.data = data
+        self.hormones = hormones    # hormones are dropped as a total of what is available        
+        
+        # Slices and surface cells
+        self.start_radius = start_radius
+        self.cell_growth_rate = cell_growth if dna is None else dna.get("cell")[0]
+        self.slice_growth_rate = Param(2.0) if dna is None else dna.get("slice")[4]
+        self.branch = []
+        self.growing = []           # slices of the branch that have not been frozen by the settling policy
+        self.settling = settling
+        self.tracer = None          # the Tree's growf.trace.Tracer while one is attached, set by Tree.grow
+        self.cell_res = cell_res if dna is None else dna.get("cell")[1]
+        self.cur_slice = None
+        self.skeleton = skeleton    # only record the path of the tip, no slices or cells (see Tree(skeleton=True))
+        self.path = []              # locations of the tip at every step it grew, in skeleton mode
+
+        # Working parameters (counters, history, etc)
+        self.dna = dna
+        self.engine = engine
+        self.rng = rng
+        self.cache_vertex = None
+        self.loc = Vector(loc)
+        self.last_loc = self.loc
+        self.phase = 0.0
+        self.generation = 0
+        self.age = 0
+        self.bifurc_count = 0
+        
+        # direction of gravity and direction of light are unit vectors that point toward gravity and toward the brightest light
+        self.light_axis = Vector((0.5, 0.5, 1.0))
+        self.gravity_axis = Vector((0.0, 0.0, -1.0))
+        self.exposure = 1.0         # share of the light reaching the tip, set by the Tree's growf.light.LightField
+        
+        if start_at_0:
+            self.start()
+
+        # auxins specifically in tip growth are 
+        # What makes plants grow? these hormones.
+        # bending happens because light hits one side of the stem, spending the auxins
+        # slowing down growth on that side!!!! intense, causing the shoots and leaves to turn toward the light
+        # As this tip grows it needs to drop auxins to the cells it's dropping
+        # The cells it's dropping are 
+        # in roots, auxins cause less growth, causing them to bend away from the light
+        # Each cell dropped has same amount of auxins
+        # when the dropped cells receive light, they can spend their auxins
+        # literally each cell needs to raytrace to a light source
+        # upon receiving the light, it slowly depreciates the amount of auxins it has
+        # other cells can pass it auxins if the function that determines auxin transfer allows
+        # how will curvature of final outward mesh handle things like where branch nodes meet their parents?
+        #  since the tip only drops a growing surface cell, it will be included as a neighbor to the cells dropped by the tip's parent branch
+        
+    def start(self):
+        self.new_slice()
+            
+    def new_slice(self):
+        # (1.0, 0.5, 10.0)
+        if self.skeleton:
+            self.path.append(self.loc)
+            return
+        tr = self.tracer
+        if tr is not None:
+            tr.enter("slices")
+        self.cur_slice = Slice(
+            self.cell_res.next(),
+            start_radius = self.start_radius,
+            center = self.loc, 
+            normal = self.direction,
+            rate_growth_radial = self.cell_growth_rate,
+            mult_growth_radial = self.slice_growth_rate.next() * self.branch_growth_rate.value,
+            dna = self.dna,
+            engine = self.engine,
+            rng = self.rng
+        )
+        self.cur_slice.order = len(self.branch)
+        self.branch.append(self.cur_slice)
+        self.growing.append(self.cur_slice)
+        if tr is not None:
+            tr.leave()
+            tr.count(new_slices=1, new_cells=len(self.cur_slice))
+    
+    def update_q(self):
+        rq = rot_q(self.direction)
+        return rq
+
+    def mark_junction(self):
+        # on bifurcation: children start where the tip was before its last step, at the slice laid down there
+        # (meshes keep it at every level of detail, streams have to know before it freezes)
+        at = tuple(self.last_loc)
+        for slc in reversed(self.branch):
+            if tuple(slc.center) == at:
+                slc.junction = True
+                return slc
+        return None
+    
+    def can_grow(self):
+        return self.stop_age.value == 0 or self.age < self.stop_age.value - 1
+    
+    def can_bifurcate(self):
+        counter = self.bifurc_stop.value == 0 or self.bifurc_count < self.bifurc_stop.value
+        gen = self.max_generation.value == 0 or self.generation < self.max_generation.value
+        return counter and gen
+
+    # Actions
+    
+    def photolocate(self):
+        if not self.can_grow():
+            return False
+        #negage = 1.0 if self.age == 0 else 1.0 / self.age
+        #self.direction = self.direction + (self.light_axis * strength * negage)
+        # shaded tips turn toward the light harder (exposure is 1.0 without a LightField)
+        self.direction = self.direction.lerp(self.light_axis, self.photolocate_ratio.next() * (2.0 - self.exposure))
+        return True
+        
+    def geolocate(self):
+        if not self.can_grow():
+            return False
+        #negage = 1.0 if self.age == 0 else 1.0 / self.age
+        #self.direction = self.direction + (self.gravity_axis * strength * negage)
+        self.direction = self.direction.lerp(-self.gravity_axis, self.geolocate_ratio.next())
+        return True
+            
+    def grow(self):
+        # Replace with NN
+
+        # Always grow branch first
+        tr = self.tracer
+        if tr is not None:
+            tr.enter("cells")       # Params included, see growf.trace
+            frozen = len(self.growing)
+        if self.settling is None:
+            for slice in self.branch:
+                slice.grow(tr)
+        else:
+            growing = []
+            for slice in self.growing:
+                if self.settling.settled(slice):
+                    slice.freeze()
+                    if self.settling.on_freeze is not None:
+                        self.settling.on_freeze(self, slice)
+                else:
+                    slice.grow(tr)
+                    growing.append(slice)
+            self.growing = growing
+        if tr is not None:
+            tr.leave()
+            grown = self.branch if self.settling is None else self.growing
+            frozen = 0 if self.settling is None else frozen - len(grown)
+            tr.count(slices=len(grown), cells=sum(len(slc) for slc in grown), frozen=frozen)
+
+        if self.can_grow():
+            # cheating without using hormones to control direction
+            self.photolocate()
+            self.geolocate()
+    
+            self.last_loc = self.loc
+            self.loc = self.loc + (self.direction * self.speed.next())
+            self.rq = self.update_q()
+            
+            # Lay down slice
+            self.new_slice()
+            #self.cur_slice = self.branch.append(Slice(self.cell_res, start_radius=self.start_radius, center=self.loc, normal=self.direction, proto_cell=self.proto_cell))
+            #self.speed *= self.speed_decay.next()
+        
+        self.age += 1
+        return self.bifurcate()
+
+    def bifurcate(self):
+        if self.age % self.bifurc_period.value == 0 and self.can_bifurcate() and self.can_grow():
+            vects = self.bifurcate_dir()
+            self.bifurc_count += 1
+            self.bifurc_period.next()
+            self.bifurcations.next()
+            self.biphase_offset.next()
+            self.bifurc_sr.next()
+            self.bifurc_inclination.next()
+            self.bifurc_radius_ratio.next()
+            self.bifurc_stop.next()
+            self.stop_age.next()
+            self.max_generation.next()
+            self.speed_decay.next()
+            self.photolocate_ratio.next()
+            self.geolocate_ratio.next()
+            return vects
+        else:
+            return None
+    # Util
+    
+    def bifurcate_dir(self):
+        # returns a list of directions for new tips to grow in
+        # use direction of growth's normal for lat
+        v1 = self.direction
+        # use number of bifurcations as longitudinal slice width for branch direction
+        mp2 = math.pi * 2
+        r = mp2 / self.bifurcations.value
+        p = mp2 * self.phase
+        #print(self.bifurcations, r, p, self.phase)
+        o = []
+        for i in range(0, self.bifurcations.value):
+            x = math.sin(r * i + p)
+            y = math.cos(r * i + p)
+            v2 = Vector((x, y, 0.0))
+            # Rotate v2 so that v1 is it's (x,y) plane's normal
+            # ie: make v2 orthogonal to v1 (the direction of growth for this tip)
+            v2.rotate(self.rq) # = self.normal_transpose(v2, v1)
+            v2 = v2.lerp(v1, self.bifurc_inclination.value)
+            o.append(v2 + self.loc)
+        #print(o)
+        self.phase += self.biphase_offset.value
+        return o
+        
+class Shoot(Tip):
+    def __init__(self, branch, loc, dir=(0.0, 0.0, 1.0), speed=0.45, hormones=[], data={}, bifurcation=(4, 2, 0.33, 0.618, 0.4, 0.8, 0, 0, 10), cell_res=8, start_at_0=True, start_radius=(0.01, 0.01), cell_growth=None, dna=None, engine=None, settling=None, rng=None, skeleton=False):
+        super().__init__(branch, loc, dir=dir, speed=speed, hormones=hormones, data=data, bifurcation=bifurcation, cell_res=cell_res, start_at_0=start_at_0, start_radius=start_radius, cell_growth=cell_growth, dna=dna, engine=engine, settling=settling, rng=rng, skeleton=skeleton)
+        # Shoots are positively phototropic (towards the light), negatively geotropic (away from gravity)
+        # Shoots react to certain hormones in different ways (auxins are what cause the above)
+        # ie: in the cells dropped, the auxins accumulate on a shaded side
+        # the cells will be able to share auxins with it's neighbors
+        # depending on the calculated light the cell is receiving
+        # as the auxins will accumulate mostly in the side that is
+        #   a) in the shade
+        #   b) in the direction of gravity
+        # causing the negative effect because auxins generate growth 
+        # causing the cells to grow faster in the growth direction
+        
+class Root(Tip):
+    def __init__(self, branch, loc, dir=(0.0, 0.0, 1.0), speed=0.3, hormones=[], data={}, bifurcation=(4, 3, 0.5, 0.618, 0.4, 0.8, 0, 0, 10), cell_res=8, start_at_0=True, start_radius=(0.01, 0.01), cell_growth=None, dna=None, engine=None, settling=None, rng=None, skeleton=False):
+        super().__init__(branch, loc, dir=dir, speed=speed, hormones=hormones, data=data, bifurcation=bifurcation, cell_res=cell_res, start_at_0=start_at_0, start_radius=start_radius, cell_growth=cell_growth, dna=dna, engine=engine, settling=settling, rng=rng, skeleton=skeleton)
+        # Roots are negatively phototropic and positively geotropic
+        
+
+# Hormonal system
+
+class Hormone():
+    
+    # Known as phytofaormones or plant growth substances
+    # Control morphological, physiological and biochemical responses at very low concentrations
+    # Hormones act locally as they are disolved usually through the cells in the shaft backward
+    AUXINS = 1010
+    GIBBERELLINS = 1011
+    CYTOKININS = 1012
+    ETHYLENE = 1013
+    ABSCISIC = 1014    #abscisic acid
+    BRASSINO = 1015    #brassinosteroids
+    OLIGO = 1016       #oligosaccharides
+    POLYAMINES = 1017
+    
+    def __init__(self, type, volume, makeup=None):
+        self.type = type
+        self.volume = volume
+        self.makeup = makeup
+        
+    # Uses some volume of the hormone 
+    def use(self, volume):
+        o = self.volume
+        v = self.volume - volume
+        if v < 0:
+            self.volume -= o
+            return o
+        else:
+            self.volume -= volume
+            return volume
+        
+class Auxin(Hormone):
+    
+    # Auxins are transported basipetally through polar transport cell to cell
+    # they stay away from the light, the cell they are in will grow in growth direction
+    # If all neighboring cells in a slice are 
+    
+    IAA = 1050 # Indole-3 -acetic acid (Synthesized in the Tip) (human synthesized from tryptophan)
+                # delays shedding of leafs, promotes seedless fruits
+                # stimulates differentiation of xylem and phloem
+                # promote formation of lateral and adventitious roots
+
+    # Synthetics (cause flowering, fruiting, stimulate root growth from any cell)
+    NAA = 1051 # Synthetic (Napthalene acetic acid)
+    IBA = 1052 # Synthetic (Indolebutyric acid)
+
+    # Herbicides
+    _24D = 1053 # Synthetic (Dicholorophenoxyacetic acid)
+    _245T = 1054 # Synthetic (Tricholrophenoxyacetic acid)
+    
+    def __init__(self, volume, makeup=IAA):
+        super().__init__(Hormone.AUXINS, volume, makeup=makeup)
+    
+class Cytokinin(Hormone):
+    
+    # Works together with auxins to promote growth
+    # related to cell division and differentiation
+    # Synthesized in root apical meristem
+    # transported upward
+    # promotes lateral bud growth and choloroplast maturation
+    # promotes nutrient mobilization from parts to leaves
+    # delays leaf senescence (Richmond-Lang effect)
+    # Stimulate the release of dormancy of seeds and buds
+    # Increases resistance to adverse factors
+    
+    ZEATIN = 1060  # Trans-6 Purine    
+    
+    def __init__(self, volume, makeup=ZEATIN):
+        super().__init__(Hormone.CYTOKININS, volume, makeup=makeup)
+        
+class Gibberellins(Hormone):
+    
+    # Synthesis of this occurs in young leaves and buds, developing seeds, fruits and roots
+    # transported by non-polar method
+    
+    GAG = 1070  # GAg (gibberelic acid)
+    GA1 = 1071
+    GA2 = 1072
+    GA3 = 1073  # Causes extension of stem due to cell elongation, externally applied induces parthenocarpy
+    
+    def __init__(self, volume, makeup=GAG):
+        super().__init__(Hormone.GIBBERELLINS, volume, makeup=makeup)
+        
+class Ethylene(Hormone):
+    
+    # Synthesis of this occurs in young leaves and buds, developing seeds, fruits and roots
+    # transported by non-polar method
+    
+    def __init__(self, volume):
+        super().__init__(Hormone.ETHYLENE, volume)
+
+
+        
+# Util functions for Params
+
+def prng(value, param):
+    return (value * (param.max - param.min)) + param.min
+
+def p_log(param):
+    return prng(math.log(param.value - param.min), param)
+
+def p_log_r(param):
+    return prng(1 / math.log((param.count + 1) * 10), param)
+
+def p_rat(param):
+    return param.value * param.freq
+
+def p_none(param):
+    return param.value
+
+def p_sin1(param):
+    return prng(math.sin(param.value - param.min) + 1.0, param)
+
+def p_sin(param):
+    o = prng((math.sin(param.count * param.freq) + 1.0) * 0.5, param)
+    return o
+    
+def p_square(param):
+    return prng(int((math.sin(param.count * param.freq) + 1.0) * 0.5), param)
+
+def p_square_y(param):
+    return prng(int((math.cos(param.count * param.freq) + 1.0) * 0.5), param)
+    
+def p_sin2(param):
+    return prng(math.sin(param.count * param.value) + 1.0, param)
+
+def p_cos1(param):
+    return prng((math.cos(param.value - param.min) + 1.0) * 0.5, param)
+
+def p_cos(param):
+    return prng((math.cos(param.count * param.freq) + 1.0) * 0.5, param)
+
+def p_spike(param):
+    return prng(1.0 - abs(math.sin(param.count * param.freq)), param)
+
+def p_spike_y(param):
+    return prng(1.0 - abs(math.cos(param.count * param.freq)), param)
+
+def p_bump(param):
+    return prng(abs(math.sin(param.count * param.freq)), param)
+
+def p_bump_y(param):
+    return prng(abs(math.sin(param.count * param.freq)), param)
+
+def p_rlog(param):
+    return prng(math.sin(param.value - param.min) + 1.0, param)
+
+def p_tanh(param):
+    return prng((math.tanh((param.count * param.freq) - 2) + 1) * 0.5, param)
+
+def p_tanh_r(param):
+    return prng((-math.tanh((param.count * param.freq) - 2) + 1) * 0.5, param)
+
+def p_random(param):
+    rng = random if param.rng is None else param.rng
+    return prng(rng.random(), param)
+
+def p_random_int(param):
+    return int(p_random(param))
+
+def p_lin(param):
+    o = param.value + param.freq
+    if o > param.max:
+        o = o - param.max + param.min
+    return o
+
+def p_lin_r(param):
+    o = param.value - param.freq
+    if o < param.min:
+        o = o - param.min + param.max
+    return o
+
+# Wave functions by name: serialized DNA (growf.genome) refers to them by these names
+# A custom wave function has to be registered (in every process that loads the DNA) before its DNA can be serialized
+WAVES = {f.__name__: f for f in (
+    p_log, p_log_r, p_rat, p_none, p_sin1, p_sin, p_square, p_square_y, p_sin2, p_cos1, p_cos,
+    p_spike, p_spike_y, p_bump, p_bump_y, p_rlog, p_tanh, p_tanh_r, p_random, p_random_int, p_lin, p_lin_r,
+)}
+
+def register_wave(func, name=None):
+    WAVES[func.__name__ if name is None else name] = func
+    return func
+
+def p_tuple_next(bt):
+    o = []
+    for i in bt:
+        o.append(i.next())
+    return tuple(o)
+
+def p_tuple_first(bt):
+    o = []
+    for i in bt:
+        o.append(i.first())
+    return tuple(o)
+
+# 3D Vector utility functions
+
+def rot_q(v):
+    # Returns a Quaternion rotation where a point on an (x, y) plane turns to face vector (v) as the new z axis
+    # Use the output of this function as the argument to the mathutils Vector.rotate() function
+    return _Z.rotation_difference(v.normalized())
+
+#class Gene():
+#    def __init__(self):
+  
+class Tree():
+    def __init__(self, name="Tree", seed_r="GrowF", engine=False, settling=None, compiled=False, compact=False, cache=None, skeleton=False, hormones=None, light=None, spatial=None):
+        self.genome = DNA(seed_r)   # the growth instructions, never advanced: every begin() grows from fresh copies of them
+        self.dna = self.genome      # the copies a planted tree is advancing, the genome itself until begin()
+        self.age = 0
+        self.name = name
+        self.random_seed = seed_r
+        self.tips = []              # every tip in the order it was created, for meshing and export
+        self.active = []            # tips that are still grown every step, in the same order
+        self.dormant = []           # tips that can't grow and whose slices have all settled, see retire
+        self.use_engine = engine    # True grows all cells with the batched NumPy CellEngine instead of per Cell
+        self.compact = compact      # True keeps cells only as float32 engine rows, no Cell objects (implies engine)
+        self.engine = None
+        self.settling = settling    # a Settling policy freezes finished slices so they are no longer re-grown
+        self.tracer = None          # a growf.trace.Tracer records timings and counts of every growth step when attached
+        self.compiled = compiled    # True gives cells and slices views of shared DNA Schedules instead of their own Param copies
+        self.cache = cache          # a growf.cache.GrowthCache that plant() restores grown trees from and stores them in
+        self.skeleton = skeleton    # True grows only the branching structure: tip paths, no slices or cells (see growf.skeleton)
+        self.hormones = hormones    # a growf.hormones.HormoneTransport moves hormones between cells and feeds them back into growth (implies engine)
+        self.light = light          # a growf.light.LightField computes the light exposure of every cell and tip (implies engine)
+        self.spatial = spatial      # a growf.spatial.SpatialHash keeps branches from growing through each other (implies engine)
+        self.rng = GrowthRandom(seed_r)
+        
+        # Working vars
+        self.cell_count = 0
+        
+    # Seed Construction and Pre-Seed functions
+    #  TODO: add a method that loads tips directly from DNA
+    
+    def add_tip(self, tip):
+        tip.dna = self.dna
+        self.tips.append(tip)
+        self.active.append(tip)
+        
+    def set_dna(self, dna):
+        self.genome.data = dna.data
+        self.dna = self.genome
+        
+    # Actions
+    
+    def init_dna(self):
+        # fills in the default growth instructions for every genome section that wasn't set and returns the genome
+        # Growth Instructions
+        # Each section has a tuple of Param objects which define a finitely infinite series 
+        # between bifurc, branches, situation, tip growth ratio, tip growth angle, stop branching, stop growing, level depth, speed, speed decay
+        bparams = self.genome.setdefault("branch", (
+            Param(2, vmin=3, vmax=8, func=[8], freq=10),                            # section height; steps between bifurcation (integer)
+            Param(1, vmin=1, vmax=4, func=[1,1,2,3], freq=1),                       # number of branches on bifurcation (integer)
+            Param(0.15, vmin=0.0, vmax=0.5, func=p_sin, freq=0.5),                    # radial branch angle
+            Param(0.718, vmin=0.9, vmax=1.0, func=p_none, freq=1),                  # tip growth ratio (float)
+            Param(0.5, vmin=0.2, vmax=0.7, func=p_sin, freq=0.3),                     # branch inclination (0.0 - 1.0)
+            Param(0.3, vmin=0.0, vmax=0.8, func=p_sin, freq=1.0),                  # radial branch angle offset per branch (0.0 - 1.0)
+            Param(4, vmin=5, vmax=12, func=p_none, freq=1.0),                       # stop branching at growth steps (integer: 0 = no limit)
+            Param(20, vmin=0, vmax=20, func=p_none, freq=1.0),                       # stop growing at growth steps (integer: 0 = no limit)
+            Param(4, vmin=3, vmax=20, func=p_none, freq=1.0),                       # level depth (integer)
+            Param(0.35, vmin=0.1, vmax=0.6, func=p_sin, freq=0.5),                 # tip growth/movement speed per growth step
+            Param(0.97, vmin=0.618, vmax=1.11, func=p_none, freq=5),                # speed decay decay of speed per growth step
+            Param(0.04, vmin=-0.2, vmax=0.2, func=p_none, freq=10),                 # photolocate ratio
+            Param(0.02, vmin=0.02, vmax=0.02, func=p_none, freq=10),                # geolocate ratio
+            Param(3.0, vmin=0.5, vmax=3.0, func=p_tanh_r, freq=0.),                 # radial growth rate coefficient for all cells on branch, declines on bifurcation
+        ))
+
+        #(x scale, y scale, x growth coefficient, y growth coefficient, growth rate all, rate ease radial, rate ease away)
+        start_radius = self.genome.setdefault("slice", (
+            Param(0.01, vmin=0.005, vmax=0.05, func=p_tanh_r, freq=100),  # x scale (initial radial placement around tip)
+            Param(0.01, vmin=0.005, vmax=0.05, func=p_tanh_r, freq=3),             # y scale
+            Param(1.0,  vmin=1.0, vmax=5.0, func=p_sin, freq=100),              # x growth coefficient
+            Param(1.0,  vmin=1.0, vmax=5.0, func=p_cos, freq=100),              # y growth coefficient
+            Param(1.0, vmin=1.0, vmax=2.0, func=p_tanh_r, freq=0.2),              # growth rate all
+            Param(1.0, vmin=0.1, vmax=2.0, func=p_sin, freq=0.5),              # ease rate: radial growth
+            Param(1.0, vmin=0.1, vmax=2.0, func=p_cos, freq=0.5),              # ease rate: away from neighbors
+        ))
+        # Cell Instructions: These parameters iterate over the lifetime of the individual cell
+        # cell growth, cell resolution, minimum neighbor distance, cell "toward" movement ease, cell ease for "away"
+        cell = self.genome.setdefault("cell", (
+            Param(3.0, vmin=0.5, vmax=5.0, func=p_tanh, freq=8),        # cell growth rate
+            Param(16),                                                          # cell resolution (how many cells on the surface of each slice)
+            Param(0.001, vmin=0.001, vmax=0.002, func=p_none, freq=1.0),        # minimum neighbor distance (distance/closeness at which cell moves away from neighbor)
+            Param(0.05, vmin=0.01, vmax=0.2, func=p_sin, freq=8),              # ease rate: "toward" the neighbors
+            Param(0.01, vmin=0.01, vmax=0.5, func=p_none, freq=1),              # ease rate: "away" from neighbors that are too close
+            Param(0.175, vmin=0.175, vmax=0.448, func=p_tanh_r, freq=0.3),       # hue
+            Param(0.336, vmin=0.162, vmax=0.436, func=p_tanh_r, freq=0.3),       # saturation
+            Param(0.934, vmin=0.564, vmax=0.934, func=p_tanh_r, freq=0.3),       # brightness
+        ))
+        return self.genome
+
+    def begin(self, location=(0.0, 0.0, 0.0), direction=(0.0, 0.0, 1.0)):
+        # growth advances Params, so planting again (or the same genome in another tree) starts from fresh copies
+        self.dna = self.init_dna().clone()
+        cell = self.dna.get("cell")
+        cell_growth, cell_res = cell[0], cell[1]
+        
+        self.cell_count = cell_res.value
+        # Random wave functions draw from this tree's generator, give every concurrently growing tree its own DNA
+        for section in self.dna.data.values():
+            for p in section:
+                p.rng = self.rng
+        self.dna.compiled = self.compiled
+
+        # Comment this out if you want to set specific starting bifurcation parameters
+        #bifurc = p_tuple_next(bparams)
+        #srad = p_tuple_next(start_radius)
+        
+        dir_init = Vector(direction)
+        self.engine = None
+        if self.skeleton:
+            pass                # no cells to grow
+        elif self.compact:
+            from .engine import CellEngine
+            self.engine = CellEngine(self.dna, rng=self.rng, dtype="float32", compact=True)
+        elif self.use_engine or self.hormones is not None or self.light is not None or self.spatial is not None:
+            from .engine import CellEngine
+            self.engine = CellEngine(self.dna, rng=self.rng)
+        if self.hormones is not None:
+            self.hormones.attach(self.engine)
+        if self.light is not None:
+            self.light.attach(self.engine)
+        if self.spatial is not None:
+            self.spatial.attach(self.engine)
+
+        # print(cell_res, cell_growth)
+        u1 = Shoot(None, location, dir=dir_init.normalized(), dna=self.dna, cell_res=cell_res, cell_growth=cell_growth, engine=self.engine, settling=self.settling, rng=self.rng, skeleton=self.skeleton)
+        self.tips = [u1]
+        self.active = [u1]
+        self.dormant = []
+    
+    def plant(self, growth_steps=1, location=(0.0, 0.0, 0.0), direction=(0.0, 0.0, 0.0), checkpoint=None, every=10):
+        # A branch is a tip's location history stored as a Slice which consists of Cells
+        # checkpoint: snapshot file written every `every` growth steps, when it exists planting grows on from it instead
+        # (for long runs that can be interrupted, run the same plant() again to finish)
+
+
+        # Set the random seed, can be set also by the GA
+        self.rng.seed(a=self.random_seed, version=2)
+
+        # A cache can hand back this tree grown growth_steps, or fewer steps to grow on from
+        key = None if self.cache is None else self.cache.key(self)
+        if checkpoint is not None and os.path.exists(checkpoint):
+            self.restore(checkpoint)
+            done = start = self.age
+        else:
+            done = start = 0 if key is None else self.cache.restore(self, key, growth_steps)
+            if done == 0:
+                self.begin()
+        while done < growth_steps:
+            n = growth_steps - done if checkpoint is None else min(every, growth_steps - done)
+            self.grow(steps=n)
+            done += n
+            if checkpoint is not None:
+                self.snapshot(checkpoint)
+        if key is not None and start < growth_steps:
+            self.cache.store(self, key, growth_steps)
+
+    def snapshot(self, path):
+        # writes the whole growth state to path (see growf.state), restore() continues from it exactly
+        from .state import save
+        return save(self, path)
+
+    def restore(self, path):
+        # replaces this tree's growth state with the snapshot at path, keeping its settling policy, tracer and cache
+        from .state import load
+        return load(path, self)
+
+    def grow(self, steps=1):
+        bparams = self.dna.get("branch")
+        start_radius = self.dna.get("slice")
+        cell = self.dna.get("cell")
+        cell_growth, cell_res = cell[0], cell[1]
+
+        # Growth loop (z = age = generations in CA or whatever time is calculated as)
+        nv = None
+        tr = self.tracer
+        for z in range(0, steps):
+            if tr is not None:
+                tr.begin_step(self.age)
+            dormant = len(self.dormant)
+            active = []
+            for t in self.active: # For all Tips still growing (bifurcation appends to self.active, those grow this step too)
+                t.tracer = tr
+                if tr is not None:
+                    tr.enter("tip")
+                eg = t.grow()
+                if tr is not None:
+                    tr.leave()
+                self.cell_count += cell_res.next()
+                
+                if eg is not None:  # Bifurcation
+                    if tr is not None:
+                        tr.enter("bifurcation")
+                        tr.count(new_tips=len(eg))
+                    bifurc = p_tuple_next(bparams)
+                    for e in eg:
+                        dir = e - t.loc
+                        #bifurc = p_tuple_next(bparams) # Comment out to use uniform bifurcation parameters
+                        #srad = p_tuple_next(start_radius)
+                        #print(bifurc, t, dir, t.last_loc)
+                        #nt = Shoot(t, tuple(t.last_loc), dir=dir.normalized(), dna=self.dna, bifurcation=bifurc, cell_res=cell_res, start_radius=srad, cell_growth=cell_growth)
+                        nt = Shoot(t, tuple(t.last_loc), dir=dir.normalized(), dna=t.dna, cell_res=cell_res, cell_growth=cell_growth, engine=t.engine, settling=t.settling, rng=t.rng, skeleton=t.skeleton)
+                        nt.phase = t.phase
+                        nt.light_axis, nt.gravity_axis = t.light_axis, t.gravity_axis   # the world the parent grows in
+                        nt.generation = t.generation + 1
+                        nt.max_generation = t.max_generation
+                        nt.cache_vertex = nv
+                        self.tips.append(nt)
+                        self.active.append(nt)
+                    t.mark_junction()
+                    if tr is not None:
+                        tr.leave()
+                if t.growing or t.can_grow():
+                    active.append(t)
+                else:
+                    self.retire(t)
+            self.active = active
+            # A dormant tip's grow() would only count its age and the tree's cell_res, that is done here instead
+            # (a cell resolution with a wave function would see these next() calls in a different order)
+            for i in range(dormant):
+                self.cell_count += cell_res.next()
+            if self.light is not None and self.engine is not None:
+                if tr is not None:
+                    tr.enter("light")
+                self.light.step(self)
+                if tr is not None:
+                    tr.leave()
+            if self.hormones is not None and self.engine is not None:
+                if tr is not None:
+                    tr.enter("hormones")
+                self.hormones.step(self)
+                if tr is not None:
+                    tr.leave()
+            if self.spatial is not None and self.engine is not None:
+                if tr is not None:
+                    tr.enter("spatial")
+                self.spatial.step(self)
+                if tr is not None:
+                    tr.leave()
+            if self.engine is not None:
+                if tr is not None:
+                    tr.enter("engine")
+                self.engine.step()
+                if tr is not None:
+                    tr.leave()
+            self.age += 1
+            if tr is not None:
+                tr.end_step(tips=len(self.active), dormant=len(self.dormant))
+        for t in self.dormant:
+            t.age += self.age - t.dormant_since
+            t.dormant_since = self.age
+
+    def retire(self, tip):
+        # A tip that can't grow (or bifurcate, which needs growth) and has no unsettled slices left won't change anymore.
+        # It leaves the growth loop, its mesh stays in self.tips. Without a Settling policy slices never settle, so
+        # tips never go dormant.
+        tip.dormant_since = self.age + 1
+        tip.tracer = None
+        self.dormant.append(tip)
+            
+    def make_skeleton(self, tip_radius=None):
+        # Blender only, the adapter is imported here so the core never needs bpy (growf.skeleton has the arrays)
+        from . import blender
+        return blender.make_skeleton(self, tip_radius=tip_radius)
+
+    def link_columns(self):
+        # Links every cell to the cell at the same ring index on the slice below it, and back
+        # Tree.show has always done this while meshing, it now lives here so meshing itself doesn't change the tree
+        # Only the slices are linked (below/above), so calling this again only links slices grown since the last call
+        for tip in self.tips:
+            prev = None
+            for slc in tip.branch:
+                if prev is not None and slc.below is None:
+                    slc.below = prev
+                    prev.above = slc
+                prev = slc
+
+    def describe(self):        
+        print("Name:", self.name)
+        print("Age:", self.age)
+        print("Tips:", len(self.tips))
+        print("Cells:", self.cell_count)
+
+    def show(self, lod=0):
+        # Blender only, the adapter is imported here so the core never needs bpy
+        # lod: level of detail, every 2**lod-th cell of a ring and slice of a branch (see growf.mesh)
+        from . import blender
+        if self.tracer is None:
+            return blender.show(self, lod=lod)
+        self.tracer.enter("mesh")
+        try:
+            return blender.show(self, lod=lod)
+        finally:
+            self.tracer.leave()
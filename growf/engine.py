@@ -0,0 +1,465 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+# Batched NumPy growth engine for the surface cells of a Tree (Tree(engine=True))
+
+import numpy as np
+
+from .core import GrowthRandom, Schedule, ScheduledParam
+from .vector import Vector, Color
+
+# ParamTrack is the NumPy side of a DNA Schedule (see growf.core): all cells that copied the same DNA entry share one
+# table of its values indexed by their age instead of calling next() on their own copy every step
+class ParamTrack():
+    def __init__(self, schedule):
+        self.schedule = schedule
+        self.values = np.zeros(0)
+
+    def extend(self, n):
+        if len(self.values) >= n:
+            return
+        self.schedule.extend(n)
+        self.values = np.array(self.schedule.values, dtype=np.float64)
+
+    def at(self, rows, ages):
+        # value returned by the (age + 1)th call to next(), for an array of ages
+        self.extend(int(ages.max()) + 1 if len(ages) else 0)
+        return self.values[ages]
+
+    def state(self, row, age):
+        # (value, count, cfunc) of a copy that has had next() called age times
+        return self.schedule.state(age)
+
+    def value_of(self, rows, ages):
+        # current value of copies that have had next() called age times, for an array of ages
+        self.extend(int(ages.max()) if len(ages) else 0)
+        return np.concatenate(([self.schedule.first[0]], self.values))[ages]
+
+    def view(self, row, age):
+        return self.schedule.view(age)
+
+# ParamRows takes the place of a ParamTrack when the DNA entry draws random numbers (p_random, p_random_int) and a
+# Schedule can't replay it: every row keeps the (value, count, cfunc) of its own copy in a column of the engine's
+# param_value, param_count and param_cfunc, advanced with next() one row at a time when the engine schedules a slice,
+# in the order the per-object Cells call it, so the random stream stays the same
+class ParamRows():
+    def __init__(self, engine, name, param, column):
+        self.engine = engine
+        self.name = name            # the Cell attribute of the Param
+        self.param = param          # the DNA entry, what new rows start as
+        self.column = column
+        self.scratch = param.copy()
+        self.scratch.rng = engine.rng
+
+    def start(self, i0, params=None):
+        # state of new rows from i0 on: their Cells' copies, or fresh copies of the DNA entry (compact rows)
+        e, k, p = self.engine, self.column, self.param
+        if params is None:
+            e.param_value[i0:e.count, k], e.param_count[i0:e.count, k], e.param_cfunc[i0:e.count, k] = p.orig, p.count, p.cfunc
+            return
+        for i, q in enumerate(params, i0):
+            e.param_value[i, k], e.param_count[i, k], e.param_cfunc[i, k] = q.value, q.count, q.cfunc
+
+    def next(self, row):
+        e, k, p = self.engine, self.column, self.scratch
+        p.value, p.count, p.cfunc = e.param_value[row, k].item(), int(e.param_count[row, k]), int(e.param_cfunc[row, k])
+        e.param_value[row, k] = p.next()
+        e.param_count[row, k], e.param_cfunc[row, k] = p.count, p.cfunc
+
+    def at(self, rows, ages):
+        # the rows were advanced when their slice was scheduled
+        return self.engine.param_value[rows, self.column]
+
+    value_of = at
+
+    def state(self, row, age):
+        e, k = self.engine, self.column
+        return e.param_value[row, k].item(), int(e.param_count[row, k]), int(e.param_cfunc[row, k])
+
+    def view(self, row, age):
+        # a copy of the row's Param as it is now
+        p = self.param.copy()
+        p.value, p.count, p.cfunc = self.state(row, age)
+        p.rng = self.engine.rng
+        return p
+
+def hsv_to_rgb(h, s, v):
+    # colorsys.hsv_to_rgb for arrays, returns an (n, 3) array
+    h, s, v = np.asarray(h, dtype=np.float64), np.asarray(s, dtype=np.float64), np.asarray(v, dtype=np.float64)
+    i = np.floor(h * 6.0)
+    f = h * 6.0 - i
+    p = v * (1.0 - s)
+    q = v * (1.0 - s * f)
+    t = v * (1.0 - s * (1.0 - f))
+    i = i.astype(np.int64) % 6
+    r = np.choose(i, [v, q, p, p, t, v])
+    g = np.choose(i, [t, v, v, q, p, p])
+    b = np.choose(i, [p, p, t, v, v, q])
+    gray = s == 0.0
+    r, g, b = np.where(gray, v, r), np.where(gray, v, g), np.where(gray, v, b)
+    return np.stack((r, g, b), axis=1)
+
+# CellEngine keeps every surface cell of a Tree in contiguous NumPy arrays (structure of arrays) and runs
+# move_random, grow_radial, move_boids and growth_counters for all scheduled cells of a growth step at once.
+# Slices still create their Cell objects; the engine adopts them and writes its state back with sync().
+# Neighbors are not stored per cell: boids sums are a stencil over the rows of each slice (its ring kernel, plus the
+# same ring index on the slice below and above once Tree.link_columns has linked them, see topology). Only neighbors
+# added by hand with Cell.add_neighbor are kept as explicit (source row, destination row) links.
+# For a fixed seed it reproduces the per-object Cell path to within ENGINE_TOLERANCE (mathutils vectors are float32,
+# the engine works in float64) while cells are only ring linked, which is the state Tree.plant/Tree.grow leave them in.
+# Once Tree.show has linked slices vertically the engine steps all slices together instead of one after another,
+# so the two paths drift further apart.
+ENGINE_TOLERANCE = 1e-4
+#
+# Compact mode (CellEngine(compact=True), what Tree(compact=True) uses) goes one step further: slices write their
+# cells straight into engine rows and never create Cell objects, and positions and velocities are stored as float32 (like mathutils). A cell then costs about a hundred bytes instead of
+# a few kilobytes. Slice.views() hands out CellView objects for code that wants to look at single cells.
+
+class CellEngine():
+    def __init__(self, dna, rng=None, capacity=1024, dtype=np.float64, compact=False):
+        self.rng = GrowthRandom() if rng is None else rng     # the Tree's GrowthRandom
+        cell = dna.get("cell")
+        rowed = [k for k in range(3, 8) if not Schedule.replayable(cell[k])]
+        self.param_value = np.zeros((capacity, len(rowed)))                 # per row Param state of the ParamRows
+        self.param_count = np.zeros((capacity, len(rowed)), dtype=np.int64)
+        self.param_cfunc = np.zeros((capacity, len(rowed)), dtype=np.int64)
+        track = lambda name, k: ParamRows(self, name, cell[k], rowed.index(k)) if k in rowed else ParamTrack(dna.schedule("cell", k))
+        self.ease = track("ease", 3)
+        self.ease_away = track("ease_away", 4)
+        self.hue = track("hue", 5)
+        self.saturation = track("saturation", 6)
+        self.brightness = track("brightness", 7)
+        # ParamRows advanced before and after a cell's random vector, in the order of Cell.grow
+        self.rows_before = [t for t in (self.ease, self.ease_away) if isinstance(t, ParamRows)]
+        self.rows_after = [t for t in (self.hue, self.brightness, self.saturation) if isinstance(t, ParamRows)]
+
+        self.compact = compact  # slices add rows without Cell objects, see Slice.init_rows
+        self.count = 0
+        self.loc = np.zeros((capacity, 3), dtype=dtype)
+        self.v = np.zeros((capacity, 3), dtype=dtype)
+        self.nv = np.zeros((capacity, 3), dtype=dtype)
+        self.origin = np.zeros((capacity, 3), dtype=dtype)
+        self.origv = np.zeros((capacity, 3), dtype=dtype)
+        self.age = np.zeros(capacity, dtype=np.int64)
+        self.rate_growth_radial = np.zeros(capacity, dtype=dtype)
+        self.ease2 = np.zeros(capacity, dtype=dtype)
+        self.ease_away2 = np.zeros(capacity, dtype=dtype)
+        self.live = np.zeros(capacity, dtype=bool)  # False once the row's slice is frozen
+
+        self.cells = []         # adopted Cell objects, in row order (None for compact rows)
+        self.edges = []         # extra neighbor links (Cell.add_neighbor) as chunks of (source rows, destination rows)
+        self.dirty = False      # set by Cell.add_neighbor, the extra links are then read again from the cells
+        self.stale = True       # the extra link chunks need to be joined into src/dst before the next step
+        self.pending = []       # (slice, (n, 3) random draws) of slices scheduled this step
+        self.hormones = None    # the Tree's growf.hormones.HormoneTransport, which keeps its concentrations per row
+        self.spatial = None     # the Tree's growf.spatial.SpatialHash, pushes cells of different branches apart
+
+    def reserve(self, n):
+        cap = len(self.age)
+        if self.count + n <= cap:
+            return
+        while cap < self.count + n:
+            cap *= 2
+        for k in ("loc", "v", "nv", "origin", "origv", "age", "rate_growth_radial", "ease2", "ease_away2", "live", "param_value", "param_count", "param_cfunc"):
+            a = getattr(self, k)
+            b = np.zeros((cap,) + a.shape[1:], dtype=a.dtype)
+            b[:self.count] = a[:self.count]
+            setattr(self, k, b)
+
+    def add_slice(self, slc):
+        cells = slc.cells
+        n = len(cells)
+        self.reserve(n)
+        i0, i1 = self.count, self.count + n
+        self.loc[i0:i1] = [tuple(c.loc) for c in cells]
+        self.v[i0:i1] = [tuple(c.v) for c in cells]
+        self.nv[i0:i1] = [tuple(c.nv) for c in cells]
+        self.origin[i0:i1] = [tuple(c.origin) for c in cells]
+        self.origv[i0:i1] = [tuple(c.origv) for c in cells]
+        self.age[i0:i1] = [c.age for c in cells]
+        self.rate_growth_radial[i0:i1] = [c.rate_growth_radial for c in cells]
+        self.ease2[i0:i1] = [c.ease2 for c in cells]
+        self.ease_away2[i0:i1] = [c.ease_away2 for c in cells]
+        self.live[i0:i1] = True
+        for i, c in enumerate(cells):
+            c.engine = self
+            c.index = i0 + i
+        self.edges.append(self.links(cells))
+        self.cells.extend(cells)
+        self.count = i1
+        for t in self.rows_before + self.rows_after:
+            t.start(i0, [getattr(c, t.name) for c in cells])
+        self.stale = True
+        slc.span = (i0, n)
+
+    def add_rows(self, slc, cells):
+        # compact slices: cells are (location, original growth vector, velocity, radial growth rate, ease2, ease_away2)
+        n = len(cells)
+        self.reserve(n)
+        i0, i1 = self.count, self.count + n
+        loc, origv, v, rate, ease2, ease_away2 = zip(*cells)
+        self.loc[i0:i1] = loc
+        self.origin[i0:i1] = loc
+        self.origv[i0:i1] = origv
+        self.v[i0:i1] = v
+        self.nv[i0:i1] = 0.0
+        self.age[i0:i1] = 0
+        self.rate_growth_radial[i0:i1] = rate
+        self.ease2[i0:i1] = ease2
+        self.ease_away2[i0:i1] = ease_away2
+        self.live[i0:i1] = True
+        self.cells.extend([None] * n)
+        self.count = i1
+        for t in self.rows_before + self.rows_after:
+            t.start(i0)
+        self.stale = True
+        slc.span = (i0, n)
+
+    def block(self, slc):
+        # float32 (n, 6) rows of x, y, z, r, g, b of a slice, what Slice.freeze keeps
+        i0, n = slc.span
+        rows = np.arange(i0, i0 + n)
+        out = np.empty((n, 6), dtype=np.float32)
+        out[:, :3] = self.loc[rows]
+        out[:, 3:] = self.colors(rows)
+        return out
+
+    def links(self, cells):
+        src, dst = [], []
+        for c in cells:
+            if c is None:
+                continue
+            for nb in c.extra or ():
+                src.append(nb.index)
+                dst.append(c.index)
+        return np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64)
+
+    def relink(self):
+        # rebuild the extra links after cells got neighbors with Cell.add_neighbor
+        self.edges = [self.links(self.cells)]
+
+    def schedule(self, slc):
+        # The per-object path draws a random vector for every cell in move_random, the same draws are taken here
+        # (one block per slice, in the same order) so the random stream, and with it every cell born later, stays identical
+        # Params that draw random numbers themselves (ParamRows) are advanced around each cell's draws, like Cell.grow does
+        i0, n = slc.span
+        if not (self.rows_before or self.rows_after):
+            self.pending.append((slc, self.rng.block(n)))
+            return
+        rnd = self.rng.random
+        draws = np.empty((n, 3))
+        for i in range(i0, i0 + n):
+            for t in self.rows_before:
+                t.next(i)
+            draws[i - i0] = rnd(), rnd(), rnd()
+            for t in self.rows_after:
+                t.next(i)
+        self.pending.append((slc, draws))
+
+    def release(self, slc):
+        # a frozen slice leaves the engine's bookkeeping, its rows stay (Slice.freeze copied them, neighbors still read them)
+        i0, n = slc.span
+        for i in range(i0, i0 + n):
+            self.cells[i] = None
+        self.live[i0:i0 + n] = False
+        self.stale = True
+
+    def step(self):
+        if not self.pending:
+            return
+        if self.dirty:
+            self.relink()
+            self.dirty = False
+            self.stale = True
+        if self.stale:
+            # links into frozen rows are dropped, so the cost of a step follows the cells still growing
+            src = np.concatenate([e[0] for e in self.edges] + [np.zeros(0, dtype=np.int64)])
+            dst = np.concatenate([e[1] for e in self.edges] + [np.zeros(0, dtype=np.int64)])
+            keep = self.live[dst]
+            self.src, self.dst = src[keep], dst[keep]
+            self.edges = [(self.src, self.dst)]
+            self.degree = np.bincount(self.dst, minlength=self.count)
+            self.stale = False
+        spans = [slc.span for slc, d in self.pending]
+        idx = np.concatenate([np.arange(i0, i0 + n) for i0, n in spans])
+        draws = np.concatenate([d for slc, d in self.pending])
+        slices = [slc for slc, d in self.pending]
+        self.pending = []
+
+        age = self.age[idx]
+        ease = self.ease.at(idx, age)
+        ease_away = self.ease_away.at(idx, age)
+
+        self.move_random(idx, draws, flat=False)
+        self.grow_radial(idx, age)
+        self.move_boids(idx, self.topology(slices), ease, ease_away)
+        if self.spatial is not None:
+            self.spatial.repel(idx)
+        self.growth_counters(idx)
+        self.update(idx)
+
+        speed = np.sqrt((self.v[idx] ** 2).sum(axis=1))
+        starts = np.cumsum([0] + [n for i0, n in spans[:-1]])
+        for slc, d in zip(slices, np.maximum.reduceat(speed, starts)):
+            slc.displacement = float(d)
+
+    def move_random(self, idx, draws, flat=True):
+        vmax = 0.2
+        nv = self.nv[idx] * (draws * (vmax * 2) - vmax)
+        if flat:
+            nv[:, 2] = 0.0
+        self.nv[idx] = nv
+
+    def grow_radial(self, idx, age):
+        v = self.origv[idx] * (1 / (age + 1))[:, None]
+        self.nv[idx] = v * self.rate_growth_radial[idx][:, None]
+
+    def topology(self, slices):
+        # The neighbors of the scheduled cells (in the order of slices) as [(positions, neighbor rows)], positions None
+        # meaning all of them: one entry per ring offset of the kernel, then the same ring index on the slice below
+        # and above, when linked, still growing and big enough (the ring sizes of a branch can differ)
+        ns = np.array([slc.span[1] for slc in slices])
+        i0 = np.repeat([slc.span[0] for slc in slices], ns)
+        n = np.repeat(ns, ns)
+        local = np.arange(len(i0)) - np.repeat(np.cumsum(ns) - ns, ns)
+        out = []
+        kernels = {}
+        for k, slc in enumerate(slices):
+            kernels.setdefault(slc.kernel, []).append(k)
+        for kernel, members in kernels.items():
+            pos = None
+            if len(members) < len(slices):
+                mask = np.zeros(len(slices), dtype=bool)
+                mask[members] = True
+                pos = np.nonzero(np.repeat(mask, ns))[0]
+            for k in kernel:
+                if pos is None:
+                    out.append((None, i0 + (local + k) % n))
+                else:
+                    out.append((pos, i0[pos] + (local[pos] + k) % n[pos]))
+        for side in ("below", "above"):
+            o0, on = [], []
+            for slc in slices:
+                other = getattr(slc, side)
+                linked = other is not None and other.frozen is None and other.engine is self
+                o0.append(other.span[0] if linked else 0)
+                on.append(other.span[1] if linked else 0)
+            pos = np.nonzero(local < np.repeat(on, ns))[0]
+            if len(pos):
+                out.append((pos, np.repeat(o0, ns)[pos] + local[pos]))
+        return out
+
+    def neighbor_sum(self, a, idx):
+        n = self.count
+        w = a[self.src]
+        s = np.empty((len(idx), 3))
+        for k in range(3):
+            s[:, k] = np.bincount(self.dst, weights=w[:, k], minlength=n)[idx]
+        return s
+
+    def move_boids(self, idx, topology, ease, ease_away):
+        m = len(idx)
+        deg = np.zeros(m)
+        sl, sv = np.zeros((m, 3)), np.zeros((m, 3))
+        for pos, rows in topology:
+            if pos is None:
+                deg += 1
+                sl += self.loc[rows]
+                sv += self.v[rows]
+            else:
+                deg[pos] += 1
+                sl[pos] += self.loc[rows]
+                sv[pos] += self.v[rows]
+        if len(self.src):
+            deg += self.degree[idx]
+            sl += self.neighbor_sum(self.loc, idx)
+            sv += self.neighbor_sum(self.v, idx)
+        rn = (1 / deg)[:, None]
+        loc = self.loc[idx]
+        av = (self.v[idx] + sv) * rn
+        away = (sl - loc * deg[:, None]) * (ease_away * self.ease_away2[idx])[:, None]
+        self.nv[idx] = self.nv[idx] + away + av * (ease * self.ease2[idx])[:, None]
+
+    def growth_counters(self, idx):
+        # the Params counted here (hue, saturation, brightness) are looked up by age (see ParamTrack) or were advanced
+        # in schedule (ParamRows)
+        self.age[idx] += 1
+
+    def update(self, idx):
+        self.loc[idx] = self.loc[idx] + self.nv[idx]
+        self.v[idx] = self.nv[idx]
+
+    def colors(self, rows):
+        # (r, g, b) of the given rows, hue, saturation and brightness only depend on the age of a cell (unless they're ParamRows)
+        age = self.age[rows]
+        return hsv_to_rgb(self.hue.value_of(rows, age), self.saturation.value_of(rows, age), self.brightness.value_of(rows, age))
+
+    def sync(self, cells=None):
+        # write the engine state back into the adopted Cell objects (for Tree.show or any per-cell code)
+        for c in self.cells if cells is None else cells:
+            if c is None:
+                continue
+            i = c.index
+            a = int(self.age[i])
+            c.loc = Vector(self.loc[i])
+            c.nloc = c.loc
+            c.v = Vector(self.v[i])
+            c.nv = c.v
+            c.age = a
+            for p, track in ((c.ease, self.ease), (c.ease_away, self.ease_away), (c.hue, self.hue), (c.saturation, self.saturation), (c.brightness, self.brightness)):
+                if isinstance(p, ScheduledParam):
+                    p.offset = a
+                else:
+                    p.value, p.count, p.cfunc = track.state(i, a)
+            c.set_color()
+
+
+# CellView is a Cell-like window on one engine row, made on demand (Slice.views) for compact slices.
+# Locations and velocities can be assigned, the Params are views of the engine's schedules at the cell's age
+# (copies of the row's Param for ParamRows).
+class CellView():
+    __slots__ = ("engine", "index", "slice")
+
+    def __init__(self, engine, index, slc):
+        self.engine = engine
+        self.index = index
+        self.slice = slc
+
+    def __repr__(self):
+        return "CellView(%d)" % self.index
+
+    def _get(k):
+        return property(lambda c: Vector(getattr(c.engine, k)[c.index]), lambda c, value: getattr(c.engine, k).__setitem__(c.index, tuple(value)))
+
+    loc = _get("loc")
+    v = _get("v")
+    nv = _get("nv")
+    origin = _get("origin")
+    origv = _get("origv")
+    del _get
+
+    age = property(lambda c: int(c.engine.age[c.index]))
+    rate_growth_radial = property(lambda c: float(c.engine.rate_growth_radial[c.index]))
+    ease2 = property(lambda c: float(c.engine.ease2[c.index]))
+    ease_away2 = property(lambda c: float(c.engine.ease_away2[c.index]))
+    ease = property(lambda c: c.engine.ease.view(c.index, c.age))
+    ease_away = property(lambda c: c.engine.ease_away.view(c.index, c.age))
+    hue = property(lambda c: c.engine.hue.view(c.index, c.age))
+    saturation = property(lambda c: c.engine.saturation.view(c.index, c.age))
+    brightness = property(lambda c: c.engine.brightness.view(c.index, c.age))
+
+    @property
+    def color(self):
+        return Color(tuple(self.engine.colors(np.array([self.index]))[0]))
+
+    @property
+    def neighbors(self):
+        # same topology as Cell.neighbors and CellEngine.topology
+        slc = self.slice
+        i0, n = slc.span
+        i = self.index - i0
+        out = [CellView(self.engine, i0 + (i + k) % n, slc) for k in slc.kernel]
+        for other in (slc.below, slc.above):
+            if other is not None and other.frozen is None and i < len(other):
+                out.append(CellView(self.engine, other.span[0] + i, other))
+        return out
@@ -0,0 +1,224 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+# Streaming file export of grown trees, no Blender needed
+# PLYStream writes a binary little-endian PLY (float xyz + uchar rgb per vertex, one quad per cell between slices)
+# in fixed-size chunks, so memory stays flat however big the tree is. It can be fed a finished tree (export_ply) or
+# hooked into growth through a Settling policy, writing every slice the moment it freezes:
+#
+#   stream = PLYStream("tree.ply", release=True)
+#   t = Tree(settling=Settling(max_age=10, on_freeze=stream.on_freeze))
+#   t.plant(growth_steps=200)
+#   stream.finish(t)    # writes the slices that are still growing and closes the file
+#
+# Faces have to follow all vertices in a PLY file, so they are spooled to a temporary file and appended on close.
+#
+# At a level of detail (lod, see growf.mesh) a stream writes the same rings and slices as mesh_buffers and export_ply:
+# every 2**lod-th slice, the slices child branches start from (marked on bifurcation, see Tip.mark_junction) and the last
+# slice of every branch. Only a tip's newest slice can still become either, so when it freezes while the tip grows on,
+# it is held back (one per tip) until the tip's next freeze or finish.
+
+import shutil
+import tempfile
+
+import numpy as np
+
+from .mesh import ring_quads, write_slices, ring_size, junctions, lod_slices
+
+VERTEX = np.dtype([("x", "<f4"), ("y", "<f4"), ("z", "<f4"), ("red", "u1"), ("green", "u1"), ("blue", "u1")])
+FACE = np.dtype([("n", "u1"), ("v", "<i4", (4,))])
+
+_HEADER = """ply
+format binary_little_endian 1.0
+comment GrowF
+element vertex {:>12}
+property float x
+property float y
+property float z
+property uchar red
+property uchar green
+property uchar blue
+element face {:>12}
+property list uchar int vertex_indices
+end_header
+"""
+
+class PLYStream():
+    def __init__(self, path, chunk=65536, release=False, lod=0):
+        self.path = path
+        self.chunk = chunk          # vertices/faces buffered before they are written out
+        self.release = release      # drop the frozen block of a slice once it is written (the tree can't be meshed again)
+        self.lod = lod
+        self.file = open(path, "wb")
+        self.file.write(_HEADER.format(0, 0).encode("ascii"))
+        self.faces = tempfile.TemporaryFile()
+        self.vbuf, self.vn = np.zeros(chunk, dtype=VERTEX), 0
+        self.fbuf, self.fn = np.zeros(chunk, dtype=FACE), 0
+        self.nv, self.nf = 0, 0
+        self.ends = {}              # id(tip) -> {slice order: [first vertex, cells, has below, has above]}, see write_slice
+        self.pending = {}           # id(tip) -> its newest slice, frozen before it was known whether it is kept
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def put_verts(self, verts, colors):
+        rgb = np.clip(np.rint(colors * 255.0), 0, 255)
+        i = 0
+        while i < len(verts):
+            k = min(len(verts) - i, self.chunk - self.vn)
+            block = self.vbuf[self.vn:self.vn + k]
+            block["x"], block["y"], block["z"] = verts[i:i + k, 0], verts[i:i + k, 1], verts[i:i + k, 2]
+            block["red"], block["green"], block["blue"] = rgb[i:i + k, 0], rgb[i:i + k, 1], rgb[i:i + k, 2]
+            self.vn += k
+            i += k
+            if self.vn == self.chunk:
+                self.flush_verts()
+        self.nv += len(verts)
+
+    def put_faces(self, quads):
+        i = 0
+        while i < len(quads):
+            k = min(len(quads) - i, self.chunk - self.fn)
+            block = self.fbuf[self.fn:self.fn + k]
+            block["n"] = 4
+            block["v"] = quads[i:i + k]
+            self.fn += k
+            i += k
+            if self.fn == self.chunk:
+                self.flush_faces()
+        self.nf += len(quads)
+
+    def flush_verts(self):
+        self.file.write(self.vbuf[:self.vn].tobytes())
+        self.vn = 0
+
+    def flush_faces(self):
+        self.faces.write(self.fbuf[:self.fn].tobytes())
+        self.fn = 0
+
+    def write_slice(self, tip, slc, below=None, above=None):
+        # Slices of a tip may arrive in any order (an epsilon Settling freezes them out of order), a slice is joined
+        # to the slice below and above it in its branch as soon as both sides are written. Only slices still waiting
+        # for a neighbor are remembered, so the bookkeeping stays at about one entry per tip.
+        # below, above: orders of the written slices next to this one in its branch (None: there is none, or for
+        # above, not known yet, the slice above then joins this one when it is written)
+        n = len(slc)
+        m = ring_size(n, self.lod)
+        verts, colors = np.zeros((m, 3)), np.zeros((m, 3))
+        write_slices(verts, colors, [(0, slc)], self.lod)
+        v0 = self.nv
+        self.put_verts(verts, colors)
+
+        ends = self.ends.setdefault(id(tip), {})
+        k = slc.order
+        entry = [v0, n, below is None, False]
+        prev = None if below is None else ends.get(below)
+        if prev is not None:
+            if prev[1] == n and m > 1:
+                self.put_faces(ring_quads([v0], [prev[0]], m)[0][0])
+            prev[3] = entry[2] = True
+            if prev[2]:
+                del ends[below]
+        nxt = None if above is None else ends.get(above)
+        if nxt is not None:
+            if nxt[1] == n and m > 1:
+                self.put_faces(ring_quads([nxt[0]], [v0], m)[0][0])
+            nxt[2] = entry[3] = True
+            if nxt[3]:
+                del ends[above]
+        if not (entry[2] and entry[3]):
+            ends[k] = entry
+
+    def kept(self, tip, i, done):
+        # whether slice i of the tip's branch is meshed at the stream's level of detail (see growf.mesh.lod_slices),
+        # done: the branch has its last slice
+        return i % (1 << self.lod) == 0 or tip.branch[i].junction or (done and i == len(tip.branch) - 1)
+
+    def settle(self, tip, slc, done):
+        # writes a slice that won't change any more if it is kept, with the kept slices next to it as far as they exist
+        i = slc.order
+        if self.kept(tip, i, done):
+            below = next((j for j in range(i - 1, -1, -1) if self.kept(tip, j, done)), None)
+            above = next((j for j in range(i + 1, len(tip.branch)) if self.kept(tip, j, done)), None)
+            self.write_slice(tip, slc, below, above)
+        if self.release and slc.frozen is not None:
+            slc.frozen = slc.frozen[:0]
+
+    def on_freeze(self, tip, slc):
+        # Settling(on_freeze=stream.on_freeze) calls this for every slice that stops growing
+        pending = self.pending.get(id(tip))
+        if pending is not None and pending is not tip.branch[-1]:
+            del self.pending[id(tip)]
+            self.settle(tip, pending, False)
+        if self.lod and slc is tip.branch[-1] and tip.can_grow():
+            self.pending[id(tip)] = slc     # a child may still start from it, or it may stay the branch's last
+        else:
+            self.settle(tip, slc, not tip.can_grow())
+
+    def finish(self, tree):
+        # writes the slices held back and every slice that has not frozen yet (frozen ones were written by on_freeze)
+        # and closes the file
+        for tip in tree.tips:
+            pending = self.pending.pop(id(tip), None)
+            if pending is not None:
+                self.settle(tip, pending, True)
+            for slc in tip.branch:
+                if slc.frozen is None:
+                    self.settle(tip, slc, True)
+        self.close()
+
+    def close(self):
+        if self.file is None:
+            return
+        self.flush_verts()
+        self.flush_faces()
+        self.faces.seek(0)
+        shutil.copyfileobj(self.faces, self.file, self.chunk * FACE.itemsize)
+        self.faces.close()
+        self.file.seek(0)
+        self.file.write(_HEADER.format(self.nv, self.nf).encode("ascii"))
+        self.file.close()
+        self.file = None
+
+def export_ply(tree, path, chunk=65536, lod=0):
+    # writes a grown tree slice by slice, without building the whole mesh in memory first
+    keep = junctions(tree) if lod else ()
+    with PLYStream(path, chunk=chunk, lod=lod) as stream:
+        for tip in tree.tips:
+            slices = lod_slices(tip, lod, keep)
+            for r, slc in enumerate(slices):
+                below = slices[r - 1].order if r else None
+                above = slices[r + 1].order if r + 1 < len(slices) else None
+                stream.write_slice(tip, slc, below, above)
+    return path
+
+_SKELETON_HEADER = """ply
+format binary_little_endian 1.0
+comment GrowF skeleton
+element vertex {}
+property float x
+property float y
+property float z
+element edge {}
+property int vertex1
+property int vertex2
+property float radius
+end_header
+"""
+
+SKELETON_EDGE = np.dtype([("vertex1", "<i4"), ("vertex2", "<i4"), ("radius", "<f4")])
+
+def export_skeleton_ply(tree, path, tip_radius=None):
+    # writes the branching structure of a tree (see growf.skeleton) as PLY vertices and edges with a radius each
+    from .skeleton import skeleton
+    sk = skeleton(tree, tip_radius=tip_radius)
+    edges = np.empty(len(sk.edges), dtype=SKELETON_EDGE)
+    edges["vertex1"], edges["vertex2"], edges["radius"] = sk.edges[:, 0], sk.edges[:, 1], sk.radius
+    with open(path, "wb") as f:
+        f.write(_SKELETON_HEADER.format(len(sk.verts), len(edges)).encode("ascii"))
+        f.write(sk.verts.astype("<f4").tobytes())
+        f.write(edges.tobytes())
+    return path
@@ -0,0 +1,255 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+# Forests: many trees growing in one world, competing for light and space
+#
+#   with Forest(tile=4.0, halo=1.0, workers=4) as forest:
+#       for i in range(200):
+#           forest.add(Tree(seed_r="GrowF%d" % i), location=(x[i], y[i], 0.0))
+#       forest.grow(steps=40)
+#       trees = forest.collect()    # the grown trees, back in this process
+#
+# The ground is cut into square tiles of side tile, every tree belongs to the tile its root is in. Tiles grow
+# independently, spread over worker processes (workers=0: all in this process), sync growth steps at a time (a round):
+#   - within a tile, trees grow side by side, the LightField and SpatialHash of every tree see the cells of the other
+#     trees of the tile as they were at the start of the round
+#   - after a round every tile hands the cells it has within halo of its border (or beyond it) to its 8 neighbors,
+#     which see them the same way in the next round, so light and collisions between tiles are only resolved at borders
+# Cells are exchanged as the centers of the cubes of side resolution they occupy, not one by one. Trees stay in their
+# worker between rounds, so a round costs time and memory in proportion to the number of trees, and the trees grown
+# don't depend on the number of workers. halo has to cover how far a tree can shade or reach into its neighbors.
+# Every tree gets the world's light and gravity axes, and a LightField (shade) and a SpatialHash (collide) unless it
+# has its own. Trees are grown with Tree.begin and Tree.grow, growf.cache is not used.
+
+import os
+import shutil
+import tempfile
+import traceback
+import multiprocessing
+
+import numpy as np
+
+from .vector import Vector
+from .light import LightField
+from .spatial import SpatialHash, pack, unpack
+
+_NONE = np.zeros((0, 3))
+
+class Tile():
+    # the trees of one tile, grown in the process that owns the tile
+    def __init__(self, key, size, resolution):
+        self.key = key
+        self.size = size
+        self.resolution = resolution
+        self.trees = []     # (tree, location, direction), in the order they were added
+
+    def begin(self, light_axis, gravity_axis):
+        for tree, location, direction in self.trees:
+            tree.rng.seed(a=tree.random_seed, version=2)
+            tree.begin(location, direction)
+            for tip in tree.tips:
+                tip.light_axis, tip.gravity_axis = Vector(light_axis), Vector(gravity_axis)
+
+    def points(self, tree):
+        # centers of the cubes the tree's cells occupy
+        e = tree.engine
+        if e is None or e.count == 0:
+            return _NONE
+        keys = np.unique(pack(np.floor(e.loc[:e.count] / self.resolution).astype(np.int64)))
+        return (unpack(keys) + 0.5) * self.resolution
+
+    def grow(self, steps, halo):
+        # grows the trees of the tile, halo: points of the neighboring tiles
+        points = [self.points(tree) for tree, l, d in self.trees]
+        owner = np.repeat(np.arange(len(points)), [len(p) for p in points])
+        every = np.concatenate(points + [_NONE])
+        for i, (tree, l, d) in enumerate(self.trees):
+            if tree.light is None and tree.spatial is None:
+                continue
+            others = np.concatenate((every[owner != i], halo))
+            if tree.light is not None:
+                tree.light.set_external(others)
+            if tree.spatial is not None:
+                tree.spatial.set_external(others)
+        for s in range(steps):
+            for tree, l, d in self.trees:
+                tree.grow(1)
+
+    def border(self, halo):
+        # points of the tile's trees within halo of its border or outside of it, for the neighbors
+        p = np.concatenate([self.points(tree) for tree, l, d in self.trees] + [_NONE])
+        lo = np.array(self.key, dtype=np.float64) * self.size + halo
+        hi = lo + self.size - 2 * halo
+        inner = (p[:, :2] >= lo).all(axis=1) & (p[:, :2] < hi).all(axis=1)
+        return p[~inner]
+
+    def save(self, path):
+        # snapshots of the trees, {(tile, index): file}
+        out = {}
+        for i, (tree, l, d) in enumerate(self.trees):
+            out[(self.key, i)] = os.path.join(path, "%d_%d_%d.gfs" % (self.key[0], self.key[1], i))
+            tree.snapshot(out[(self.key, i)])
+        return out
+
+def _serve(conn):
+    # a worker process: owns some tiles and runs the commands of its Forest on them
+    tiles = []
+    while True:
+        msg = conn.recv()
+        cmd = msg[0]
+        if cmd == "stop":
+            conn.close()
+            return
+        try:
+            if cmd == "tiles":
+                tiles = msg[1]
+                for tile in tiles:
+                    tile.begin(*msg[2])
+                out = None
+            elif cmd == "grow":
+                steps, halos, halo = msg[1:]
+                out = {}
+                for tile in tiles:
+                    tile.grow(steps, halos[tile.key])
+                    out[tile.key] = tile.border(halo)
+            elif cmd == "save":
+                out = {}
+                for tile in tiles:
+                    out.update(tile.save(msg[1]))
+            conn.send(("ok", out))
+        except Exception:
+            conn.send(("error", traceback.format_exc()))
+
+class Forest():
+    def __init__(self, tile=4.0, halo=1.0, sync=5, workers=None, resolution=0.1, light_axis=(0.5, 0.5, 1.0), gravity_axis=(0.0, 0.0, -1.0), shade=True, collide=True):
+        self.tile = tile                    # side of the square tiles of ground
+        self.halo = halo                    # how far from its border a tile's cells are seen by its neighbors
+        self.sync = sync                    # growth steps between exchanges at the tile borders
+        self.workers = workers              # worker processes, None one per core (at most one per tile), 0 none
+        self.resolution = resolution        # side of the cubes cells are exchanged as
+        self.light_axis = tuple(light_axis)
+        self.gravity_axis = tuple(gravity_axis)
+        self.shade = shade                  # trees without a LightField get one
+        self.collide = collide              # trees without a SpatialHash get one
+        self.trees = []                     # every tree, in the order they were added
+        self.tiles = {}                     # (i, j) -> Tile
+        self.halos = None                   # points every tile sees of its neighbors, once the forest grows
+        self.procs = None                   # [(process, connection, tile keys)] with workers
+        self.age = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def tile_of(self, location):
+        return (int(np.floor(location[0] / self.tile)), int(np.floor(location[1] / self.tile)))
+
+    def add(self, tree, location=(0.0, 0.0, 0.0), direction=(0.0, 0.0, 1.0)):
+        if self.halos is not None:
+            raise RuntimeError("trees have to be added before the forest grows")
+        if self.shade and tree.light is None:
+            tree.light = LightField(resolution=self.resolution)
+        if self.collide and tree.spatial is None:
+            tree.spatial = SpatialHash()
+        key = self.tile_of(location)
+        tile = self.tiles.get(key)
+        if tile is None:
+            tile = self.tiles[key] = Tile(key, self.tile, self.resolution)
+        tile.trees.append((tree, tuple(location), tuple(direction)))
+        self.trees.append(tree)
+        return tree
+
+    def start(self):
+        # plants every tree, in the workers when there are any
+        keys = sorted(self.tiles)
+        axes = (self.light_axis, self.gravity_axis)
+        workers = os.cpu_count() if self.workers is None else self.workers
+        workers = min(workers, len(keys))
+        if workers:
+            self.procs = []
+            for w in range(workers):
+                conn, child = multiprocessing.Pipe()
+                proc = multiprocessing.Process(target=_serve, args=(child,), daemon=True)
+                proc.start()
+                child.close()
+                own = keys[w::workers]
+                conn.send(("tiles", [self.tiles[k] for k in own], axes))
+                self.procs.append((proc, conn, own))
+            for proc, conn, own in self.procs:
+                self.reply(conn)
+        else:
+            for k in keys:
+                self.tiles[k].begin(*axes)
+        self.halos = {k: _NONE for k in keys}
+
+    def reply(self, conn):
+        status, out = conn.recv()
+        if status == "error":
+            raise RuntimeError("forest worker failed:\n" + out)
+        return out
+
+    def grow(self, steps=1):
+        if self.halos is None:
+            self.start()
+        done = 0
+        while done < steps:
+            n = min(self.sync, steps - done)
+            if self.procs is None:
+                borders = {}
+                for k, tile in self.tiles.items():
+                    tile.grow(n, self.halos[k])
+                    borders[k] = tile.border(self.halo)
+            else:
+                for proc, conn, own in self.procs:
+                    conn.send(("grow", n, {k: self.halos[k] for k in own}, self.halo))
+                borders = {}
+                for proc, conn, own in self.procs:
+                    borders.update(self.reply(conn))
+            self.halos = self.route(borders)
+            done += n
+            self.age += n
+
+    def route(self, borders):
+        # the border points every tile sees: those of its neighbors within halo of it
+        halos = {}
+        for (i, j) in self.tiles:
+            near = [borders[(i + a, j + b)] for a in (-1, 0, 1) for b in (-1, 0, 1) if (a or b) and (i + a, j + b) in borders]
+            p = np.concatenate(near + [_NONE])
+            lo = np.array((i, j), dtype=np.float64) * self.tile - self.halo
+            hi = lo + self.tile + 2 * self.halo
+            halos[(i, j)] = p[(p[:, :2] >= lo).all(axis=1) & (p[:, :2] < hi).all(axis=1)]
+        return halos
+
+    def collect(self):
+        # the grown trees in this process: with workers, their snapshots are loaded into the trees that were added
+        if self.procs is None:
+            return self.trees
+        from .state import load
+        path = tempfile.mkdtemp(prefix="growf-forest-")
+        try:
+            for proc, conn, own in self.procs:
+                conn.send(("save", path))
+            files = {}
+            for proc, conn, own in self.procs:
+                files.update(self.reply(conn))
+            for key, tile in self.tiles.items():
+                for i, (tree, l, d) in enumerate(tile.trees):
+                    load(files[(key, i)], tree, mapped=False)
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+        return self.trees
+
+    def close(self):
+        if self.procs is None:
+            return
+        for proc, conn, own in self.procs:
+            try:
+                conn.send(("stop",))
+                conn.close()
+            except (OSError, EOFError):
+                pass
+        for proc, conn, own in self.procs:
+            proc.join()
+        self.procs = None
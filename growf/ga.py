@@ -0,0 +1,278 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+# Natural selection of organisms: mutation and crossover of DNA, fitness from headless growth, and a population loop
+#
+#   ev = Evolution(size=32, fitness="cells", steps=20)
+#   ev.run(generations=10)
+#   dna, score = ev.best()
+#   ev.save("gen10.gfp")                            # see growf.genome
+#
+# A genome is a DNA whose Params have not been advanced yet, like the defaults of Tree.init_dna. Its fitness is the
+# fitness function applied to a tree grown headless from it for some steps, seeded with the DNA's namespace, so the same
+# genome always scores the same. Scores are cached by a hash of the serialized genome, the steps and the fitness
+# function: elites carried over and children identical to a parent are never grown twice.
+# Fitness functions take a grown Tree and return a number (higher is fitter). They are looked up in FITNESS by name or
+# passed as callables, which have to be importable module-level functions to reach the worker processes.
+
+import copy
+import types
+import random
+import hashlib
+import functools
+from concurrent.futures import ProcessPoolExecutor
+
+from .core import DNA, Tree, GrowthRandom, WAVES
+from .batch import grow_tree
+from .genome import write_population
+
+MUTATION_SCALE = 0.2    # spread of a float mutation, relative to the value (absolute around 0)
+
+# Mutation
+
+def clone_param(p):
+    # an exact copy of a Param (unlike Param.copy, which restarts it), with its own func and sequence lists
+    q = copy.copy(p)
+    if type(p.func) == list:
+        q.func = list(p.func)
+    if p.sequence is not None:
+        q.sequence = list(p.sequence)
+    q.rng = None
+    return q
+
+def clone(dna):
+    out = DNA(dna.namespace)
+    for key, params in dna.data.items():
+        out.data[key] = tuple(clone_param(p) for p in params)
+    return out
+
+def mutate_number(x, rng, scale=MUTATION_SCALE):
+    # integers step by one and don't go below 1 (or 0 when they were 0), floats are scaled by a gaussian
+    if type(x) == int:
+        y = x + rng.choice((-1, 1))
+        return max(y, 1 if x >= 1 else 0)
+    return x + rng.gauss(0.0, scale) * (abs(x) or 1.0)
+
+def mutate_param(p, rng, scale=MUTATION_SCALE):
+    # changes one field of p in place: its starting value, or for a Param that moves (max is set) its limits, its
+    # frequency or its wave function(s)
+    fields = ["orig"]
+    if p.max is not None:
+        fields += ["max", "freq"] + (["min"] if p.min is not None else []) + (["func"] if p.func is not None else [])
+    field = rng.choice(fields)
+    if field == "func":
+        waves = list(WAVES.values())
+        if type(p.func) == types.FunctionType:
+            p.func = rng.choice(waves)
+        else:
+            i = rng.randrange(len(p.func))
+            f = p.func[i]
+            p.func[i] = rng.choice(waves) if type(f) == types.FunctionType else mutate_number(f, rng, scale)
+    elif field == "orig":
+        p.orig = p.value = mutate_number(p.orig, rng, scale)
+    else:
+        setattr(p, field, mutate_number(getattr(p, field), rng, scale))
+        if p.min is not None and p.min > p.max:
+            p.min, p.max = p.max, p.min
+    return p
+
+def mutate(dna, rate, rng=None, scale=MUTATION_SCALE):
+    # a mutated copy of dna, every Param has a chance of rate to have one of its fields changed
+    rng = random if rng is None else rng
+    out = clone(dna)
+    for params in out.data.values():
+        for p in params:
+            if rng.random() < rate:
+                mutate_param(p, rng, scale)
+    return out
+
+def crossover(a, b, rng=None):
+    # uniform crossover: every Param comes from either parent, sections only a has (or of another length) from a
+    rng = random if rng is None else rng
+    out = DNA(a.namespace)
+    for key, params in a.data.items():
+        other = b.data.get(key)
+        if other is None or len(other) != len(params):
+            out.data[key] = tuple(clone_param(p) for p in params)
+        else:
+            out.data[key] = tuple(clone_param(p if rng.random() < 0.5 else q) for p, q in zip(params, other))
+    return out
+
+# Fitness
+
+def tree_points(t):
+    for tip in t.tips:
+        for slc in tip.branch:
+            for loc, color in slc.points():
+                yield loc
+
+def fitness_tips(t):
+    return float(len(t.tips))
+
+def fitness_cells(t):
+    return float(sum(len(slc) for tip in t.tips for slc in tip.branch))
+
+def fitness_volume(t):
+    # volume of the axis aligned bounding box of all cells
+    lo, hi = [float("inf")] * 3, [float("-inf")] * 3
+    for loc in tree_points(t):
+        for k in range(3):
+            x = loc[k]
+            if x < lo[k]:
+                lo[k] = x
+            if x > hi[k]:
+                hi[k] = x
+    if lo[0] > hi[0]:
+        return 0.0
+    return (hi[0] - lo[0]) * (hi[1] - lo[1]) * (hi[2] - lo[2])
+
+def fitness_light(t, resolution=0.05):
+    # light exposure proxy: the shadow the tree casts, as the area of the resolution sized grid squares its cells cover
+    # when they are projected along the light axis of its tips
+    if not t.tips:
+        return 0.0
+    lx, ly, lz = t.tips[0].light_axis.normalized()
+    # two unit vectors spanning the plane normal to the light
+    ux, uy, uz = (1.0, 0.0, 0.0) if abs(lx) < 0.9 else (0.0, 1.0, 0.0)
+    d = ux * lx + uy * ly + uz * lz
+    ux, uy, uz = ux - d * lx, uy - d * ly, uz - d * lz
+    n = (ux * ux + uy * uy + uz * uz) ** 0.5
+    ux, uy, uz = ux / n, uy / n, uz / n
+    wx, wy, wz = ly * uz - lz * uy, lz * ux - lx * uz, lx * uy - ly * ux
+    lit = set()
+    for loc in tree_points(t):
+        x, y, z = loc[0], loc[1], loc[2]
+        lit.add((int((x * ux + y * uy + z * uz) // resolution), int((x * wx + y * wy + z * wz) // resolution)))
+    return len(lit) * resolution * resolution
+
+FITNESS = {
+    "tips": fitness_tips,
+    "cells": fitness_cells,
+    "volume": fitness_volume,
+    "light": fitness_light,
+}
+
+def fitness_name(fitness):
+    if isinstance(fitness, str):
+        return fitness
+    return "%s.%s" % (getattr(fitness, "__module__", ""), getattr(fitness, "__qualname__", repr(fitness)))
+
+def genome_key(data, steps, fitness, engine=False):
+    # what a cached score is stored under: the serialized genome and everything else its fitness depends on
+    h = hashlib.sha1(data)
+    h.update(("|%d|%s|%d" % (steps, fitness_name(fitness), bool(engine))).encode("utf-8"))
+    return h.hexdigest()
+
+# Evaluation
+
+def evaluate_genome(data, steps=20, fitness="cells", engine=False, settling=None):
+    # grows the serialized genome data and scores it, None when the genome can't grow (it is then the least fit):
+    # its arithmetic fails, or a wave leaves the domain of its math function (p_log of a value below min), any other
+    # error is a bug and raised
+    fit = FITNESS[fitness] if isinstance(fitness, str) else fitness
+    dna = DNA(None).unserialize(data)
+    try:
+        t = grow_tree((dna, dna.namespace, steps), engine=engine, settling=settling)
+    except ArithmeticError:
+        return None
+    except ValueError as e:
+        if str(e) != "math domain error":
+            raise
+        return None
+    return float(fit(t))
+
+def evaluate(dnas, steps=20, fitness="cells", workers=None, cache=None, engine=False, settling=None, chunksize=1):
+    # scores of dnas in order. Genomes found in cache (a dict, genome_key -> score) are not grown again, the others are
+    # grown once each across a process pool (workers=None one process per core, workers=0 in this process) and added.
+    cache = {} if cache is None else cache
+    blobs = [dna.serialize() for dna in dnas]
+    keys = [genome_key(b, steps, fitness, engine) for b in blobs]
+    todo = {}
+    for k, b in zip(keys, blobs):
+        if k not in cache and k not in todo:
+            todo[k] = b
+    if todo:
+        run = functools.partial(evaluate_genome, steps=steps, fitness=fitness, engine=engine, settling=settling)
+        if workers == 0:
+            scores = [run(b) for b in todo.values()]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                scores = list(pool.map(run, todo.values(), chunksize=chunksize))
+        cache.update(zip(todo.keys(), scores))
+    return [float("-inf") if cache[k] is None else cache[k] for k in keys]
+
+# Population
+
+class Evolution():
+    def __init__(self, dna=None, size=32, fitness="cells", steps=20, mutation_rate=0.1, crossover_rate=0.5, elite=2, tournament=3, workers=None, engine=False, settling=None, namespace="GrowF", seed="GrowF", cache=None):
+        # dna: the ancestor genome, the default DNA of Tree.init_dna (for namespace) when None
+        if dna is None:
+            dna = Tree(seed_r=namespace).init_dna()
+        self.fitness = fitness
+        self.steps = steps                  # growth steps of every evaluation
+        self.mutation_rate = mutation_rate  # chance of every Param of a child to mutate
+        self.crossover_rate = crossover_rate    # chance of a child to have two parents
+        self.elite = elite                  # fittest genomes carried over unchanged to the next generation
+        self.tournament = tournament        # genomes competing for every parent
+        self.workers = workers
+        self.engine = engine
+        self.settling = settling
+        self.cache = {} if cache is None else cache
+        self.rng = GrowthRandom(seed)       # selection and mutation, so a run is reproducible
+        self.population = [clone(dna)] + [mutate(dna, mutation_rate, rng=self.rng) for i in range(size - 1)]
+        self.scores = None
+        self.generation = 0
+        self.history = []                   # (generation, best score, mean score) of every evaluated generation
+
+    def evaluate(self):
+        self.scores = evaluate(self.population, steps=self.steps, fitness=self.fitness, workers=self.workers, cache=self.cache, engine=self.engine, settling=self.settling)
+        finite = [s for s in self.scores if s != float("-inf")]
+        self.history.append((self.generation, max(self.scores), sum(finite) / len(finite) if finite else float("-inf")))
+        return self.scores
+
+    def ranked(self):
+        # indices of the population, fittest first (ties keep population order)
+        return sorted(range(len(self.population)), key=lambda i: -self.scores[i])
+
+    def select(self):
+        # tournament selection
+        picks = [self.rng.randrange(len(self.population)) for i in range(self.tournament)]
+        return self.population[max(picks, key=lambda i: self.scores[i])]
+
+    def breed(self):
+        a = self.select()
+        if self.rng.random() < self.crossover_rate:
+            a = crossover(a, self.select(), rng=self.rng)
+        return mutate(a, self.mutation_rate, rng=self.rng)
+
+    def step(self):
+        # one generation: evaluate if needed, keep the elite and fill up with children
+        if self.scores is None:
+            self.evaluate()
+        size = len(self.population)
+        nxt = [self.population[i] for i in self.ranked()[:self.elite]]
+        while len(nxt) < size:
+            nxt.append(self.breed())
+        self.population = nxt
+        self.generation += 1
+        return self.evaluate()
+
+    def run(self, generations=10, callback=None):
+        # callback(evolution) after every generation
+        for g in range(generations):
+            self.step()
+            if callback is not None:
+                callback(self)
+        return self.best()
+
+    def best(self):
+        if self.scores is None:
+            self.evaluate()
+        i = self.ranked()[0]
+        return self.population[i], self.scores[i]
+
+    def save(self, path):
+        # the population, fittest first, as a growf.genome population file
+        if self.scores is None:
+            self.evaluate()
+        return write_population(path, [self.population[i] for i in self.ranked()])
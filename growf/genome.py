@@ -0,0 +1,297 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+# Binary DNA: a compact, versioned encoding of a DNA's namespace and Params, and population files of many of them
+#
+#   data = dna.serialize()                  # bytes
+#   dna = DNA(None).unserialize(data)
+#   write_population("pop.gfp", dnas)
+#   with Population("pop.gfp") as pop:     # memory-mapped, genomes are decoded when they are asked for
+#       dna = pop[1234]
+#
+# A Population sent to worker processes only carries its path, every worker maps the same file, so the genomes are
+# shared through the page cache instead of being copied into each process. Nothing handed out points into the mapping:
+# pop[i] decodes a copy of genome i and pop.raw(i) is bytes, so close() (or leaving the with block) always unmaps the
+# file, and neither outlives it.
+# The fixed-width part of every Param is a record of the same 80 bytes, read for a whole genome at once (one numpy
+# structured array, or struct when numpy is missing). Wave functions and sequence items are kept apart in one item
+# list per genome, decoded once for all genomes that share it (mutants of one ancestor mostly do).
+#
+# Layout (little-endian):
+#   genome      "GFDN" | version u16 | namespace | sections u16 | section... | record * params | items u32 | size u32 | item...
+#   namespace   tag u8 (0 None, 1 int, 2 str) | int i64 or str16
+#   section     key str8 | params u16, the records of all sections follow in order
+#   record      flags u8 (1 = inherit) | 6 number tags u8 | 6 payloads of 8 bytes | count i64 | cfunc i32 | func u8 |
+#               func items u16 | func first item u32 | sequence items u16 (0xFFFF = None) | sequence first item u32
+#               numbers are value, orig, min, max, steps and freq, tag 0 None, 1 int (i64), 2 float (f64)
+#               func 0 None, 1 one wave function (its one item), 2 a list of items
+#   item        tag u8: 1 int i64, 2 float f64, 3 wave function str8 (its name, see growf.core.WAVES)
+#   population  "GFPO" | version u16 | reserved u16 | genomes u64 | offsets u64 * (genomes + 1) | genome...
+# str8/str16 are a u8/u16 byte length followed by utf-8.
+
+import mmap
+import struct
+import types
+
+from .core import DNA, Param, WAVES, _numpy
+
+MAGIC = b"GFDN"
+POPULATION_MAGIC = b"GFPO"
+VERSION = 1
+POPULATION_VERSION = 1
+
+_HEAD = struct.Struct("<4sH")
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+_RECORD = struct.Struct("<7B6qqiBHIHI")     # a param record, payloads read as ints
+_RECORD_D = struct.Struct("<7x6d")          # the same payloads read as floats
+_RECORD_FIELDS = [("flags", "u1"), ("tags", "u1", (6,)), ("numbers", "<i8", (6,)), ("count", "<i8"), ("cfunc", "<i4"),
+                  ("func", "u1"), ("func_n", "<u2"), ("func_at", "<u4"), ("seq_n", "<u2"), ("seq_at", "<u4")]
+_POP_HEAD = struct.Struct("<4sHHQ")
+_OFFSETS = struct.Struct("<2Q")
+_NONE = 0xFFFF
+
+_RECORD_DTYPE = None    # numpy dtype of _RECORD_FIELDS, made on first use
+_NAMES = {}     # wave function -> name, rebuilt when WAVES changes
+_ITEMS = {}     # encoded item list -> decoded items, see _items
+
+def _wave_name(f):
+    if len(_NAMES) != len(WAVES):
+        _NAMES.clear()
+        _NAMES.update((func, name) for name, func in WAVES.items())
+    name = _NAMES.get(f)
+    if name is None:
+        raise ValueError("wave function %r is not registered, see growf.core.register_wave" % (f,))
+    return name
+
+def _str(out, s, size):
+    b = s.encode("utf-8")
+    out += size.pack(len(b))
+    out += b
+
+def _item(out, x):
+    if type(x) == types.FunctionType:
+        out.append(3)
+        _str(out, _wave_name(x), _U8)
+    elif type(x) == int or type(x) == bool:
+        out.append(1)
+        out += _I64.pack(x)
+    else:
+        out.append(2)
+        out += _F64.pack(x)
+
+def _record(out, items, p, n):
+    # appends the record of p to out and its func and sequence items to items, n items were there before
+    nums = (p.value, p.orig, p.min, p.max, p.steps, p.freq)
+    tags = [0 if x is None else 1 if type(x) in (int, bool) else 2 for x in nums]
+    payloads = [x if t == 1 else _I64.unpack(_F64.pack(0.0 if x is None else x))[0] for t, x in zip(tags, nums)]
+    func, func_n, func_at = 0, 0, n
+    if type(p.func) == types.FunctionType:
+        func, func_n = 1, 1
+        _item(items, p.func)
+    elif p.func is not None:
+        func, func_n = 2, len(p.func)
+        for x in p.func:
+            _item(items, x)
+    seq_n, seq_at = _NONE, n + func_n
+    if p.sequence is not None:
+        seq_n = len(p.sequence)
+        for x in p.sequence:
+            _item(items, x)
+    out += _RECORD.pack(1 if p.inherit else 0, *tags, *payloads, p.count, p.cfunc, func, func_n, func_at, seq_n, seq_at)
+    return n + func_n + (0 if seq_n == _NONE else seq_n)
+
+def dumps(dna):
+    out = bytearray(_HEAD.pack(MAGIC, VERSION))
+    ns = dna.namespace
+    if ns is None:
+        out.append(0)
+    elif type(ns) == int:
+        out.append(1)
+        out += _I64.pack(ns)
+    elif type(ns) == str:
+        out.append(2)
+        _str(out, ns, _U16)
+    else:
+        raise ValueError("a DNA namespace has to be a str, an int or None to be serialized, not %r" % (ns,))
+    out += _U16.pack(len(dna.data))
+    for key, params in dna.data.items():
+        _str(out, key, _U8)
+        out += _U16.pack(len(params))
+    items = bytearray()
+    n = 0
+    for params in dna.data.values():
+        for p in params:
+            n = _record(out, items, p, n)
+    out += _U32.pack(n)
+    out += _U32.pack(len(items))
+    out += items
+    return bytes(out)
+
+def _read_str(buf, at, size):
+    n, = size.unpack_from(buf, at)
+    at += size.size
+    return str(buf[at:at + n], "utf-8"), at + n
+
+def _read_item(buf, at):
+    tag = buf[at]
+    at += 1
+    if tag == 3:
+        name, at = _read_str(buf, at, _U8)
+        return WAVES[name], at
+    if tag == 1:
+        return _I64.unpack_from(buf, at)[0], at + 8
+    return _F64.unpack_from(buf, at)[0], at + 8
+
+def _items(buf, at, n, size):
+    # the decoded item list of a genome, shared by every genome with the same encoded items
+    key = bytes(buf[at:at + size])
+    items = _ITEMS.get(key)
+    if items is None:
+        if len(_ITEMS) >= 1024:
+            _ITEMS.clear()
+        items = []
+        for i in range(n):
+            x, at = _read_item(buf, at)
+            items.append(x)
+        items = _ITEMS[key] = tuple(items)
+    return items
+
+def _records(buf, at, n):
+    # n records as columns: flags, value, orig, min, max, steps, freq, count, cfunc, func, func items, func at,
+    # sequence items, sequence at
+    np = _numpy()
+    if np is None:
+        rows = []
+        for k in range(n):
+            r = _RECORD.unpack_from(buf, at + k * _RECORD.size)
+            ds = _RECORD_D.unpack_from(buf, at + k * _RECORD.size)
+            nums = [None if t == 0 else q if t == 1 else d for t, q, d in zip(r[1:7], r[7:13], ds)]
+            rows.append([r[0]] + nums + list(r[13:]))
+        return [list(c) for c in zip(*rows)] if rows else [[] for k in range(14)]
+    global _RECORD_DTYPE
+    if _RECORD_DTYPE is None:
+        _RECORD_DTYPE = np.dtype(_RECORD_FIELDS)
+    rec = np.frombuffer(buf, dtype=_RECORD_DTYPE, count=n, offset=at)
+    tags = rec["tags"]
+    q = np.ascontiguousarray(rec["numbers"])
+    nums = q.view("<f8").astype(object)
+    ints = tags == 1
+    nums[ints] = q[ints].astype(object)
+    nums[tags == 0] = None
+    cols = [rec[k].tolist() for k in ("count", "cfunc", "func", "func_n", "func_at", "seq_n", "seq_at")]
+    return [rec["flags"].tolist()] + nums.T.tolist() + cols
+
+def loads(data):
+    buf = memoryview(data)
+    magic, version = _HEAD.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError("not a serialized GrowF DNA")
+    if version != VERSION:
+        raise ValueError("unsupported DNA format version %d" % version)
+    at = _HEAD.size
+    tag = buf[at]
+    at += 1
+    if tag == 0:
+        ns = None
+    elif tag == 1:
+        ns, = _I64.unpack_from(buf, at)
+        at += 8
+    else:
+        ns, at = _read_str(buf, at, _U16)
+    dna = DNA(ns)
+    sections, = _U16.unpack_from(buf, at)
+    at += 2
+    keys = []
+    for i in range(sections):
+        key, at = _read_str(buf, at, _U8)
+        n, = _U16.unpack_from(buf, at)
+        at += 2
+        keys.append((key, n))
+    total = sum(n for key, n in keys)
+    flags, value, orig, vmin, vmax, steps, freq, count, cfunc, func, func_n, func_at, seq_n, seq_at = _records(buf, at, total)
+    at += total * _RECORD.size
+    n, size = _U32.unpack_from(buf, at)[0], _U32.unpack_from(buf, at + 4)[0]
+    items = _items(buf, at + 8, n, size)
+    funcs = [None if f == 0 else items[i] if f == 1 else list(items[i:i + m]) for f, m, i in zip(func, func_n, func_at)]
+    seqs = [None if m == _NONE else list(items[i:i + m]) for m, i in zip(seq_n, seq_at)]
+    params = list(map(Param, orig, vmin, vmax, funcs, steps, freq, seqs, [bool(f & 1) for f in flags]))
+    for p, v, c, f in zip(params, value, count, cfunc):
+        p.value, p.count, p.cfunc = v, c, f
+    i = 0
+    for key, n in keys:
+        dna.data[key] = tuple(params[i:i + n])
+        i += n
+    return dna
+
+def write_population(path, dnas):
+    # writes DNAs (or already serialized genomes as bytes) to a population file, returns the number of genomes
+    blobs = [d if isinstance(d, (bytes, bytearray)) else dumps(d) for d in dnas]
+    offsets = [0]
+    for b in blobs:
+        offsets.append(offsets[-1] + len(b))
+    start = _POP_HEAD.size + 8 * len(offsets)
+    with open(path, "wb") as f:
+        f.write(_POP_HEAD.pack(POPULATION_MAGIC, POPULATION_VERSION, 0, len(blobs)))
+        f.write(struct.pack("<%dQ" % len(offsets), *[start + o for o in offsets]))
+        for b in blobs:
+            f.write(b)
+    return len(blobs)
+
+class Population():
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.buf = memoryview(self.map)
+        magic, version, reserved, self.count = _POP_HEAD.unpack_from(self.buf, 0)
+        if magic != POPULATION_MAGIC:
+            self.close()
+            raise ValueError("not a GrowF population file: %s" % path)
+        if version != POPULATION_VERSION:
+            self.close()
+            raise ValueError("unsupported population format version %d" % version)
+
+    def __reduce__(self):
+        # workers map the file themselves
+        return (Population, (self.path,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def raw(self, i):
+        # the serialized genome i, copied out of the mapped file
+        if self.map is None:
+            raise ValueError("population file is closed")
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("population index out of range")
+        a, b = _OFFSETS.unpack_from(self.buf, _POP_HEAD.size + 8 * i)
+        return self.map[a:b]
+
+    def __getitem__(self, i):
+        return loads(self.raw(i))
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
+
+    def close(self):
+        if self.map is None:
+            return
+        try:
+            self.buf.release()
+            self.map.close()
+        finally:
+            self.map = None
+            self.file.close()
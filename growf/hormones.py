@@ -0,0 +1,255 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+# Hormone transport: concentrations of plant hormones in every surface cell, moved from cell to cell in batched steps
+#
+#   t = Tree(hormones=HormoneTransport())      # grows with the CellEngine, whose rows are the cells
+#   t.plant(growth_steps=30)
+#   auxin = t.hormones.concentration(Hormone.AUXINS)   # one value per engine row
+#
+# Every hormone is a channel, a column of one (rows, channels) array next to the CellEngine arrays, with its own
+# source, transport, decay and effect on growth (see Channel). Every growth step, before the engine moves the cells:
+#   1. slices laid down since the last step are linked into the transport graph: around their ring, every cell to the
+#      cell at the same angle on the slice below it in its branch, and the first slice of a branch to the slice of its
+#      parent it grew out of
+#   2. the sources synthesize (the newest slice of every tip still growing, or the first slice of the trunk)
+#   3. polar transport moves a fraction of every cell's content along the branch (basipetal: toward the base, acropetal:
+#      toward the tips), diffusion exchanges a fraction of the difference with every neighbor, and some decays, auxin
+#      faster in cells facing the light (the light spends it, so it gathers on the shaded side), times their exposure
+#      when the tree has a LightField (growf.light)
+#   4. the radial growth rate of every cell becomes the rate it was born with times 1 + sum(growth * concentration)
+# The graph is kept as arrays of edges (row to row) and every move is a weighted bincount over them, a sparse
+# matrix-vector product, so a step costs time linear in the number of cells.
+# Moves are explicit and conserve what they move, keep diffusion * 4 + polar + decay + light below 1 for every channel
+# (a cell has about 4 neighbors) or concentrations start to oscillate.
+
+import numpy as np
+
+from .core import Hormone
+
+class Channel():
+    def __init__(self, kind, source=None, production=1.0, polar=0.0, diffusion=0.05, decay=0.02, light=0.0, growth=0.0):
+        self.kind = kind                # Hormone type (Hormone.AUXINS, ...)
+        self.source = source            # "tip": the newest slice of growing tips, "base": the first slice of the trunk, None
+        self.production = production    # amount every source cell synthesizes per step
+        self.polar = polar              # fraction moved along the branch per step, < 0 basipetal, > 0 acropetal
+        self.diffusion = diffusion      # fraction of the difference exchanged with every neighbor per step
+        self.decay = decay              # fraction lost per step
+        self.light = light              # fraction spent per step by a cell facing the light (times the cosine)
+        self.growth = growth            # change of the radial growth rate per unit of concentration (< 0 inhibits)
+
+    def __repr__(self):
+        return "Channel(%r, source=%r, production=%r, polar=%r, diffusion=%r, decay=%r, light=%r, growth=%r)" % (self.kind, self.source, self.production, self.polar, self.diffusion, self.decay, self.light, self.growth)
+
+def default_channels():
+    # auxin is made in the tips and flows to the base, cytokinin comes up from the base (the roots), gibberellins are
+    # made in the tips and spread without direction, ethylene is only there when something puts it in (see add)
+    return (
+        Channel(Hormone.AUXINS, source="tip", production=1.0, polar=-0.3, diffusion=0.05, decay=0.02, light=0.1, growth=0.1),
+        Channel(Hormone.CYTOKININS, source="base", production=1.0, polar=0.3, diffusion=0.05, decay=0.02, growth=0.05),
+        Channel(Hormone.GIBBERELLINS, source="tip", production=0.5, polar=0.0, diffusion=0.1, decay=0.05, growth=0.1),
+        Channel(Hormone.ETHYLENE, diffusion=0.2, decay=0.1, growth=-0.1),
+    )
+
+_EMPTY = np.zeros(0, dtype=np.int64)
+
+class HormoneTransport():
+    def __init__(self, channels=None, min_growth=0.0, max_growth=4.0):
+        self.channels = default_channels() if channels is None else tuple(channels)
+        self.min_growth = min_growth    # limits of the factor the radial growth rate of a cell is multiplied by
+        self.max_growth = max_growth
+        self.attach(None)
+
+    def key(self):
+        # everything about the transport that decides how a tree grows, for growf.cache
+        return (self.channels, self.min_growth, self.max_growth)
+
+    def attach(self, engine):
+        # starts over on the rows of engine (Tree.begin)
+        self.engine = engine
+        if engine is not None:
+            engine.hormones = self
+        cap = 0 if engine is None else len(engine.age)
+        self.c = np.zeros((cap, len(self.channels)))    # concentrations, one row per engine row
+        self.base = np.zeros(cap)                       # radial growth rate every row was born with
+        self.facing = np.zeros(cap)                     # cosine between the outward direction of a row and the light
+        self.count = 0                                  # rows linked so far
+        self.seen = []                                  # slices linked of every tip, in the order of tree.tips
+        self.rings = []         # diffusion edges around rings, as chunks of (rows, rows)
+        self.columns = []       # edges along branches as chunks of (upper rows, lower rows), every upper row has one
+        self.stale = True
+
+    def reserve(self, n):
+        cap = len(self.base)
+        if n <= cap:
+            return
+        cap = max(n, cap * 2)
+        for k in ("c", "base", "facing"):
+            a = getattr(self, k)
+            b = np.zeros((cap,) + a.shape[1:], dtype=a.dtype)
+            b[:self.count] = a[:self.count]
+            setattr(self, k, b)
+
+    def index(self, kind):
+        for i, ch in enumerate(self.channels):
+            if ch.kind == kind:
+                return i
+        raise KeyError("no hormone channel of type %r" % (kind,))
+
+    def concentration(self, kind):
+        # the concentration of a hormone type in every linked engine row
+        return self.c[:self.count, self.index(kind)]
+
+    def add(self, kind, rows, amount):
+        # puts amount of a hormone into the given engine rows (wounds, treatments, anything outside of the sources)
+        self.c[rows, self.index(kind)] += amount
+
+    def give(self, src, dst, kind, ratio):
+        # moves ratio of row src's hormone to row dst (Cell.give), returns the amount moved
+        k = self.index(getattr(kind, "type", kind))
+        v = self.c[src, k] * ratio
+        self.c[src, k] -= v
+        self.c[dst, k] += v
+        return float(v)
+
+    # Topology
+
+    def link(self, tree):
+        # links the slices every tip laid down since the last step
+        for i, tip in enumerate(tree.tips):
+            if i == len(self.seen):
+                self.seen.append(0)
+            for k in range(self.seen[i], len(tip.branch)):
+                self.link_slice(tip, k)
+            self.seen[i] = len(tip.branch)
+
+    def link_slice(self, tip, k):
+        slc = tip.branch[k]
+        i0, n = slc.span
+        self.reserve(i0 + n)
+        rows = np.arange(i0, i0 + n)
+        e = self.engine
+        self.base[rows] = e.rate_growth_radial[rows]
+        out = e.origv[rows]
+        norm = np.sqrt((out ** 2).sum(axis=1))
+        light = np.array(tuple(tip.light_axis.normalized()))
+        self.facing[rows] = np.where(norm > 0, out @ light / np.where(norm > 0, norm, 1.0), 0.0)
+        self.count = max(self.count, i0 + n)
+        if n > 1:
+            m = n if n > 2 else 1
+            self.rings.append((rows[:m], i0 + (np.arange(m) + 1) % n))
+        below = tip.branch[k - 1] if k > 0 else self.attach_slice(tip)
+        if below is not None:
+            b0, bn = below.span
+            self.columns.append((rows, b0 + np.arange(n) * bn // n))
+        self.stale = True
+
+    def attach_slice(self, tip):
+        # the slice of the parent a branch grew out of: the one laid down where the branch starts
+        parent = tip.parent
+        if parent is None or not parent.branch:
+            return None
+        start = tip.branch[0].center
+        best, dist = None, None
+        for slc in reversed(parent.branch):
+            d = (slc.center - start).length
+            if dist is None or d < dist:
+                best, dist = slc, d
+                if d == 0.0:
+                    break
+        return best
+
+    def join(self):
+        # the edge chunks as single arrays, and what polar transport needs: which rows have a row below them and how
+        # many rows above them every row feeds
+        n = self.count
+        ring_a = np.concatenate([a for a, b in self.rings] + [_EMPTY])
+        ring_b = np.concatenate([b for a, b in self.rings] + [_EMPTY])
+        self.upper = np.concatenate([a for a, b in self.columns] + [_EMPTY])
+        self.lower = np.concatenate([b for a, b in self.columns] + [_EMPTY])
+        self.rings = [(ring_a, ring_b)]
+        self.columns = [(self.upper, self.lower)]
+        self.edge_a = np.concatenate((ring_a, self.upper))
+        self.edge_b = np.concatenate((ring_b, self.lower))
+        self.has_lower = np.bincount(self.upper, minlength=n) > 0
+        self.uppers = np.bincount(self.lower, minlength=n)
+        self.stale = False
+
+    # Growth step
+
+    def sources(self, tree):
+        tips, base = [], []
+        for tip in tree.active:
+            if tip.branch and tip.can_grow():
+                tips.append(tip.branch[-1].span)
+        if tree.tips and tree.tips[0].branch:
+            base.append(tree.tips[0].branch[0].span)
+        rows = lambda spans: np.concatenate([np.arange(i0, i0 + n) for i0, n in spans] + [_EMPTY])
+        return {"tip": rows(tips), "base": rows(base)}
+
+    def step(self, tree):
+        e = self.engine
+        if e is None:
+            return
+        self.link(tree)
+        if self.stale:
+            self.join()
+        n = self.count
+        c = self.c[:n]
+        chs = self.channels
+        sources = self.sources(tree)
+        for k, ch in enumerate(chs):
+            if ch.source is not None:
+                c[sources[ch.source], k] += ch.production
+
+        diffusion = np.array([ch.diffusion for ch in chs])
+        down = np.array([max(-ch.polar, 0.0) for ch in chs])
+        up = np.array([max(ch.polar, 0.0) for ch in chs])
+        delta = np.zeros_like(c)
+        a, b = self.edge_a, self.edge_b
+        if len(a):
+            flow = (c[a] - c[b]) * diffusion
+            for k in range(len(chs)):
+                if diffusion[k]:
+                    delta[:, k] += np.bincount(b, weights=flow[:, k], minlength=n) - np.bincount(a, weights=flow[:, k], minlength=n)
+        upper, lower = self.upper, self.lower
+        if len(upper):
+            fed = 1.0 / self.uppers[lower]     # a row feeds all rows above it evenly
+            for k in range(len(chs)):
+                if down[k]:
+                    delta[:, k] += np.bincount(lower, weights=c[upper, k] * down[k], minlength=n)
+                    delta[self.has_lower, k] -= c[self.has_lower, k] * down[k]
+                if up[k]:
+                    delta[:, k] += np.bincount(upper, weights=c[lower, k] * up[k] * fed, minlength=n)
+                    delta[self.uppers > 0, k] -= c[self.uppers > 0, k] * up[k]
+        decay = np.array([ch.decay for ch in chs])
+        light = np.array([ch.light for ch in chs])
+        c += delta
+        lit = np.maximum(self.facing[:n], 0.0)
+        if tree.light is not None:
+            lit = lit * tree.light.at(n)
+        c *= 1.0 - decay - lit[:, None] * light
+        np.maximum(c, 0.0, out=c)
+
+        growth = np.array([ch.growth for ch in chs])
+        factor = np.clip(1.0 + c @ growth, self.min_growth, self.max_growth)
+        e.rate_growth_radial[:n] = self.base[:n] * factor
+
+    # Snapshots (growf.state)
+
+    def arrays(self):
+        if self.stale:
+            self.join()
+        n = self.count
+        return {"c": self.c[:n], "base": self.base[:n], "facing": self.facing[:n], "ring_a": self.rings[0][0], "ring_b": self.rings[0][1], "upper": self.upper, "lower": self.lower}
+
+    def load_arrays(self, engine, arrays, count, seen):
+        self.attach(engine)
+        self.reserve(count)
+        self.count = count
+        for k in ("c", "base", "facing"):
+            getattr(self, k)[:count] = arrays[k]
+        self.rings = [(np.array(arrays["ring_a"], dtype=np.int64), np.array(arrays["ring_b"], dtype=np.int64))]
+        self.columns = [(np.array(arrays["upper"], dtype=np.int64), np.array(arrays["lower"], dtype=np.int64))]
+        self.seen = list(seen)
+        self.stale = True
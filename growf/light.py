@@ -0,0 +1,132 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+# Light exposure: how much light reaches every cell and tip, from an occupancy grid of the tree instead of raytracing
+#
+#   t = Tree(light=LightField(resolution=0.05))    # one light, along the tips' light axis
+#   t = Tree(light=LightField(directions=[((0.5, 0.5, 1.0), 0.7), ((0.0, 0.0, 1.0), 0.3)]))    # a sky of several
+#   t.plant(growth_steps=30)
+#   t.light.exposure                                # per CellEngine row, 1.0 in full light
+#
+# The tree is voxelized into a sparse occupancy grid: the resolution sized cubes that hold at least one cell. Cubes of
+# frozen slices never change and are kept from pass to pass, only cells still growing are voxelized again.
+# For every light direction the occupied cubes are binned into columns along the light and sorted by depth once, then
+# every cell and tip counts the cubes in front of it in its column with a binary search (its own cube and the next
+# don't count, they are its own surface). Exposure is exp(-attenuation * cubes in front), averaged over the directions
+# by their weights. A pass costs O(N log N) for N cells instead of the N x N ray tests of tracing from every cell.
+# A pass runs every `every` growth steps after the tips moved (Tree(light=...) implies the engine). Tips get their
+# exposure, which makes photolocate turn shaded tips harder toward the light, and with several directions a light_axis
+# pointing to where most of their light comes from. Hormone transport (growf.hormones) spends auxin by exposure.
+# Other trees (set_external, see growf.forest) add their cubes to the grid, so trees shade each other.
+
+import math
+
+import numpy as np
+
+from .vector import Vector
+from .spatial import pack, unpack
+
+class LightField():
+    def __init__(self, resolution=0.05, directions=None, attenuation=0.5, every=1):
+        self.resolution = resolution    # edge length of the cubes of the occupancy grid
+        self.directions = None if directions is None else tuple((tuple(d), float(w)) for d, w in directions)    # (direction toward the light, weight), None: the tips' light axis
+        self.attenuation = attenuation  # light lost per occupied cube in front
+        self.every = every              # growth steps between passes
+        self.attach(None)
+
+    def key(self):
+        # everything about the light that decides how a tree grows, for growf.cache
+        return (self.resolution, self.directions, self.attenuation, self.every)
+
+    def attach(self, engine):
+        # starts over on the rows of engine (Tree.begin)
+        self.engine = engine
+        self.exposure = np.ones(0)                      # per engine row, of the last pass
+        self.static = np.zeros(0, dtype=np.int64)       # occupied cubes of frozen rows, as packed keys (see growf.spatial.pack)
+        self.settled = np.zeros(0, dtype=bool)          # rows whose cubes are in static
+        self.external = np.zeros(0, dtype=np.int64)     # occupied cubes of other trees, see set_external
+
+    def set_external(self, points):
+        # cells of other trees (see growf.forest) as points, they shade this tree's cells and tips too
+        self.external = np.unique(pack(self.cubes(np.asarray(points, dtype=np.float64).reshape(-1, 3))))
+
+    def at(self, n):
+        # exposure of the first n rows, rows born since the last pass are in full light
+        if len(self.exposure) >= n:
+            return self.exposure[:n]
+        return np.concatenate((self.exposure, np.ones(n - len(self.exposure))))
+
+    def lights(self, tree):
+        if self.directions is not None:
+            dirs = self.directions
+        else:
+            dirs = ((tuple(tree.tips[0].light_axis), 1.0),) if tree.tips else ()
+        out = []
+        for d, w in dirs:
+            d = np.array(d, dtype=np.float64)
+            out.append((d / np.sqrt((d ** 2).sum()), w))
+        return out
+
+    # Occupancy
+
+    def cubes(self, loc):
+        return np.floor(loc / self.resolution).astype(np.int64)
+
+    def occupied(self):
+        # centers of the occupied cubes, frozen rows are added to static once
+        e = self.engine
+        n = e.count
+        if len(self.settled) < n:
+            self.settled = np.concatenate((self.settled, np.zeros(n - len(self.settled), dtype=bool)))
+        live = e.live[:n]
+        new = ~live & ~self.settled[:n]
+        if new.any():
+            self.static = np.unique(np.concatenate((self.static, pack(self.cubes(e.loc[:n][new])))))
+            self.settled[:n] |= new
+        keys = np.unique(np.concatenate((self.static, self.external, pack(self.cubes(e.loc[:n][live])))))
+        return (unpack(keys) + 0.5) * self.resolution
+
+    # Shading
+
+    def shade(self, centers, points, d):
+        # number of occupied cubes in front of every point, toward the light along d
+        r = self.resolution
+        u = np.cross(d, (1.0, 0.0, 0.0) if abs(d[0]) < 0.9 else (0.0, 1.0, 0.0))
+        u /= np.sqrt((u ** 2).sum())
+        w = np.cross(d, u)
+        both = np.concatenate((centers, points))
+        cu = np.floor(both @ u / r).astype(np.int64)
+        cw = np.floor(both @ w / r).astype(np.int64)
+        ct = np.floor(both @ d / r).astype(np.int64)
+        cu -= cu.min()
+        cw -= cw.min()
+        ct -= ct.min()
+        depth = int(ct.max()) + 3
+        col = cu * (int(cw.max()) + 1) + cw
+        m = len(centers)
+        keys = np.sort(col[:m] * depth + ct[:m])
+        pc, pt = col[m:], ct[m:]
+        return np.searchsorted(keys, (pc + 1) * depth) - np.searchsorted(keys, pc * depth + pt + 2)
+
+    def step(self, tree):
+        # one pass over all cells and the active tips
+        e = self.engine
+        if e is None or e.count == 0 or tree.age % self.every:
+            return
+        n = e.count
+        centers = self.occupied()
+        tips = [t for t in tree.active if not t.skeleton]
+        points = np.concatenate((e.loc[:n].astype(np.float64), np.array([tuple(t.loc) for t in tips], dtype=np.float64).reshape(-1, 3)))
+        lights = self.lights(tree)
+        total = sum(w for d, w in lights)
+        exposure = np.zeros(len(points))
+        axis = np.zeros((len(tips), 3))
+        for d, w in lights:
+            lit = np.exp(-self.attenuation * self.shade(centers, points, d))
+            exposure += lit * (w / total)
+            axis += lit[n:, None] * (w * d)
+        self.exposure = exposure[:n]
+        for t, x, a in zip(tips, exposure[n:], axis):
+            t.exposure = float(x)
+            if len(lights) > 1 and (a ** 2).sum() > 0.0:
+                t.light_axis = Vector(tuple(a / math.sqrt((a ** 2).sum())))
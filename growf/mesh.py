@@ -0,0 +1,217 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+# Bulk mesh export: the vertices, quads and loop colors of a whole Tree as flat numpy buffers
+# The layout is the one Tree.show has always built face by face in bmesh: per tip one loose vertex at the tip,
+# then the ring of every slice, and between two consecutive slices of a branch one quad per cell, colored by that cell.
+# In Blender the buffers are pushed with foreach_set (see growf.blender.show), anywhere else they are plain arrays.
+#
+# Levels of detail: at lod k only every 2**k-th cell of a ring (rings keep at least 3 cells) and every 2**k-th slice of
+# a branch are meshed. The first and last slice of every branch are always kept, and so is every slice a child branch
+# starts from, so branches still leave their parents where they did. One grown tree gives all levels (mesh_lods).
+
+import numpy as np
+
+class MeshBuffers():
+    def __init__(self, verts, quads, face_colors, vert_colors):
+        self.verts = verts              # (V, 3) float32 vertex coordinates
+        self.quads = quads              # (F, 4) int32 vertex indices, wound like Tree.show's faces
+        self.face_colors = face_colors  # (F, 3) float32 rgb, every loop of a face has its face's color
+        self.vert_colors = vert_colors  # (V, 3) float32 rgb of the cell at each vertex (white for tip vertices)
+
+    def loop_colors(self):
+        # (F * 4, 4) rgba per face corner, the layout of a Blender loop color layer
+        rgba = np.ones((len(self.face_colors), 4), dtype=np.float32)
+        rgba[:, :3] = self.face_colors
+        return np.repeat(rgba, 4, axis=0)
+
+def ring_quads(base, prev, n):
+    # quads between rings of n cells starting at vertex indices prev (below) and base, for arrays of ring pairs
+    # returns (pairs, n, 4) vertex indices and (pairs, n) index of the cell whose color each face takes
+    base = np.asarray(base, dtype=np.int64)[:, None]
+    prev = np.asarray(prev, dtype=np.int64)[:, None]
+    i = np.arange(1, n)
+    quads = np.empty((len(base), n, 4), dtype=np.int64)
+    quads[:, :-1] = np.stack((base + i, base + i - 1, prev + i - 1, prev + i), axis=-1)
+    quads[:, -1] = np.concatenate((base, base + n - 1, prev + n - 1, prev), axis=1)
+    color_of = base + np.concatenate((i, [n - 1]))
+    return quads, color_of
+
+def ring_step(n, lod=0):
+    # every how many cells a ring of n cells is sampled at a level of detail, fewer than 3 cells are never left
+    s = 1 << lod
+    while s > 1 and -(-n // s) < 3:
+        s >>= 1
+    return s
+
+def ring_size(n, lod=0):
+    return -(-n // ring_step(n, lod))
+
+def junctions(tree):
+    # ids of the slices child tips start from: a child's first slice is centered where its parent's slice was laid down
+    starts = {}
+    for tip in tree.tips:
+        if tip.parent is not None and tip.branch:
+            starts.setdefault(id(tip.parent), set()).add(tuple(tip.branch[0].center))
+    out = set()
+    for tip in tree.tips:
+        centers = starts.get(id(tip))
+        if centers:
+            out.update(id(slc) for slc in tip.branch if tuple(slc.center) in centers)
+    return out
+
+def lod_slices(tip, lod=0, keep=()):
+    # the slices of a tip's branch meshed at a level of detail, keep: ids of slices that stay anyway (see junctions)
+    if lod == 0:
+        return tip.branch
+    k = 1 << lod
+    last = len(tip.branch) - 1
+    return [slc for i, slc in enumerate(tip.branch) if i % k == 0 or i == last or id(slc) in keep]
+
+def write_slices(verts, colors, placed, lod=0):
+    # copies positions and colors of [(vertex index, slice), ...] into the buffers, rings sampled as ring_step says
+    # engine rows are gathered in one fancy-indexing pass, frozen blocks are copied whole, Cell objects one by one
+    engine, rows, dest = None, [], []
+    for i, slc in placed:
+        n = len(slc)
+        s = ring_step(n, lod)
+        m = -(-n // s)
+        if slc.frozen is not None:
+            verts[i:i + m] = slc.frozen[::s, :3]
+            colors[i:i + m] = slc.frozen[::s, 3:6]
+        elif slc.engine is not None:
+            engine = slc.engine
+            i0 = slc.span[0]
+            rows.append(np.arange(i0, i0 + n, s))
+            dest.append(np.arange(i, i + m))
+        elif n:
+            cells = slc.cells[::s]
+            verts[i:i + m] = [tuple(c.loc) for c in cells]
+            colors[i:i + m] = [(c.color.r, c.color.g, c.color.b) for c in cells]
+    if rows:
+        rows, dest = np.concatenate(rows), np.concatenate(dest)
+        verts[dest] = engine.loc[rows]
+        colors[dest] = engine.colors(rows)
+
+def mesh_buffers(tree, tip_verts=True, lod=0, keep=None):
+    # keep: junctions(tree), when meshing several levels of detail it only has to be found once
+
+    if lod and keep is None:
+        keep = junctions(tree)
+
+    # Lay out the vertex buffer: one pass over tips and slices, nothing per cell yet
+    offset = 0
+    tip_rows = []                   # (vertex index, tip)
+    placed = []                     # (vertex index, slice)
+    pairs = []                      # (base, prev, n) of consecutive slices
+    for tip in tree.tips:
+        if tip_verts:
+            tip_rows.append((offset, tip))
+            offset += 1
+        prev, prev_n = None, 0
+        for slc in lod_slices(tip, lod, keep):
+            n = len(slc)
+            m = ring_size(n, lod)
+            placed.append((offset, slc))
+            if prev is not None and n == prev_n and m > 1:
+                pairs.append((offset, prev, m))
+            prev, prev_n = offset, n
+            offset += m
+
+    verts = np.zeros((offset, 3), dtype=np.float32)
+    colors = np.ones((offset, 3), dtype=np.float32)
+    for i, tip in tip_rows:
+        verts[i] = tuple(tip.loc)
+    write_slices(verts, colors, placed, lod)
+
+    # Quads for every pair of consecutive slices, batched by ring size and put back in tip/slice order
+    if not pairs:
+        return MeshBuffers(verts, np.zeros((0, 4), dtype=np.int32), np.zeros((0, 3), dtype=np.float32), colors)
+    base, prev, ns = (np.array(a, dtype=np.int64) for a in zip(*pairs))
+    starts = np.concatenate(([0], np.cumsum(ns)[:-1]))
+    quads = np.empty((int(ns.sum()), 4), dtype=np.int32)
+    face_colors = np.empty((len(quads), 3), dtype=np.float32)
+    for n in np.unique(ns):
+        sel = np.nonzero(ns == n)[0]
+        q, color_of = ring_quads(base[sel], prev[sel], int(n))
+        at = (starts[sel][:, None] + np.arange(n)).ravel()
+        quads[at] = q.reshape(-1, 4)
+        face_colors[at] = colors[color_of.ravel()]
+    return MeshBuffers(verts, quads, face_colors, colors)
+
+def mesh_lods(tree, lods=(0, 1, 2), tip_verts=True):
+    # {lod: MeshBuffers} of one grown tree
+    keep = junctions(tree)
+    return {lod: mesh_buffers(tree, tip_verts=tip_verts, lod=lod, keep=keep) for lod in lods}
+
+# RetainedMesh keeps the buffers of a growing tree between frames (animation playback, growth processions)
+# update() appends the slices created since the last call and rewrites positions and colors only for slices whose
+# cells still move; frozen slices are written one last time and then left alone.
+# Vertices are numbered in the order slices appear, so the layout differs from mesh_buffers, the faces are the same.
+class RetainedMesh():
+    def __init__(self, tree, tip_verts=True, capacity=1024):
+        self.tree = tree
+        self.tip_verts = tip_verts
+        self.nv, self.nf = 0, 0
+        self.verts = np.zeros((capacity, 3), dtype=np.float32)
+        self.vert_colors = np.ones((capacity, 3), dtype=np.float32)
+        self.quads = np.zeros((capacity, 4), dtype=np.int32)
+        self.face_colors = np.ones((capacity, 3), dtype=np.float32)
+        self.tips = {}      # id(tip) -> [tip, tip vertex, slices seen, record of the last slice]
+        self.moving = []    # [slice, first vertex, cells, first face or -1] of slices still growing
+
+    def grow_buffers(self, nv, nf):
+        for k, need in (("verts", nv), ("vert_colors", nv), ("quads", nf), ("face_colors", nf)):
+            a = getattr(self, k)
+            if need > len(a):
+                b = np.ones((max(need, len(a) * 2),) + a.shape[1:], dtype=a.dtype)
+                b[:len(a)] = a
+                setattr(self, k, b)
+
+    def add_verts(self, n):
+        i = self.nv
+        self.nv += n
+        self.grow_buffers(self.nv, self.nf)
+        return i
+
+    def add_faces(self, n):
+        i = self.nf
+        self.nf += n
+        self.grow_buffers(self.nv, self.nf)
+        return i
+
+    def update(self):
+        # returns (new vertices, new faces) since the last update
+        nv, nf = self.nv, self.nf
+        for tip in self.tree.tips:
+            entry = self.tips.get(id(tip))
+            if entry is None:
+                entry = self.tips[id(tip)] = [tip, self.add_verts(1) if self.tip_verts else -1, 0, None]
+            if self.tip_verts:
+                self.verts[entry[1]] = tuple(tip.loc)
+            while entry[2] < len(tip.branch):
+                slc = tip.branch[entry[2]]
+                entry[2] += 1
+                n = len(slc)
+                rec = [slc, self.add_verts(n), n, -1]
+                prev = entry[3]
+                if prev is not None and prev[2] == n and n > 1:
+                    rec[3] = self.add_faces(n)
+                    self.quads[rec[3]:rec[3] + n] = ring_quads([rec[1]], [prev[1]], n)[0][0]
+                entry[3] = rec
+                self.moving.append(rec)
+
+        write_slices(self.verts, self.vert_colors, [(rec[1], rec[0]) for rec in self.moving])
+        at, color_of = [], []
+        for slc, v0, n, f0 in self.moving:
+            if f0 >= 0:
+                at.append(np.arange(f0, f0 + n))
+                color_of.append(v0 + np.concatenate((np.arange(1, n), [n - 1])))
+        if at:
+            self.face_colors[np.concatenate(at)] = self.vert_colors[np.concatenate(color_of)]
+        self.moving = [rec for rec in self.moving if rec[0].frozen is None]
+        return self.nv - nv, self.nf - nf
+
+    def buffers(self):
+        # the current state as MeshBuffers (views, copy them to keep a frame)
+        return MeshBuffers(self.verts[:self.nv], self.quads[:self.nf], self.face_colors[:self.nf], self.vert_colors[:self.nv])
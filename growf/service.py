@@ -0,0 +1,279 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+# Growth service: a long running asyncio server that grows organisms on demand in a process pool and streams their meshes
+#
+#   python -m growf.service --port 7341 --workers 4
+#
+#   async with GrowthClient("127.0.0.1", 7341) as client:             # the stand-in client
+#       mesh = await client.mesh(dna.serialize(), "GrowF", 30)         # a growf.mesh.MeshBuffers
+#       async for array, start, rows in client.chunks(None, "GrowF-7", 30, lod=1):
+#           ...                                                         # rows start.. of mesh.verts, quads, ...
+#
+#   service = GrowthService(workers=4)                                  # or in the same event loop, without TCP
+#   mesh = await service.grow(None, "GrowF", 30)
+#
+# A job is (serialized DNA or None for the default organism, namespace, steps, lod), grown headless like a growf.batch
+# job in a worker process and meshed with mesh_buffers (no loose tip vertices). The same job always gives the same mesh.
+#   - backpressure: at most max_pending different jobs are waiting for or in the pool, more wait for a free slot, and a
+#     connection isn't read from while its newest job waits, so a client sending faster than the pool grows is held
+#     back by TCP instead of filling memory
+#   - identical jobs in flight are grown once, every request for them gets the same mesh
+#   - a mesh is sent in chunks of at most chunk bytes as soon as its job is done, the jobs of one connection run
+#     concurrently and their chunks interleave
+# Protocol: a request is one line of JSON {"id", "dna" (base64, or null), "namespace", "steps", "lod"}, every reply is
+# one line of JSON, a chunk's bytes follow its line:
+#   {"id", "array", "start", "rows", "bytes"}     rows of array (see ARRAYS) from start on, C order
+#   {"id", "done": true, "counts": {array: rows}} after the last chunk of a job
+#   {"id", "error": message}
+
+import sys
+import json
+import base64
+import asyncio
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .core import DNA
+from .batch import grow_tree
+from .mesh import MeshBuffers, mesh_buffers
+
+PORT = 7341
+ARRAYS = (("verts", 3, np.float32), ("quads", 4, np.int32), ("face_colors", 3, np.float32), ("vert_colors", 3, np.float32))
+
+def grow_mesh(data, namespace, steps, lod=0, engine=False):
+    # runs in the worker processes: grows the serialized DNA data (None for the default organism) and meshes it
+    dna = None if data is None else DNA(None).unserialize(data)
+    t = grow_tree((dna, namespace, steps), engine=engine)
+    return mesh_buffers(t, tip_verts=False, lod=lod)
+
+def job_key(data, namespace, steps, lod=0):
+    h = hashlib.sha1(b"" if data is None else data)
+    h.update(("|%d|%r|%d|%d" % (data is None, namespace, steps, lod)).encode("utf-8"))
+    return h.hexdigest()
+
+def mesh_chunks(mesh, chunk):
+    # (array, start, rows) of mesh, at most chunk bytes each (and at least one row)
+    for name, width, dtype in ARRAYS:
+        a = getattr(mesh, name)
+        step = max(1, chunk // (width * np.dtype(dtype).itemsize))
+        for start in range(0, len(a), step):
+            yield name, start, a[start:start + step]
+
+class GrowthService():
+    def __init__(self, workers=None, max_pending=64, chunk=1 << 16, engine=False):
+        self.workers = workers          # worker processes, None one per core, 0 grows in a thread of this process
+        self.max_pending = max_pending  # different jobs waiting for or in the pool at most
+        self.chunk = chunk              # bytes per streamed chunk at most
+        self.engine = engine            # grow with the CellEngine
+        self.pool = None
+        self.slots = None
+        self.inflight = {}              # job key -> future of its mesh
+        self.grown = 0                  # jobs sent to the pool
+        self.joined = 0                 # requests that got the mesh of an identical job in flight
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def start(self):
+        # call in the event loop the service runs in
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.max_pending)
+        if self.pool is None and self.workers != 0:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=True)
+            self.pool = None
+
+    async def submit(self, data, namespace, steps, lod=0):
+        # a future of the job's mesh, once the job has a slot (or is in flight already)
+        self.start()
+        key = job_key(data, namespace, steps, lod)
+        fut = self.inflight.get(key)
+        if fut is None:
+            await self.slots.acquire()
+            fut = self.inflight.get(key)   # the same job may have started while this one waited
+            if fut is None:
+                fut = self.inflight[key] = asyncio.get_running_loop().create_future()
+                self.grown += 1
+                asyncio.ensure_future(self.run(key, fut, (data, namespace, steps, lod, self.engine)))
+                return fut
+            self.slots.release()
+        self.joined += 1
+        return fut
+
+    async def run(self, key, fut, args):
+        try:
+            mesh = await asyncio.get_running_loop().run_in_executor(self.pool, grow_mesh, *args)
+            fut.set_result(mesh)
+        except Exception as e:
+            fut.set_exception(e)
+        finally:
+            del self.inflight[key]
+            self.slots.release()
+
+    async def grow(self, data, namespace, steps, lod=0):
+        return await asyncio.shield(await self.submit(data, namespace, steps, lod))
+
+    # TCP
+
+    async def serve(self, host="127.0.0.1", port=PORT, ready=None):
+        # serves until cancelled, ready(server) is called once it listens
+        self.start()
+        server = await asyncio.start_server(self.handle, host, port)
+        if ready is not None:
+            ready(server)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+    async def handle(self, reader, writer):
+        lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                rid = None
+                try:
+                    req = json.loads(line)
+                    rid = req.get("id")
+                    data = None if req.get("dna") is None else base64.b64decode(req["dna"])
+                    fut = await self.submit(data, req.get("namespace", "GrowF"), int(req["steps"]), int(req.get("lod", 0)))
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    await self.send(writer, lock, {"id": rid, "error": "bad request: %s" % (e,)})
+                    continue
+                task = asyncio.ensure_future(self.reply(writer, lock, rid, fut))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def send(self, writer, lock, msg, payload=b""):
+        async with lock:
+            writer.write(json.dumps(msg).encode("utf-8") + b"\n")
+            if payload:
+                writer.write(payload)
+            await writer.drain()
+
+    async def reply(self, writer, lock, rid, fut):
+        try:
+            mesh = await asyncio.shield(fut)
+        except Exception as e:
+            await self.send(writer, lock, {"id": rid, "error": "%s: %s" % (type(e).__name__, e)})
+            return
+        for name, start, rows in mesh_chunks(mesh, self.chunk):
+            payload = np.ascontiguousarray(rows).tobytes()
+            await self.send(writer, lock, {"id": rid, "array": name, "start": start, "rows": len(rows), "bytes": len(payload)}, payload)
+        await self.send(writer, lock, {"id": rid, "done": True, "counts": {name: len(getattr(mesh, name)) for name, w, d in ARRAYS}})
+
+class GrowthClient():
+    # stand-in for the front end: many requests over one connection, replies sorted out by id
+    def __init__(self, host="127.0.0.1", port=PORT):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+        self.receiver = None
+        self.queues = {}    # request id -> queue of its replies
+        self.next_id = 0
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.receiver = asyncio.ensure_future(self.receive())
+
+    async def close(self):
+        self.writer.close()
+        self.receiver.cancel()
+
+    async def receive(self):
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                msg = json.loads(line)
+                if "bytes" in msg:
+                    msg["payload"] = await self.reader.readexactly(msg["bytes"])
+                q = self.queues.get(msg["id"])
+                if q is not None:
+                    q.put_nowait(msg)
+        finally:
+            for q in self.queues.values():
+                q.put_nowait({"error": "connection closed"})
+
+    async def chunks(self, data, namespace, steps, lod=0):
+        # (array, start, rows) of the job's mesh as the chunks come in
+        rid = self.next_id
+        self.next_id += 1
+        q = self.queues[rid] = asyncio.Queue()
+        req = {"id": rid, "dna": None if data is None else base64.b64encode(data).decode("ascii"), "namespace": namespace, "steps": steps, "lod": lod}
+        self.writer.write(json.dumps(req).encode("utf-8") + b"\n")
+        await self.writer.drain()
+        widths = {name: (width, dtype) for name, width, dtype in ARRAYS}
+        try:
+            while True:
+                msg = await q.get()
+                if "error" in msg:
+                    raise RuntimeError("growth service: %s" % msg["error"])
+                if msg.get("done"):
+                    return
+                width, dtype = widths[msg["array"]]
+                yield msg["array"], msg["start"], np.frombuffer(msg["payload"], dtype=dtype).reshape(-1, width)
+        finally:
+            del self.queues[rid]
+
+    async def mesh(self, data, namespace, steps, lod=0):
+        # the whole MeshBuffers of the job
+        parts = {name: [] for name, w, d in ARRAYS}
+        async for name, start, rows in self.chunks(data, namespace, steps, lod):
+            parts[name].append(rows)
+        out = [np.concatenate(parts[name]) if parts[name] else np.zeros((0, width), dtype=dtype) for name, width, dtype in ARRAYS]
+        return MeshBuffers(*out)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m growf.service", description="Grow GrowF organisms on demand and stream their meshes")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core, 0 grows in this process)")
+    ap.add_argument("--max-pending", type=int, default=64, help="different jobs queued or growing at most")
+    ap.add_argument("--chunk", type=int, default=1 << 16, help="bytes per streamed chunk at most")
+    ap.add_argument("--engine", action="store_true", help="grow cells with the NumPy CellEngine")
+    args = ap.parse_args(argv)
+
+    service = GrowthService(workers=args.workers, max_pending=args.max_pending, chunk=args.chunk, engine=args.engine)
+    ready = lambda server: print("growf.service listening on %s:%d" % server.sockets[0].getsockname()[:2], file=sys.stderr)
+    try:
+        asyncio.run(service.serve(args.host, args.port, ready=ready))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    from growf.service import main  # so the worker processes find grow_mesh in growf.service, not in __main__
+    sys.exit(main())
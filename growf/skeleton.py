@@ -0,0 +1,93 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+# The branching structure of a tree as a graph: one vertex per step of every tip, edges along each tip's path and
+# from the point a child tip branched off its parent, and a radius per edge.
+#
+#   t = Tree(seed_r="GrowF", skeleton=True)    # grows tips only, no slices or cells
+#   t.plant(growth_steps=30)
+#   sk = skeleton(t)                            # sk.verts, sk.edges, sk.radius
+#
+# Tips move the same whether or not they lay down cells (as long as the DNA's branch Params draw no random numbers),
+# so a skeleton tree has the branches of the full tree for a small part of the cost. Full trees work too, their paths
+# are the centers of their slices.
+# Edge radii follow the pipe model: an edge carries every branch end above it and its radius is
+# tip_radius * ends ** (1 / exponent), 2 being da Vinci's rule (the cross sections of the branches add up).
+
+import numpy as np
+
+class Skeleton():
+    def __init__(self, verts, edges, radius, tips):
+        self.verts = verts      # (V, 3) float32 positions
+        self.edges = edges      # (E, 2) int32 vertex indices, from the root side to the tip side
+        self.radius = radius    # (E,) float32 radius of every edge
+        self.tips = tips        # (V,) int32 index in tree.tips of the tip each vertex belongs to
+
+def tip_path(tip):
+    # the locations a tip grew through, in order
+    if tip.skeleton:
+        return tip.path
+    return [slc.center for slc in tip.branch]
+
+def skeleton(tree, tip_radius=None, exponent=2.0):
+    # tip_radius: radius of the edges that only carry their own branch end, the DNA's initial slice radius when None
+    if tip_radius is None:
+        tip_radius = tree.dna.get("slice")[0].first()
+    index = {id(t): i for i, t in enumerate(tree.tips)}
+    paths = [[tuple(p) for p in tip_path(t)] for t in tree.tips]
+
+    # where every child starts on its parent's path: a child's first location is one its parent grew through
+    attach = [None] * len(tree.tips)
+    children = [[] for t in tree.tips]
+    for i, t in enumerate(tree.tips):
+        if t.parent is None or not paths[i] or id(t.parent) not in index:
+            continue
+        j = index[id(t.parent)]
+        parent = paths[j]
+        if not parent:
+            continue
+        start = paths[i][0]
+        try:
+            a = parent.index(start)
+        except ValueError:
+            a = min(range(len(parent)), key=lambda k: sum((x - y) ** 2 for x, y in zip(parent[k], start)))
+        attach[i] = (j, a)
+        children[j].append((a, i))
+
+    # branch ends carried by every tip (itself and everything that branched off it), children come after parents
+    ends = [1] * len(tree.tips)
+    for i in reversed(range(len(tree.tips))):
+        for a, c in children[i]:
+            ends[i] += ends[c]
+
+    # vertices, a child's first location is its parent's vertex
+    verts, vtips, ids = [], [], []
+    for i, path in enumerate(paths):
+        vs = []
+        for s, p in enumerate(path):
+            if s == 0 and attach[i] is not None:
+                j, a = attach[i]
+                vs.append(ids[j][a])
+            else:
+                vs.append(len(verts))
+                verts.append(p)
+                vtips.append(i)
+        ids.append(vs)
+
+    # an edge of a path carries the tip's own end and every child that branches off above its lower vertex
+    edges, radius = [], []
+    for i, vs in enumerate(ids):
+        carried = sorted(children[i])
+        k = 0
+        above = ends[i]
+        for s in range(len(vs) - 1):
+            while k < len(carried) and carried[k][0] <= s:
+                above -= ends[carried[k][1]]
+                k += 1
+            edges.append((vs[s], vs[s + 1]))
+            radius.append(above)
+
+    verts = np.array(verts, dtype=np.float32).reshape(-1, 3)
+    edges = np.array(edges, dtype=np.int32).reshape(-1, 2)
+    radius = tip_radius * np.array(radius, dtype=np.float32) ** (1.0 / exponent)
+    return Skeleton(verts, edges, radius.astype(np.float32), np.array(vtips, dtype=np.int32))
@@ -0,0 +1,226 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+# Spatial hash of the cells of a tree, so branches keep out of each other
+#
+#   t = Tree(spatial=SpatialHash(size=0.05))   # implies the engine
+#   t.plant(growth_steps=30)
+#   pairs = t.spatial.near(points)              # (point, engine row) pairs closer than size
+#
+# Cells are hashed into cubes with edges of length size: an index is the packed cube keys of its rows, sorted, and the rows in
+# the same order, so the rows in any cube are one binary search away. Frozen slices never move, their rows are merged
+# into a static index once, when they freeze. Rows still growing are hashed again every step (they move every step).
+# A query looks at the 27 cubes around every point (9 binary searches per index), so its cost depends on how crowded the space around the point is,
+# not on the size of the tree (up to the logarithm of the binary searches).
+# Every growth step, before the engine moves the cells:
+#   - cells closer than size to a cell of another branch are pushed away from it (on top of the ring repulsion of
+#     move_boids), by repulsion * (1 - distance / size)
+#   - tips turn away from the cells of other branches around them, like photolocate turns them toward the light
+# The first `grace` slices of a branch, where it grows out of its parent, neither push nor are avoided.
+# Cells of other trees (set_external, see growf.forest) are pushed away from and avoided the same way.
+
+import numpy as np
+
+from .vector import Vector
+
+_EMPTY = np.zeros(0, dtype=np.int64)
+
+# A cube's neighborhood as 9 runs of 3 cubes along z, whose packed keys are consecutive (z is in the lowest bits)
+OFFSETS = np.array([(x, y, -1) for x in (-1, 0, 1) for y in (-1, 0, 1)], dtype=np.int64)
+
+def pack(cubes):
+    # one int64 per integer cube coordinate, 21 bits (offset) per axis
+    c = cubes + (1 << 20)
+    return (c[:, 0] << 42) | (c[:, 1] << 21) | c[:, 2]
+
+def unpack(keys):
+    mask = (1 << 21) - 1
+    return np.stack(((keys >> 42) & mask, (keys >> 21) & mask, keys & mask), axis=1) - (1 << 20)
+
+class SpatialHash():
+    def __init__(self, size=0.05, repulsion=0.02, avoid=0.2, grace=2):
+        self.size = size            # edge length of the cubes, and the distance within which cells push each other away
+        self.repulsion = repulsion  # push per step between two cells of different branches at the same place
+        self.avoid = avoid          # how far a tip turns away from the cells of other branches per step (0.0 - 1.0)
+        self.grace = grace          # slices at the start of every branch that neither push nor are avoided
+        self.attach(None)
+
+    def key(self):
+        # everything about the hash that decides how a tree grows, for growf.cache
+        return (self.size, self.repulsion, self.avoid, self.grace)
+
+    def attach(self, engine):
+        # starts over on the rows of engine (Tree.begin)
+        self.engine = engine
+        if engine is not None:
+            engine.spatial = self
+        cap = 0 if engine is None else len(engine.age)
+        self.tip = np.full(cap, -1, dtype=np.int64)     # index in tree.tips of the tip every row belongs to
+        self.order = np.zeros(cap, dtype=np.int64)      # position of its slice in the tip's branch
+        self.settled = np.zeros(cap, dtype=bool)        # rows in the static index
+        self.seen = []                                  # slices hashed of every tip, in the order of tree.tips
+        self.static = (_EMPTY, _EMPTY)                  # (sorted cube keys, rows) of frozen rows
+        self.live = (_EMPTY, _EMPTY)                    # the same of growing rows, hashed again every step
+        self.external = (_EMPTY, np.zeros((0, 3)))      # (sorted cube keys, points) of other trees, see set_external
+
+    def reserve(self, n):
+        cap = len(self.tip)
+        if n <= cap:
+            return
+        cap = max(n, cap * 2)
+        for k, fill in (("tip", -1), ("order", 0), ("settled", False)):
+            a = getattr(self, k)
+            b = np.full(cap, fill, dtype=a.dtype)
+            b[:len(a)] = a
+            setattr(self, k, b)
+
+    def cubes(self, loc):
+        return np.floor(np.asarray(loc, dtype=np.float64) / self.size).astype(np.int64)
+
+    # Index
+
+    def link(self, tree):
+        # records the tip and slice order of the rows of every slice laid down since the last step
+        for i, tip in enumerate(tree.tips):
+            if i == len(self.seen):
+                self.seen.append(0)
+            for k in range(self.seen[i], len(tip.branch)):
+                i0, n = tip.branch[k].span
+                self.reserve(i0 + n)
+                self.tip[i0:i0 + n] = i
+                self.order[i0:i0 + n] = k
+            self.seen[i] = len(tip.branch)
+
+    def index(self):
+        # merges rows that froze since the last step into the static index and hashes the growing rows again
+        e = self.engine
+        n = e.count
+        self.reserve(n)
+        live = e.live[:n]
+        new = np.nonzero(~live & ~self.settled[:n])[0]
+        if len(new):
+            keys = pack(self.cubes(e.loc[new]))
+            order = np.argsort(keys, kind="stable")
+            keys, new = keys[order], new[order]
+            skeys, srows = self.static
+            at = np.searchsorted(skeys, keys, side="right")
+            self.static = (np.insert(skeys, at, keys), np.insert(srows, at, new))
+            self.settled[new] = True
+        rows = np.nonzero(live)[0]
+        keys = pack(self.cubes(e.loc[rows]))
+        order = np.argsort(keys, kind="stable")
+        self.live = (keys[order], rows[order])
+
+    def set_external(self, points):
+        # cells of other trees (see growf.forest) as points, which every cell and tip keeps away from too
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        keys = pack(self.cubes(points))
+        order = np.argsort(keys, kind="stable")
+        self.external = (keys[order], points[order])
+
+    def lookup(self, q, keys):
+        # (query index, position in keys) of every entry of the sorted keys in the 27 cubes around every cube of q
+        qi, at = [], []
+        if len(keys):
+            for off in OFFSETS:
+                k = pack(q + off)
+                lo = np.searchsorted(keys, k, side="left")
+                counts = np.searchsorted(keys, k + 2, side="right") - lo
+                total = counts.sum()
+                if not total:
+                    continue
+                first = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+                qi.append(np.repeat(np.arange(len(q)), counts))
+                at.append(first + np.arange(total))
+        return np.concatenate(qi + [_EMPTY]), np.concatenate(at + [_EMPTY])
+
+    def near(self, points, radius=None):
+        # (point index, engine row, offset from the row to the point, distance) of every row closer than radius
+        # (size when None, at most size) to the points
+        radius = self.size if radius is None else radius
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        q = self.cubes(points)
+        qi, rows = [], []
+        for keys, idx in (self.static, self.live):
+            i, at = self.lookup(q, keys)
+            qi.append(i)
+            rows.append(idx[at])
+        qi, rows = np.concatenate(qi), np.concatenate(rows)
+        diff = points[qi] - self.engine.loc[rows]
+        dist = np.sqrt((diff ** 2).sum(axis=1))
+        close = dist < radius
+        return qi[close], rows[close], diff[close], dist[close]
+
+    def near_external(self, points):
+        # (point index, offset from the external point, distance) of every external point closer than size
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        keys, ext = self.external
+        qi, at = self.lookup(self.cubes(points), keys)
+        diff = points[qi] - ext[at]
+        dist = np.sqrt((diff ** 2).sum(axis=1))
+        close = dist < self.size
+        return qi[close], diff[close], dist[close]
+
+    # Growth step
+
+    def step(self, tree):
+        # indexes the tree as it is now and turns the tips, the engine step then calls repel
+        if self.engine is None:
+            return
+        self.link(tree)
+        self.index()
+        if self.avoid:
+            self.steer(tree)
+
+    def push(self, qi, diff, dist, m):
+        # sum over the pairs of each point of the unit vector away from the row, weighted 1 - distance / size
+        w = (1.0 - dist / self.size) / np.where(dist > 0.0, dist, 1.0)
+        w[dist == 0.0] = 0.0
+        out = np.zeros((m, 3))
+        for k in range(3):
+            out[:, k] = np.bincount(qi, weights=diff[:, k] * w, minlength=m)
+        return out
+
+    def repel(self, idx):
+        # called by CellEngine.step for the scheduled rows, after move_boids
+        if not self.repulsion or not len(idx):
+            return
+        e = self.engine
+        qi, rows, diff, dist = self.near(e.loc[idx])
+        mine = idx[qi]
+        keep = (self.tip[rows] != self.tip[mine]) & (self.order[rows] >= self.grace) & (self.order[mine] >= self.grace)
+        f = self.push(qi[keep], diff[keep], dist[keep], len(idx))
+        if len(self.external[0]):
+            f += self.push(*self.near_external(e.loc[idx]), len(idx))
+        e.nv[idx] = e.nv[idx] + f * self.repulsion
+
+    def steer(self, tree):
+        index = {id(t): i for i, t in enumerate(tree.tips)}
+        tips = [t for t in tree.active if t.age >= self.grace and t.can_grow()]
+        if not tips:
+            return
+        points = [tuple(t.loc) for t in tips]
+        qi, rows, diff, dist = self.near(points)
+        ids = np.array([index[id(t)] for t in tips], dtype=np.int64)
+        keep = (self.tip[rows] != ids[qi]) & (self.order[rows] >= self.grace)
+        f = self.push(qi[keep], diff[keep], dist[keep], len(tips))
+        if len(self.external[0]):
+            f += self.push(*self.near_external(points), len(tips))
+        for t, p in zip(tips, f):
+            n = np.sqrt((p ** 2).sum())
+            if n > 0.0:
+                t.direction = t.direction.lerp(Vector(tuple(p * (t.direction.length / n))), self.avoid)
+
+    # Snapshots (growf.state)
+
+    def arrays(self):
+        return {"tip": self.tip[:self.engine.count], "order": self.order[:self.engine.count], "settled": self.settled[:self.engine.count], "static_keys": self.static[0], "static_rows": self.static[1]}
+
+    def load_arrays(self, engine, arrays, seen):
+        self.attach(engine)
+        n = len(arrays["tip"])
+        self.reserve(n)
+        for k in ("tip", "order", "settled"):
+            getattr(self, k)[:n] = arrays[k]
+        self.static = (np.array(arrays["static_keys"], dtype=np.int64), np.array(arrays["static_rows"], dtype=np.int64))
+        self.seen = list(seen)
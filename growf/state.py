@@ -0,0 +1,512 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+# Snapshots of a grown Tree: everything growth depends on (DNA with its Param counters, the genome it grew from, the
+# random generator, tips, slices, cells, the CellEngine arrays, hormone concentrations, light exposure and the spatial
+# hash), so that a restored tree grows on exactly like the one it was taken from.
+#
+#   save(t, "tree.gfs")             # after t.plant(growth_steps=30)
+#   t2 = Tree(settling=...)         # the same settling policy, it is not part of the snapshot
+#   load("tree.gfs", t2)
+#   t2.grow(steps=10)               # same tree as t.plant(growth_steps=40)
+#
+# Tree.snapshot(path) and Tree.restore(path) do the same, and Tree.plant(checkpoint=path) snapshots every few steps and
+# picks up from its last snapshot when it is run again after being interrupted.
+#
+# Tips and slices are stored as their attributes, with references to other tips, slices, cells, Params of the DNA
+# and Schedule views replaced by indices. Cells, the bulk of a tree, are stored as columns of two flat arrays (float64
+# and int64) next to the engine arrays and frozen slice blocks, all raw little-endian after the header.
+# Snapshots are memory-mapped when they are loaded: with numpy, the frozen slices of the restored tree stay read-only
+# views into the mapped file (snapshots are replaced, never written in place, so the mapping stays valid).
+# Cell Params are rebuilt from the DNA's "cell" entries, with the value and counters (or Schedule offset) of each cell.
+#
+# Layout:
+#   "GFST" | version u16 | reserved u16 | meta size u64 | meta (pickle) | arrays, each starting at a multiple of 64
+#   meta["arrays"] maps array names to (dtype, shape, offset)
+# The meta record is a pickle, so only load snapshots you (or your own cache) wrote.
+
+import os
+import sys
+import mmap
+import array
+import pickle
+import struct
+
+from .core import DNA, Param, ScheduledParam, Tip, Slice, Cell, _numpy
+from .vector import Vector, Quaternion, Color
+
+MAGIC = b"GFST"
+VERSION = 3
+ALIGN = 64
+
+_HEAD = struct.Struct("<4sHHQ")
+
+# Cell Params, in the order of their DNA "cell" entries 2..7
+CELL_PARAMS = ("mindist", "ease", "ease_away", "hue", "saturation", "brightness")
+# float columns: x y z | center | origin | origv | loc | v | nloc | nv | color rgb | maxdev ease2 ease_away2 rate_growth_radial | Param values
+CELL_VECTORS = ("center", "origin", "origv", "loc", "v", "nloc", "nv")
+CELL_F = 3 + 3 * len(CELL_VECTORS) + 3 + 4 + len(CELL_PARAMS)
+# int columns: age ring index flags | Param kind, count (or Schedule offset), cfunc
+CELL_I = 4 + 3 * len(CELL_PARAMS)
+# attributes kept in the columns, or rebuilt from the owning slice and the tree, anything else is stored per cell
+CELL_COLUMNS = {"rng", "x", "y", "z", "maxdev", "ease2", "ease_away2", "age", "color", "rate_growth_radial", "slice", "ring", "engine", "index"}
+CELL_COLUMNS.update(CELL_VECTORS, CELL_PARAMS)
+CELL_DEFAULTS = {"vector_up": None, "extra": None, "targets": list, "hormones": list}
+
+_CENTER, _ORIGV, _ENGINE = 1, 2, 4      # cell flags
+_PLAIN, _VIEW = 0, 1                    # cell Param kinds
+
+ENGINE_ARRAYS = ("loc", "v", "nv", "origin", "origv", "age", "rate_growth_radial", "ease2", "ease_away2", "live", "param_value", "param_count", "param_cfunc")
+SPATIAL_ARRAYS = ("tip", "order", "settled", "static_keys", "static_rows")
+HORMONE_ARRAYS = ("c", "base", "facing", "ring_a", "ring_b", "upper", "lower")
+# Tree attributes that name a tree rather than its growth, a tree restored from someone else's snapshot can keep them
+IDENTITY = ("name",)
+
+class Encoder():
+    # turns tip and slice attributes into plain picklable values, references to tree objects become tagged indices
+    def __init__(self, tree):
+        self.tree = tree
+        self.tips = {id(t): i for i, t in enumerate(tree.tips)}
+        self.slices = {}
+        self.cells = {}
+        self.entries = {id(p): (key, i) for key, params in tree.dna.data.items() for i, p in enumerate(params)}
+        self.schedules = {id(s): key for key, s in tree.dna.schedules.items()}
+        self.named = {id(x): k for k, x in (("dna", tree.dna), ("engine", tree.engine), ("rng", tree.rng), ("settling", tree.settling)) if x is not None}
+
+    def param(self, p):
+        key = self.entries.get(id(p))
+        if key is not None:
+            return ("dna",) + key
+        if isinstance(p, ScheduledParam):
+            key = self.schedules.get(id(p.schedule))
+            if key is not None and self.current(key):
+                return ("view",) + key + (p.offset,)
+            s = p.schedule.param
+            value, count, cfunc = p.schedule.state(p.offset)
+            return ("param", (s.orig, s.min, s.max, s.func, s.steps, s.freq, s.sequence, s.inherit, value, count, cfunc))
+        return ("param", (p.orig, p.min, p.max, p.func, p.steps, p.freq, p.sequence, p.inherit, p.value, p.count, p.cfunc))
+
+    def current(self, key):
+        # a Schedule view can be stored as its offset when restoring the DNA compiles the same Schedule again
+        s = self.tree.dna.schedules[key]
+        p = self.tree.dna.data[key[0]][key[1]]
+        return s.source is p and s.origin == (p.count, p.cfunc)
+
+    def encode(self, x):
+        if x is None or isinstance(x, (bool, int, float, str)):
+            return x
+        t = type(x)
+        if t is tuple:
+            return ("T", [self.encode(y) for y in x])
+        if t is list:
+            return ("L", [self.encode(y) for y in x])
+        if t is dict:
+            return ("D", [(k, self.encode(y)) for k, y in x.items()])
+        if isinstance(x, Vector):
+            return ("V", tuple(x))
+        if isinstance(x, Quaternion):
+            return ("Q", tuple(x))
+        if isinstance(x, Color):
+            return ("C", tuple(x))
+        if isinstance(x, (Param, ScheduledParam)):
+            return ("P", self.param(x))
+        if isinstance(x, Tip):
+            return ("I", self.tips[id(x)])
+        if isinstance(x, Slice):
+            return ("S", self.slices[id(x)])
+        if isinstance(x, Cell):
+            return ("E", self.cells[id(x)])
+        name = self.named.get(id(x))
+        if name is not None:
+            return ("N", name)
+        if x is self.tree.tracer:
+            return None
+        return ("O", x)
+
+class Decoder():
+    def __init__(self, tree, tips, slices, cells):
+        self.tree = tree
+        self.tips, self.slices, self.cells = tips, slices, cells
+        self.named = {"dna": tree.dna, "engine": tree.engine, "rng": tree.rng, "settling": tree.settling}
+
+    def param(self, ref):
+        kind = ref[0]
+        dna = self.tree.dna
+        if kind == "dna":
+            return dna.data[ref[1]][ref[2]]
+        if kind == "view":
+            return dna.schedule(ref[1], ref[2]).view(ref[3])
+        orig, vmin, vmax, func, steps, freq, sequence, inherit, value, count, cfunc = ref[1]
+        p = Param(orig, vmin=vmin, vmax=vmax, func=func, steps=steps, freq=freq, sequence=sequence, inherit=inherit)
+        p.value, p.count, p.cfunc = value, count, cfunc
+        p.rng = self.tree.rng
+        return p
+
+    def decode(self, x):
+        if type(x) is not tuple:
+            return x
+        tag, v = x
+        if tag == "T":
+            return tuple(self.decode(y) for y in v)
+        if tag == "L":
+            return [self.decode(y) for y in v]
+        if tag == "D":
+            return {k: self.decode(y) for k, y in v}
+        if tag == "V":
+            return Vector(v)
+        if tag == "Q":
+            return Quaternion(v)
+        if tag == "C":
+            return Color(v)
+        if tag == "P":
+            return self.param(v)
+        if tag == "I":
+            return self.tips[v]
+        if tag == "S":
+            return self.slices[v]
+        if tag == "E":
+            return self.cells[v]
+        if tag == "N":
+            return self.named[v]
+        return v
+
+def _columns(c, enc):
+    # the float and int columns of one cell
+    f = [c.x, c.y, c.z]
+    flags = _ENGINE if c.engine is not None else 0
+    for k in CELL_VECTORS:
+        v = getattr(c, k)
+        if v is None:
+            f.extend((0.0, 0.0, 0.0))
+        else:
+            f.extend(v)
+            flags |= _CENTER if k == "center" else _ORIGV if k == "origv" else 0
+    f.extend(c.color)
+    f.extend((c.maxdev, c.ease2, c.ease_away2, c.rate_growth_radial))
+    ints = [c.age, c.ring, c.index, flags]
+    for k in CELL_PARAMS:
+        p = getattr(c, k)
+        ref = enc.param(p)
+        if ref[0] == "view":
+            f.append(0.0)
+            ints.extend((_VIEW, ref[3], 0))
+        else:
+            state = ref[1] if ref[0] == "param" else (p.orig, p.min, p.max, p.func, p.steps, p.freq, p.sequence, p.inherit, p.value, p.count, p.cfunc)
+            f.append(state[8])
+            ints.extend((_PLAIN, state[9], state[10]))
+    return f, ints
+
+def capture(tree):
+    # (meta, arrays) of a tree between growth steps, arrays maps names to numpy arrays or array.array
+    enc = Encoder(tree)
+    slices = [slc for tip in tree.tips for slc in tip.branch]
+    enc.slices = {id(slc): i for i, slc in enumerate(slices)}
+    cells = [c for slc in slices for c in slc.cells]
+    enc.cells = {id(c): i for i, c in enumerate(cells)}
+
+    fcols, icols, sparse = array.array("d"), array.array("q"), {}
+    for i, c in enumerate(cells):
+        f, ints = _columns(c, enc)
+        fcols.extend(f)
+        icols.extend(ints)
+        rest = {}
+        for k, v in c.__dict__.items():
+            if k in CELL_COLUMNS:
+                continue
+            if k in CELL_DEFAULTS and (v is None or v == []):
+                continue
+            rest[k] = enc.encode(v)
+        if rest:
+            sparse[i] = rest
+
+    arrays = {"cells_f": (fcols, (len(cells), CELL_F)), "cells_i": (icols, (len(cells), CELL_I))}
+    np = _numpy()
+    frozen32, frozen64, at = [], array.array("d"), [0, 0]
+    slice_meta = []
+    start = 0
+    for slc in slices:
+        d = {}
+        for k, v in slc.__dict__.items():
+            if k == "cells":
+                d[k] = (start, len(v))
+                start += len(v)
+            elif k == "frozen" and v is not None:
+                if np is not None and isinstance(v, np.ndarray):
+                    d[k] = ("f32", at[0], len(v))
+                    frozen32.append(v)
+                    at[0] += len(v)
+                else:
+                    d[k] = ("f64", at[1], len(v))
+                    for row in v:
+                        frozen64.extend(row)
+                    at[1] += len(v)
+            else:
+                d[k] = enc.encode(v)
+        slice_meta.append((type(slc), d))
+    if frozen32:
+        arrays["frozen_f32"] = (np.concatenate(frozen32).astype(np.float32), (at[0], 6))
+    if len(frozen64):
+        arrays["frozen_f64"] = (frozen64, (at[1], 6))
+
+    tip_meta = [(type(t), {k: enc.encode(v) for k, v in t.__dict__.items()}) for t in tree.tips]
+
+    engine = None
+    e = tree.engine
+    if e is not None:
+        engine = {"dtype": str(e.loc.dtype), "compact": e.compact, "count": e.count}
+        for k in ENGINE_ARRAYS:
+            arrays["engine_" + k] = (getattr(e, k)[:e.count], None)
+
+    hormones = None
+    h = tree.hormones
+    if h is not None and h.engine is not None:
+        hormones = {"channels": h.channels, "min_growth": h.min_growth, "max_growth": h.max_growth, "count": h.count, "seen": h.seen}
+        for k, a in h.arrays().items():
+            arrays["hormones_" + k] = (a, None)
+
+    light = None
+    li = tree.light
+    if li is not None and li.engine is not None:
+        light = {"resolution": li.resolution, "directions": li.directions, "attenuation": li.attenuation, "every": li.every}
+        arrays["light_exposure"] = (li.exposure, None)
+
+    spatial = None
+    sp = tree.spatial
+    if sp is not None and sp.engine is not None:
+        spatial = {"size": sp.size, "repulsion": sp.repulsion, "avoid": sp.avoid, "grace": sp.grace, "seen": sp.seen}
+        for k, a in sp.arrays().items():
+            arrays["spatial_" + k] = (a, None)
+
+    meta = {
+        "tree": {k: getattr(tree, k) for k in ("name", "age", "random_seed", "cell_count", "use_engine", "compact", "compiled", "skeleton")},
+        "dna": tree.dna.serialize(),
+        "genome": tree.genome.serialize(),
+        "rng": tree.rng.getstate(),
+        "tips": tip_meta,
+        "active": [enc.tips[id(t)] for t in tree.active],
+        "dormant": [enc.tips[id(t)] for t in tree.dormant],
+        "slices": slice_meta,
+        "cells": len(cells),
+        "sparse": sparse,
+        "engine": engine,
+        "hormones": hormones,
+        "light": light,
+        "spatial": spatial,
+    }
+    return meta, arrays
+
+def _raw(a):
+    # little-endian bytes, dtype string and shape of a numpy array or an array.array
+    if isinstance(a, array.array):
+        if sys.byteorder == "big":
+            a = array.array(a.typecode, a)
+            a.byteswap()
+        return a.tobytes(), {"d": "<f8", "q": "<i8"}[a.typecode], (len(a),)
+    dt = a.dtype.newbyteorder("<") if a.dtype.itemsize > 1 else a.dtype
+    a = a.astype(dt, copy=False)
+    return a.tobytes(), dt.str, a.shape
+
+def save(tree, path):
+    # writes the snapshot next to path and moves it in place, so readers never see a half written file
+    meta, arrays = capture(tree)
+    blobs, table, at = [], {}, 0
+    for name, (a, shape) in arrays.items():
+        data, dtype, s = _raw(a)
+        at += -at % ALIGN
+        table[name] = (dtype, s if shape is None else shape, at)
+        blobs.append((at, data))
+        at += len(data)
+    meta["arrays"] = table
+    head = pickle.dumps(meta, protocol=pickle.HIGHEST_PROTOCOL)
+    base = _HEAD.size + len(head)
+    base += -base % ALIGN
+    tmp = "%s.%d.tmp" % (path, os.getpid())
+    with open(tmp, "wb") as f:
+        f.write(_HEAD.pack(MAGIC, VERSION, 0, len(head)))
+        f.write(head)
+        for offset, data in blobs:
+            f.seek(base + offset)
+            f.write(data)
+        f.truncate(base + at)   # empty arrays at the end still lie inside the file
+    os.replace(tmp, path)
+    return path
+
+def _read_array(buf, base, spec):
+    # numpy array viewing buf when numpy is there (read-only, no copy), otherwise a flat list
+    dtype, shape, offset = spec
+    count = 1
+    for n in shape:
+        count *= n
+    np = _numpy()
+    if np is not None:
+        return np.frombuffer(buf, dtype=dtype, count=count, offset=base + offset).reshape(shape)
+    a = array.array({"<f8": "d", "<f4": "f", "<i8": "q"}[dtype])
+    a.frombytes(buf[base + offset:base + offset + count * a.itemsize])
+    if sys.byteorder == "big":
+        a.byteswap()
+    return a.tolist()
+
+def read(path, mapped=True):
+    # (meta, buffer, base offset of the arrays). A mapped buffer is the file mapped read-only into memory, arrays are
+    # then read from the page cache on demand instead of the whole file up front.
+    with open(path, "rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if mapped else f.read()
+    magic, version, reserved, size = _HEAD.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError("not a GrowF tree snapshot: %s" % path)
+    if version != VERSION:
+        raise ValueError("unsupported snapshot format version %d" % version)
+    meta = pickle.loads(buf[_HEAD.size:_HEAD.size + size])
+    base = _HEAD.size + size
+    base += -base % ALIGN
+    return meta, buf, base
+
+def _rows(a, width):
+    if isinstance(a, list):
+        return [a[i:i + width] for i in range(0, len(a), width)]
+    return a.tolist()
+
+def restore(tree, meta, buf, base, keep=()):
+    # puts the snapshot state into tree, keeping its settling policy, tracer and cache, and the attributes in keep
+    np = _numpy()
+    table = meta["arrays"]
+    for k, v in meta["tree"].items():
+        if k not in keep:
+            setattr(tree, k, v)
+    tree.genome = DNA(None).unserialize(meta["genome"])
+    tree.dna = DNA(None).unserialize(meta["dna"])     # the advanced copies, never the genome (see Tree.begin)
+    tree.dna.compiled = tree.compiled
+    tree.rng.setstate(meta["rng"])
+    for section in tree.dna.data.values():
+        for p in section:
+            p.rng = tree.rng
+
+    tree.engine = None
+    e = meta["engine"]
+    if e is not None:
+        from .engine import CellEngine
+        n = e["count"]
+        engine = tree.engine = CellEngine(tree.dna, rng=tree.rng, capacity=max(n, 1), dtype=e["dtype"], compact=e["compact"])
+        for k in ENGINE_ARRAYS:
+            getattr(engine, k)[:n] = _read_array(buf, base, table["engine_" + k])
+        engine.count = n
+        engine.cells = [None] * n
+
+    h = meta["hormones"]
+    if h is not None:
+        if tree.hormones is None:
+            from .hormones import HormoneTransport
+            tree.hormones = HormoneTransport(h["channels"], min_growth=h["min_growth"], max_growth=h["max_growth"])
+        arrays = {k: _read_array(buf, base, table["hormones_" + k]) for k in HORMONE_ARRAYS}
+        tree.hormones.load_arrays(tree.engine, arrays, h["count"], h["seen"])
+    elif tree.hormones is not None:
+        tree.hormones.attach(tree.engine)   # the snapshot grew without, transport starts from here
+
+    li = meta["light"]
+    if li is not None:
+        if tree.light is None:
+            from .light import LightField
+            tree.light = LightField(resolution=li["resolution"], directions=li["directions"], attenuation=li["attenuation"], every=li["every"])
+        tree.light.attach(tree.engine)
+        tree.light.exposure = np.array(_read_array(buf, base, table["light_exposure"]), dtype=np.float64)
+    elif tree.light is not None:
+        tree.light.attach(tree.engine)
+
+    sp = meta["spatial"]
+    if sp is not None:
+        if tree.spatial is None:
+            from .spatial import SpatialHash
+            tree.spatial = SpatialHash(size=sp["size"], repulsion=sp["repulsion"], avoid=sp["avoid"], grace=sp["grace"])
+        arrays = {k: _read_array(buf, base, table["spatial_" + k]) for k in SPATIAL_ARRAYS}
+        tree.spatial.load_arrays(tree.engine, arrays, sp["seen"])
+    elif tree.spatial is not None:
+        tree.spatial.attach(tree.engine)
+
+    tips = [cls.__new__(cls) for cls, d in meta["tips"]]
+    slices = [cls.__new__(cls) for cls, d in meta["slices"]]
+    cells = [Cell.__new__(Cell) for i in range(meta["cells"])]
+    dec = Decoder(tree, tips, slices, cells)
+
+    frozen = {}
+    for kind in ("f32", "f64"):
+        if "frozen_" + kind in table:
+            a = _read_array(buf, base, table["frozen_" + kind])
+            frozen[kind] = a if np is not None else _rows(a, 6)
+
+    for slc, (cls, d) in zip(slices, meta["slices"]):
+        for k, v in d.items():
+            if k == "cells":
+                i0, n = v
+                slc.cells = cells[i0:i0 + n]
+            elif k == "frozen" and v is not None:
+                kind, i0, n = v
+                rows = frozen[kind][i0:i0 + n]
+                if np is not None and kind == "f32":
+                    rows.flags.writeable = False
+                    slc.frozen = rows
+                else:
+                    slc.frozen = tuple(tuple(r) for r in (rows.tolist() if np is not None else rows))
+            else:
+                setattr(slc, k, dec.decode(v))
+    for tip, (cls, d) in zip(tips, meta["tips"]):
+        for k, v in d.items():
+            setattr(tip, k, dec.decode(v))
+
+    fcols = _rows(_read_array(buf, base, table["cells_f"]), CELL_F)
+    icols = _rows(_read_array(buf, base, table["cells_i"]), CELL_I)
+    templates = tree.dna.data["cell"]
+    for slc in slices:
+        for c in slc.cells:
+            c.slice = slc
+    sparse = meta["sparse"]
+    for i, (c, f, ints) in enumerate(zip(cells, fcols, icols)):
+        c.rng = tree.rng
+        c.x, c.y, c.z = f[0], f[1], f[2]
+        age, c.ring, c.index, flags = ints[:4]
+        c.age = age
+        for k, at in zip(CELL_VECTORS, range(3, 3 + 3 * len(CELL_VECTORS), 3)):
+            setattr(c, k, Vector(f[at:at + 3]))
+        if not flags & _CENTER:
+            c.center = None
+        if not flags & _ORIGV:
+            c.origv = None
+        at = 3 + 3 * len(CELL_VECTORS)
+        c.color = Color(f[at:at + 3])
+        c.maxdev, c.ease2, c.ease_away2, c.rate_growth_radial = f[at + 3:at + 7]
+        for k, (name, value) in enumerate(zip(CELL_PARAMS, f[at + 7:])):
+            kind, count, cfunc = ints[4 + 3 * k:7 + 3 * k]
+            if kind == _VIEW:
+                p = tree.dna.schedule("cell", 2 + k).view(count)
+            else:
+                p = templates[2 + k].copy()
+                p.value, p.count, p.cfunc = value, count, cfunc
+                p.rng = tree.rng
+            setattr(c, name, p)
+        c.engine = tree.engine if flags & _ENGINE else None
+        for k, default in CELL_DEFAULTS.items():
+            setattr(c, k, default() if callable(default) else default)
+        rest = sparse.get(i)
+        if rest:
+            for k, v in rest.items():
+                setattr(c, k, dec.decode(v))
+
+    if tree.engine is not None:
+        engine = tree.engine
+        for c in cells:
+            if c.engine is not None and engine.live[c.index]:
+                engine.cells[c.index] = c
+        engine.relink()
+        engine.stale = True
+
+    tree.tips = tips
+    tree.active = [tips[i] for i in meta["active"]]
+    tree.dormant = [tips[i] for i in meta["dormant"]]
+    return tree
+
+def load(path, tree=None, mapped=True, keep=()):
+    # restores the snapshot at path into tree (a new Tree when None) and returns it, keep: e.g. IDENTITY
+    if tree is None:
+        from .core import Tree
+        tree = Tree()
+    meta, buf, base = read(path, mapped=mapped)
+    return restore(tree, meta, buf, base, keep=keep)
@@ -0,0 +1,138 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+# Per-step instrumentation of Tree.grow
+# A Tracer attached to a tree records one plain dict per growth step: wall time of every phase, how many tips, slices
+# and cells were grown, and optionally how much was allocated in each phase. With no tracer attached (tree.tracer is
+# None, the default) Tree.grow does not time or count anything.
+#
+#   with Tracer(t) as tr:
+#       t.plant(growth_steps=30)
+#   print(tr.summary())
+#
+# Phases are exclusive, time spent in a nested phase is not counted again in the one around it:
+#   tip         Tip.grow: photolocation, geolocation, moving the tip, deciding on bifurcation
+#   cells       growing the slices of a branch (Cell.grow for every cell, or scheduling them for the engine)
+#               The Param.next calls of Cell.grow are counted here, not in a phase of their own: each costs about
+#               half of entering and leaving a phase, so timing them per cell would mostly measure the tracer
+#   boids       Cell.move_boids, per cell (with the engine the boids are part of engine, and Params that can't be
+#               replayed, see growf.engine.ParamRows, advance in cells while scheduling)
+#   slices      laying down new slices (Tip.new_slice, Slice and Cell construction)
+#   bifurcation creating the Shoots of a bifurcation in Tree.grow
+#   light       light exposure of cells and tips (growf.light)
+#   hormones    hormone transport between cells (growf.hormones)
+#   spatial     hashing the cells and turning tips away from other branches (growf.spatial)
+#   engine      the batched CellEngine step
+#   mesh        Tree.show (outside of growth steps)
+
+import sys
+import time
+import tracemalloc
+
+PHASES = ("tip", "cells", "boids", "slices", "bifurcation", "light", "hormones", "spatial", "engine", "mesh")
+
+class Tracer():
+    def __init__(self, tree=None, allocations=False):
+        self.tree = None
+        self.allocations = allocations  # also record allocated blocks and traced bytes per phase (tracemalloc is slow)
+        self.records = []               # one dict per growth step, see begin_step
+        self.other = self.new_record(None)  # phases that ran outside of a growth step, like mesh
+        self.callbacks = []             # called with every finished step record
+        self.record = None
+        self.stack = []                 # [phase, start time, time in nested phases, blocks, bytes]
+        self.started_tracemalloc = False
+        if tree is not None:
+            self.attach(tree)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.detach()
+
+    def attach(self, tree):
+        if self.allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracemalloc = True
+        self.tree = tree
+        tree.tracer = self
+
+    def detach(self):
+        if self.tree is not None and self.tree.tracer is self:
+            self.tree.tracer = None
+            for tip in self.tree.tips:
+                tip.tracer = None
+        self.tree = None
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+            self.started_tracemalloc = False
+
+    def on_step(self, callback):
+        # callback(record) after every traced growth step
+        self.callbacks.append(callback)
+        return callback
+
+    def new_record(self, step):
+        rec = {"step": step, "time": 0.0, "phases": {}, "counts": {}}
+        if self.allocations:
+            rec["blocks"], rec["bytes"] = {}, {}
+        return rec
+
+    def memory(self):
+        if not self.allocations:
+            return 0, 0
+        return sys.getallocatedblocks(), tracemalloc.get_traced_memory()[0]
+
+    def begin_step(self, step):
+        self.record = self.new_record(step)
+        self.step_start = time.perf_counter()
+
+    def end_step(self, **counts):
+        rec = self.record
+        rec["time"] = time.perf_counter() - self.step_start
+        for k, n in counts.items():
+            rec["counts"][k] = rec["counts"].get(k, 0) + n
+        self.records.append(rec)
+        self.record = None
+        for callback in self.callbacks:
+            callback(rec)
+
+    def count(self, **counts):
+        rec = self.other if self.record is None else self.record
+        for k, n in counts.items():
+            rec["counts"][k] = rec["counts"].get(k, 0) + n
+
+    def enter(self, phase):
+        blocks, size = self.memory()
+        self.stack.append([phase, time.perf_counter(), 0.0, blocks, size])
+
+    def leave(self):
+        phase, start, nested, blocks, size = self.stack.pop()
+        elapsed = time.perf_counter() - start
+        rec = self.other if self.record is None else self.record
+        rec["phases"][phase] = rec["phases"].get(phase, 0.0) + elapsed - nested
+        if self.allocations:
+            b, s = self.memory()
+            rec["blocks"][phase] = rec["blocks"].get(phase, 0) + b - blocks    # net, so nested phases are included
+            rec["bytes"][phase] = rec["bytes"].get(phase, 0) + s - size
+        if self.stack:
+            self.stack[-1][2] += elapsed
+
+    def summary(self):
+        # totals over all recorded steps, in the form aggregate() merges
+        return aggregate([self.records + [self.other]])
+
+def aggregate(traces):
+    # merges traces (lists of step records, e.g. Tracer.records from many batch jobs) into one dict of totals
+    out = {"steps": 0, "time": 0.0, "phases": {}, "counts": {}}
+    for records in traces:
+        for rec in records:
+            if rec["step"] is not None:
+                out["steps"] += 1
+                out["time"] += rec["time"]
+            for key in ("phases", "counts", "blocks", "bytes"):
+                if key in rec:
+                    d = out.setdefault(key, {})
+                    for k, v in rec[key].items():
+                        d[k] = d.get(k, 0) + v
+    return out
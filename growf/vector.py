@@ -0,0 +1,196 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+# Vector backend for the growth core
+# Inside Blender the real mathutils types are used, everywhere else (render farm workers, tests, benchmarks) a small
+# pure-Python stand-in with the part of the mathutils API that GrowF needs: Vector, Quaternion and Color.
+# The stand-in computes in double precision, mathutils in single precision, so results agree to about 1e-6.
+
+import math
+import colorsys
+
+try:
+    from mathutils import Vector, Quaternion, Color
+    BACKEND = "mathutils"
+except ImportError:
+    BACKEND = "python"
+
+_EPS = 1.1920929e-07    # FLT_EPSILON, used by mathutils for degenerate rotations
+
+class _Vector():
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, seq=(0.0, 0.0, 0.0)):
+        x, y, z = seq
+        self.x, self.y, self.z = float(x), float(y), float(z)
+
+    def __len__(self):
+        return 3
+
+    def __iter__(self):
+        yield self.x
+        yield self.y
+        yield self.z
+
+    def __getitem__(self, i):
+        return (self.x, self.y, self.z)[i]
+
+    def __setitem__(self, i, value):
+        setattr(self, ("x", "y", "z")[i], float(value))
+
+    def __eq__(self, other):
+        return tuple(self) == tuple(other)
+
+    def __repr__(self):
+        return "Vector((%.4f, %.4f, %.4f))" % (self.x, self.y, self.z)
+
+    def __reduce__(self):
+        return (Vector, ((self.x, self.y, self.z),))
+
+    def __add__(self, o):
+        x, y, z = o
+        return Vector((self.x + x, self.y + y, self.z + z))
+
+    __radd__ = __add__
+
+    def __sub__(self, o):
+        x, y, z = o
+        return Vector((self.x - x, self.y - y, self.z - z))
+
+    def __rsub__(self, o):
+        x, y, z = o
+        return Vector((x - self.x, y - self.y, z - self.z))
+
+    def __mul__(self, o):
+        # like mathutils since Blender 2.8, Vector * Vector is the element-wise product (use dot() for the scalar one)
+        if isinstance(o, Vector):
+            return Vector((self.x * o.x, self.y * o.y, self.z * o.z))
+        return Vector((self.x * o, self.y * o, self.z * o))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, o):
+        return Vector((self.x / o, self.y / o, self.z / o))
+
+    def __neg__(self):
+        return Vector((-self.x, -self.y, -self.z))
+
+    @property
+    def length(self):
+        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    def copy(self):
+        return Vector((self.x, self.y, self.z))
+
+    def to_tuple(self):
+        return (self.x, self.y, self.z)
+
+    def dot(self, o):
+        x, y, z = o
+        return self.x * x + self.y * y + self.z * z
+
+    def cross(self, o):
+        x, y, z = o
+        return Vector((self.y * z - self.z * y, self.z * x - self.x * z, self.x * y - self.y * x))
+
+    def normalized(self):
+        l = self.length
+        return Vector((self.x / l, self.y / l, self.z / l)) if l > 0.0 else Vector((0.0, 0.0, 0.0))
+
+    def lerp(self, o, factor):
+        x, y, z = o
+        a = 1.0 - factor
+        return Vector((self.x * a + x * factor, self.y * a + y * factor, self.z * a + z * factor))
+
+    def rotate(self, q):
+        # in place, like mathutils
+        w, qx, qy, qz = q
+        x, y, z = self.x, self.y, self.z
+        tx = 2.0 * (qy * z - qz * y)
+        ty = 2.0 * (qz * x - qx * z)
+        tz = 2.0 * (qx * y - qy * x)
+        self.x = x + w * tx + (qy * tz - qz * ty)
+        self.y = y + w * ty + (qz * tx - qx * tz)
+        self.z = z + w * tz + (qx * ty - qy * tx)
+
+    def rotation_difference(self, o):
+        # shortest arc rotation from this vector to o, following mathutils' rotation_between_vecs_to_quat
+        a, b = self.normalized(), Vector(o).normalized()
+        axis = a.cross(b)
+        l = axis.length
+        if l > _EPS:
+            axis = axis / l
+            angle = math.atan2(l, a.dot(b))
+            s = math.sin(angle / 2)
+            return Quaternion((math.cos(angle / 2), axis.x * s, axis.y * s, axis.z * s))
+        if a.dot(b) > 0.0:
+            return Quaternion((1.0, 0.0, 0.0, 0.0))
+        axis = _ortho(a).normalized()
+        return Quaternion((0.0, axis.x, axis.y, axis.z))
+
+def _ortho(v):
+    # a vector perpendicular to v, picked by its dominant axis like mathutils' ortho_v3_v3
+    ax, ay, az = abs(v.x), abs(v.y), abs(v.z)
+    if ax >= ay and ax > az:
+        return Vector((-v.y - v.z, v.x, v.x))
+    if ay >= az:
+        return Vector((v.y, -v.x - v.z, v.y))
+    return Vector((v.z, v.z, -v.x - v.y))
+
+class _Quaternion():
+    __slots__ = ("w", "x", "y", "z")
+
+    def __init__(self, seq=(1.0, 0.0, 0.0, 0.0)):
+        w, x, y, z = seq
+        self.w, self.x, self.y, self.z = float(w), float(x), float(y), float(z)
+
+    def __iter__(self):
+        yield self.w
+        yield self.x
+        yield self.y
+        yield self.z
+
+    def __getitem__(self, i):
+        return (self.w, self.x, self.y, self.z)[i]
+
+    def __repr__(self):
+        return "Quaternion((%.4f, %.4f, %.4f, %.4f))" % (self.w, self.x, self.y, self.z)
+
+    def __reduce__(self):
+        return (Quaternion, (tuple(self),))
+
+    def normalized(self):
+        l = math.sqrt(self.w * self.w + self.x * self.x + self.y * self.y + self.z * self.z)
+        if l == 0.0:
+            return Quaternion()
+        return Quaternion((self.w / l, self.x / l, self.y / l, self.z / l))
+
+class _Color():
+    # rgb storage with h, s, v views, setting one of them converts through hsv like mathutils.Color does
+    __slots__ = ("r", "g", "b")
+
+    def __init__(self, rgb=(0.0, 0.0, 0.0)):
+        self.r, self.g, self.b = (float(c) for c in rgb)
+
+    def __iter__(self):
+        yield self.r
+        yield self.g
+        yield self.b
+
+    def __repr__(self):
+        return "Color((%.4f, %.4f, %.4f))" % (self.r, self.g, self.b)
+
+    def __reduce__(self):
+        return (Color, ((self.r, self.g, self.b),))
+
+    def _set_hsv(self, i, value):
+        hsv = list(colorsys.rgb_to_hsv(self.r, self.g, self.b))
+        hsv[i] = value
+        self.r, self.g, self.b = colorsys.hsv_to_rgb(*hsv)
+
+    h = property(lambda c: colorsys.rgb_to_hsv(c.r, c.g, c.b)[0], lambda c, value: c._set_hsv(0, value))
+    s = property(lambda c: colorsys.rgb_to_hsv(c.r, c.g, c.b)[1], lambda c, value: c._set_hsv(1, value))
+    v = property(lambda c: colorsys.rgb_to_hsv(c.r, c.g, c.b)[2], lambda c, value: c._set_hsv(2, value))
+
+if BACKEND == "python":
+    Vector, Quaternion, Color = _Vector, _Quaternion, _Color
@@ -0,0 +1,27 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+import numpy as np
+
+from growf import Tree
+from growf.batch import grow_batch
+from growf.core import GrowthRandom
+from growf.ga import mutate
+
+def jobs():
+    dna = mutate(Tree().init_dna(), 0.2, rng=GrowthRandom(5))
+    # the same DNA object in several jobs, serially it must not be advanced from one job to the next
+    return [(None, "GrowF-0", 8), (dna, "GrowF-1", 8), (dna, "GrowF-2", 8), (dna, "GrowF-1", 8)]
+
+def test_pool_matches_serial():
+    for engine in (False, True):
+        serial = grow_batch(jobs(), workers=0, output="mesh", engine=engine)
+        pooled = grow_batch(jobs(), workers=2, output="mesh", engine=engine)
+        assert len(serial) == len(pooled) == 4
+        for a, b in zip(serial, pooled):
+            assert len(a.verts) == len(b.verts) and len(a.quads) == len(b.quads)
+            assert np.array_equal(a.verts, b.verts)
+            assert np.array_equal(a.vert_colors, b.vert_colors)
+            assert np.array_equal(a.quads, b.quads)
+        assert np.array_equal(serial[1].verts, serial[3].verts)
+    assert grow_batch(jobs(), workers=0) == grow_batch(jobs(), workers=2)
@@ -0,0 +1,43 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+import os
+
+import numpy as np
+
+from growf import Tree
+from growf.cache import GrowthCache
+from growf.mesh import mesh_buffers
+
+def test_hit_keeps_the_trees_name(tmp_path):
+    cache = GrowthCache(str(tmp_path))
+    Tree(name="A", cache=cache).plant(growth_steps=5)
+    t = Tree(name="B", cache=cache)
+    t.plant(growth_steps=5)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert t.name == "B" and t.age == 5
+
+def test_grows_on_from_a_shorter_entry(tmp_path):
+    cache = GrowthCache(str(tmp_path))
+    Tree(cache=cache).plant(growth_steps=5)
+    t = Tree(cache=cache)
+    t.plant(growth_steps=9)
+    assert cache.hits == 1
+    key = cache.key(Tree())
+    assert cache.steps(key) == [5, 9]
+    fresh = Tree()
+    fresh.plant(growth_steps=9)
+    assert np.array_equal(mesh_buffers(t).verts, mesh_buffers(fresh).verts)
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = GrowthCache(str(tmp_path))
+    for i in range(3):
+        Tree(seed_r="GrowF%d" % i, cache=cache).plant(growth_steps=3)
+    paths = {i: cache.entry(cache.key(Tree(seed_r="GrowF%d" % i)), 3) for i in range(3)}
+    for i, mtime in ((0, 1000), (1, 3000), (2, 2000)):
+        os.utime(paths[i], (mtime, mtime))
+    Tree(seed_r="GrowF0", cache=cache).plant(growth_steps=3)    # a hit renews entry 0, entry 2 is now the oldest
+    sizes = {i: os.path.getsize(p) for i, p in paths.items()}
+    cache.max_bytes = sizes[0] + sizes[1]
+    cache.evict()
+    assert [os.path.exists(paths[i]) for i in range(3)] == [True, True, False]
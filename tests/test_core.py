@@ -0,0 +1,57 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+import numpy as np
+
+from growf import Tree, Settling
+from growf.core import GrowthRandom, _BLOCK_NUMPY
+from growf.trace import Tracer
+
+def test_plant_twice_is_reproducible():
+    t = Tree(engine=True)
+    t.plant(growth_steps=15)
+    first = t.engine.loc[:t.engine.count].copy()
+    t.plant(growth_steps=15)
+    assert np.array_equal(t.engine.loc[:t.engine.count], first)
+    fresh = Tree(engine=True)
+    fresh.plant(growth_steps=15)
+    assert np.array_equal(fresh.engine.loc[:fresh.engine.count], first)
+
+def test_growth_leaves_the_genome_alone():
+    t = Tree()
+    before = t.init_dna().serialize()
+    t.plant(growth_steps=10)
+    assert t.genome.serialize() == before
+    assert t.dna is not t.genome
+
+def test_block_is_the_scalar_stream():
+    for n in (0, 5, _BLOCK_NUMPY + 3):
+        a, b = GrowthRandom("GrowF"), GrowthRandom("GrowF")
+        a.random()
+        b.random()
+        out = a.block(n)
+        assert out.shape == (n, 3)
+        assert out.ravel().tolist() == [b.random() for _ in range(n * 3)]
+        assert a.random() == b.random()
+
+def test_engine_freeze_copies_rows():
+    t = Tree(engine=True, settling=Settling(max_age=3))
+    t.plant(growth_steps=10)
+    frozen = [slc for tip in t.tips for slc in tip.branch if slc.frozen is not None]
+    assert frozen
+    for slc in frozen:
+        assert slc.cells == [] and not t.engine.live[slc.span[0]]
+        assert np.array_equal(slc.frozen, t.engine.block(slc))
+
+def cell_locs(t):
+    return [tuple(c.loc) for tip in t.tips for slc in tip.branch for c in slc.cells]
+
+def test_tracer_times_boids_apart():
+    t = Tree()
+    with Tracer(t) as tr:
+        t.plant(growth_steps=8)
+    phases = tr.summary()["phases"]
+    assert phases["boids"] > 0.0 and phases["cells"] > 0.0
+    ref = Tree()
+    ref.plant(growth_steps=8)
+    assert cell_locs(t) == cell_locs(ref)
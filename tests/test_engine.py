@@ -0,0 +1,69 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+import numpy as np
+import pytest
+
+from growf import Tree, Settling
+from growf.core import WAVES, p_random, p_random_int, p_sin
+from growf.engine import ENGINE_TOLERANCE
+from growf.mesh import MeshBuffers, mesh_buffers
+
+@pytest.mark.parametrize("mode", [{"engine": True}, {"engine": True, "compiled": True}, {"compact": True}])
+@pytest.mark.parametrize("settle", [None, 4])
+def test_engine_matches_cells(mode, settle):
+    trees = []
+    for kw in ({}, mode):
+        t = Tree(settling=None if settle is None else Settling(max_age=settle), **kw)
+        t.plant(growth_steps=12)
+        trees.append(mesh_buffers(t))
+    cells, engine = trees
+    assert cells.verts.shape == engine.verts.shape
+    assert np.array_equal(cells.quads, engine.quads)
+    assert np.abs(cells.verts - engine.verts).max() <= ENGINE_TOLERANCE
+    assert np.abs(cells.vert_colors - engine.vert_colors).max() <= ENGINE_TOLERANCE
+
+def random_waves(**kw):
+    t = Tree(**kw)
+    cell = t.init_dna().get("cell")
+    cell[3].func = p_random
+    cell[5].func = [p_random, p_sin]
+    cell[7].func = p_random_int
+    return t
+
+@pytest.mark.parametrize("mode", [{"engine": True}, {"engine": True, "compiled": True}, {"compact": True}])
+def test_engine_grows_random_waves(mode):
+    cells, engine = random_waves(), random_waves(**mode)
+    cells.plant(growth_steps=10)
+    engine.plant(growth_steps=10)
+    a, b = mesh_buffers(cells), mesh_buffers(engine)
+    assert a.verts.shape == b.verts.shape
+    assert np.abs(a.verts - b.verts).max() <= ENGINE_TOLERANCE
+    assert np.abs(a.vert_colors - b.vert_colors).max() <= ENGINE_TOLERANCE
+    assert cells.rng.getstate() == engine.rng.getstate()
+
+@pytest.mark.parametrize("wave", sorted(WAVES))
+def test_every_wave_compiles(wave):
+    # the same tree, or the same error, with copies, compiled schedules and the engine (runaway waves only to float32)
+    out = []
+    for kw in ({}, {"compiled": True}, {"engine": True, "compiled": True}, {"compact": True}):
+        t = Tree(**kw)
+        for p in t.init_dna().get("cell")[3:8]:
+            p.func = WAVES[wave]
+        try:
+            t.plant(growth_steps=6)
+        except ArithmeticError as e:
+            out.append(type(e))
+            continue
+        except ValueError as e:
+            out.append(str(e))
+            continue
+        out.append(mesh_buffers(t))
+    first = out[0]
+    for m in out[1:]:
+        if not isinstance(first, MeshBuffers):
+            assert m == first
+            continue
+        assert m.verts.shape == first.verts.shape
+        assert np.allclose(m.verts, first.verts, rtol=1e-3, atol=ENGINE_TOLERANCE)
+        assert np.abs(m.vert_colors - first.vert_colors).max() <= ENGINE_TOLERANCE
@@ -0,0 +1,28 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+import pytest
+
+from growf import Tree, Settling
+from growf.export import PLYStream, export_ply
+from growf.mesh import mesh_buffers
+
+def ply_counts(path):
+    with open(path, "rb") as f:
+        head = f.read(512).split(b"end_header")[0].decode("ascii").split()
+    return int(head[head.index("vertex") + 1]), int(head[head.index("face") + 1])
+
+@pytest.mark.parametrize("lod", [0, 1, 2])
+@pytest.mark.parametrize("settle", [{"max_age": 1}, {"max_age": 4}, {"epsilon": 0.002}])
+def test_ply_matches_mesh_buffers(tmp_path, lod, settle):
+    stream = PLYStream(str(tmp_path / "stream.ply"), lod=lod, release=True)
+    t = Tree(settling=Settling(on_freeze=stream.on_freeze, **settle))
+    t.plant(growth_steps=15)
+    stream.finish(t)
+
+    ref = Tree(settling=Settling(**settle))
+    ref.plant(growth_steps=15)
+    m = mesh_buffers(ref, tip_verts=False, lod=lod)
+    export_ply(ref, str(tmp_path / "tree.ply"), lod=lod)
+    assert ply_counts(str(tmp_path / "tree.ply")) == (len(m.verts), len(m.quads))
+    assert ply_counts(str(tmp_path / "stream.ply")) == (len(m.verts), len(m.quads))
@@ -0,0 +1,23 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+import numpy as np
+
+from growf import Tree
+from growf.forest import Forest
+from growf.mesh import mesh_buffers
+
+def grow_forest(workers):
+    with Forest(tile=1.0, halo=0.5, sync=3, workers=workers) as forest:
+        for i in range(6):
+            forest.add(Tree(seed_r="GrowF%d" % i, engine=True), location=(0.6 * i, 0.3 * (i % 2), 0.0))
+        forest.grow(steps=8)
+        return [mesh_buffers(t) for t in forest.collect()]
+
+def test_forest_doesnt_depend_on_workers():
+    alone, spread = grow_forest(0), grow_forest(2)
+    assert len(alone) == len(spread) == 6 and all(len(m.quads) for m in spread)
+    for a, b in zip(alone, spread):
+        assert np.array_equal(a.verts, b.verts)
+        assert np.array_equal(a.quads, b.quads)
+        assert np.array_equal(a.vert_colors, b.vert_colors)
@@ -0,0 +1,78 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+import pytest
+
+from growf import Tree
+from growf.core import GrowthRandom, register_wave, p_log, p_random
+from growf.ga import mutate, crossover, evaluate, evaluate_genome, Evolution
+
+def ancestor():
+    return Tree(seed_r="GrowF").init_dna()
+
+def fields(p):
+    return (p.orig, p.min, p.max, p.freq, p.func if not isinstance(p.func, list) else tuple(p.func))
+
+def test_mutate_copies():
+    dna = ancestor()
+    before = dna.serialize()
+    assert mutate(dna, 0.0, rng=GrowthRandom(1)).serialize() == before
+    child = mutate(dna, 1.0, rng=GrowthRandom(1))
+    assert dna.serialize() == before
+    changed = [fields(p) != fields(q) for key in dna.data for p, q in zip(dna.data[key], child.data[key])]
+    assert sum(changed) > len(changed) // 2
+    assert mutate(dna, 0.5, rng=GrowthRandom(7)).serialize() == mutate(dna, 0.5, rng=GrowthRandom(7)).serialize()
+
+def test_crossover_takes_every_param_from_a_parent():
+    a = ancestor()
+    b = mutate(a, 1.0, rng=GrowthRandom(2))
+    child = crossover(a, b, rng=GrowthRandom(3))
+    picks = set()
+    for key in a.data:
+        for p, q, c in zip(a.data[key], b.data[key], child.data[key]):
+            assert fields(c) in (fields(p), fields(q))
+            if fields(p) != fields(q):
+                picks.add(fields(c) == fields(p))
+    assert picks == {True, False}
+
+grown = []
+
+def counting_fitness(t):
+    grown.append(t)
+    return float(len(t.tips))
+
+def test_cached_scores_are_not_grown_again():
+    dnas = [ancestor(), mutate(ancestor(), 0.3, rng=GrowthRandom(4))]
+    cache = {}
+    del grown[:]
+    first = evaluate(dnas + dnas, steps=6, fitness=counting_fitness, workers=0, cache=cache)
+    assert len(grown) == 2 and len(cache) == 2
+    assert evaluate(dnas, steps=6, fitness=counting_fitness, workers=0, cache=cache) == first[:2]
+    assert len(grown) == 2
+
+def test_evolution_is_reproducible():
+    runs = []
+    for i in range(2):
+        ev = Evolution(size=6, steps=5, workers=0, seed="test")
+        dna, score = ev.run(generations=2)
+        runs.append((ev.history, dna.serialize(), [d.serialize() for d in ev.population]))
+    assert runs[0] == runs[1]
+
+def test_random_waves_score_with_the_engine():
+    dna = ancestor()
+    dna.get("cell")[3].func = p_random
+    score = evaluate_genome(dna.serialize(), steps=6, engine=True)
+    assert score is not None and score == evaluate_genome(dna.serialize(), steps=6)
+
+@register_wave
+def p_broken(param):
+    raise ValueError("broken wave")
+
+def test_only_failed_growth_is_least_fit():
+    dna = ancestor()
+    dna.get("cell")[3].func = p_log
+    dna.get("cell")[3].orig = dna.get("cell")[3].min
+    assert evaluate_genome(dna.serialize(), steps=6) is None
+    dna.get("cell")[3].func = p_broken
+    with pytest.raises(ValueError, match="broken"):
+        evaluate_genome(dna.serialize(), steps=6)
@@ -0,0 +1,36 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+import random
+
+from growf import Tree, DNA
+from growf.ga import mutate
+from growf.genome import write_population, Population
+
+def genomes(n=20):
+    dna = Tree(seed_r="GrowF").init_dna()
+    rng = random.Random(1)
+    return [dna] + [mutate(dna, 0.3, rng=rng) for i in range(n - 1)]
+
+def test_serialize_roundtrip():
+    for dna in genomes():
+        data = dna.serialize()
+        back = DNA(None).unserialize(data)
+        assert back.namespace == dna.namespace
+        assert back.serialize() == data
+        for key, params in dna.data.items():
+            for p, q in zip(params, back.data[key]):
+                assert (q.value, q.orig, q.min, q.max, q.steps, q.freq) == (p.value, p.orig, p.min, p.max, p.steps, p.freq)
+                assert (q.func, q.sequence, q.inherit, q.count, q.cfunc) == (p.func, p.sequence, p.inherit, p.count, p.cfunc)
+
+def test_population_closes_with_genomes_alive(tmp_path):
+    dnas = genomes()
+    path = str(tmp_path / "pop.gfp")
+    assert write_population(path, dnas) == len(dnas)
+    with Population(path) as pop:
+        raw = pop.raw(3)
+        dna = pop[-1]
+        assert len(pop) == len(dnas)
+    assert pop.map is None and pop.file.closed
+    assert raw == dnas[3].serialize()
+    assert dna.serialize() == dnas[-1].serialize()
@@ -0,0 +1,52 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+import numpy as np
+
+from growf import Tree
+from growf.core import Hormone
+from growf.hormones import HormoneTransport, Channel
+
+def grown(*channels, **kw):
+    t = Tree(hormones=HormoneTransport(channels, **kw))
+    t.plant(growth_steps=10)
+    return t
+
+def trunk_rows(t):
+    return [np.arange(slc.span[0], slc.span[0] + slc.span[1]) for slc in t.tips[0].branch]
+
+def test_moves_conserve_without_sources():
+    t = grown(Channel(Hormone.AUXINS, polar=-0.2, diffusion=0.1, decay=0.0), Channel(Hormone.CYTOKININS, polar=0.2, diffusion=0.1, decay=0.0))
+    h = t.hormones
+    rows = np.arange(0, h.count, 3)
+    h.add(Hormone.AUXINS, rows, 1.0)
+    h.add(Hormone.CYTOKININS, rows, 2.0)
+    for i in range(5):
+        h.step(t)
+    assert np.isclose(h.concentration(Hormone.AUXINS).sum(), len(rows))
+    assert np.isclose(h.concentration(Hormone.CYTOKININS).sum(), 2.0 * len(rows))
+    assert (h.concentration(Hormone.AUXINS) > 0).sum() > len(rows)     # it did spread
+
+def test_auxin_flows_toward_the_base():
+    t = grown(Channel(Hormone.AUXINS, polar=-0.3, diffusion=0.0, decay=0.0))
+    h = t.hormones
+    rings = trunk_rows(t)
+    h.add(Hormone.AUXINS, rings[-1], 1.0)
+    auxin = h.concentration(Hormone.AUXINS)
+    order = lambda: sum(k * auxin[r].sum() for k, r in enumerate(rings)) / sum(auxin[r].sum() for r in rings)
+    before = order()
+    for i in range(3):
+        h.step(t)
+        assert order() < before
+        before = order()
+    assert auxin[rings[-2]].sum() > 0 and auxin[rings[-1]].sum() < len(rings[-1])
+
+def test_concentration_scales_growth_rate():
+    t = grown(Channel(Hormone.ETHYLENE, diffusion=0.0, decay=0.0, growth=0.5), max_growth=2.0)
+    h = t.hormones
+    h.add(Hormone.ETHYLENE, [0, 1], [0.4, 10.0])
+    h.step(t)
+    rate = t.engine.rate_growth_radial
+    assert np.isclose(rate[0], h.base[0] * 1.2)
+    assert np.isclose(rate[1], h.base[1] * 2.0)                         # limited by max_growth
+    assert np.allclose(rate[2:h.count], h.base[2:h.count])
@@ -0,0 +1,44 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+import types
+
+import numpy as np
+
+from growf import Tree
+from growf.light import LightField
+
+UP = [((0.0, 0.0, 1.0), 1.0)]
+
+def cells(*locs):
+    # a stand-in for the CellEngine rows a LightField reads, all cells still growing
+    loc = np.array(locs, dtype=np.float32)
+    return types.SimpleNamespace(count=len(loc), loc=loc, live=np.ones(len(loc), dtype=bool))
+
+def test_occluded_cell_is_shaded():
+    light = LightField(resolution=0.05, directions=UP)
+    # a cell with an occluder well above it, the occluder itself and an open cell next to them
+    light.attach(cells((0.01, 0.01, 0.01), (0.01, 0.01, 0.51), (1.01, 0.01, 0.01)))
+    light.step(types.SimpleNamespace(age=0, tips=[], active=[]))
+    shaded, occluder, open_ = light.exposure
+    assert shaded < open_
+    assert occluder == open_ == 1.0
+    assert np.isclose(shaded, np.exp(-light.attenuation))
+
+def test_external_points_cast_shade():
+    t = Tree(light=LightField(resolution=0.05, directions=UP))
+    t.plant(growth_steps=10)
+    t.light.step(t)     # again on the cells where they ended up, they moved after the last pass
+    before = t.light.exposure.copy()
+    n = t.engine.count
+    lo, hi = t.engine.loc[:n].min(axis=0), t.engine.loc[:n].max(axis=0)
+    # a canopy of another tree, a slab covering the whole tree above its top
+    x, y = np.meshgrid(np.arange(lo[0] - 0.1, hi[0] + 0.1, 0.02), np.arange(lo[1] - 0.1, hi[1] + 0.1, 0.02))
+    canopy = np.stack((x.ravel(), y.ravel(), np.full(x.size, hi[2] + 0.5)), axis=1)
+    t.light.set_external(canopy)
+    t.light.step(t)
+    assert len(t.light.exposure) == len(before) == n
+    assert (t.light.exposure < before).all()
+    t.light.set_external(np.zeros((0, 3)))
+    t.light.step(t)
+    assert np.allclose(t.light.exposure, before)
@@ -0,0 +1,19 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+import numpy as np
+
+from growf import Tree
+from growf.mesh import mesh_buffers
+
+def test_quads_are_wound_inward():
+    # growf.blender.set_buffers writes the corners in reverse for outward normals instead of recalculating them
+    t = Tree()
+    t.plant(growth_steps=15)
+    m = mesh_buffers(t, tip_verts=False)
+    ring = np.repeat(np.arange(sum(len(tip.branch) for tip in t.tips)), [len(slc) for tip in t.tips for slc in tip.branch])
+    centers = np.array([m.verts[ring == i].mean(axis=0) for i in range(ring[-1] + 1)])
+    v = m.verts[m.quads]
+    normals = np.cross(v[:, 2] - v[:, 0], v[:, 3] - v[:, 1])
+    out = v.mean(axis=1) - (centers[ring[m.quads[:, 0]]] + centers[ring[m.quads[:, 3]]]) / 2
+    assert ((normals * out).sum(axis=1) < 0).mean() > 0.99
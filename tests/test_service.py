@@ -0,0 +1,21 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+import asyncio
+
+import numpy as np
+
+from growf.service import GrowthService, grow_mesh
+
+def test_identical_jobs_grow_once():
+    async def run():
+        async with GrowthService(workers=0) as service:
+            meshes = await asyncio.gather(*[service.grow(None, "GrowF", 8) for i in range(3)])
+            return service, meshes
+    service, meshes = asyncio.run(run())
+    assert (service.grown, service.joined) == (1, 2)
+    assert not service.inflight
+    direct = grow_mesh(None, "GrowF", 8)
+    for mesh in meshes:
+        assert mesh is meshes[0]
+        assert np.array_equal(mesh.verts, direct.verts) and np.array_equal(mesh.quads, direct.quads)
@@ -0,0 +1,105 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+import types
+
+import numpy as np
+
+from growf import Tree
+from growf.spatial import SpatialHash, pack, unpack
+from growf.vector import Vector
+
+def cells(*locs):
+    # a stand-in for the CellEngine rows a SpatialHash reads, all cells still growing
+    loc = np.array(locs, dtype=np.float32)
+    n = len(loc)
+    return types.SimpleNamespace(count=n, loc=loc, nv=np.zeros((n, 3), dtype=np.float32), live=np.ones(n, dtype=bool), age=np.zeros(n, dtype=np.int32))
+
+def test_pack_roundtrip():
+    rng = np.random.default_rng(0)
+    cubes = rng.integers(-(1 << 20), 1 << 20, size=(1000, 3), dtype=np.int64)
+    cubes = np.concatenate((cubes, [(0, 0, 0), (-1, -1, -1), (-(1 << 20), (1 << 20) - 1, -1)]))
+    keys = pack(cubes)
+    assert keys.dtype == np.int64
+    assert (unpack(keys) == cubes).all()
+
+def test_pack_neighbors():
+    # the 27 cubes around a cube, across the origin, all have keys of their own, and z runs are consecutive (lookup
+    # searches 9 runs of 3)
+    for c in ((0, 0, 0), (-1, 0, 5), (-3, -7, -1)):
+        around = np.array([(c[0] + x, c[1] + y, c[2] + z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1)], dtype=np.int64)
+        keys = pack(around)
+        assert len(np.unique(keys)) == 27
+        assert (keys.reshape(9, 3) - keys.reshape(9, 3)[:, :1] == (0, 1, 2)).all()
+
+def test_near():
+    s = SpatialHash(size=0.05)
+    s.attach(cells((0.01, 0.01, 0.01), (-0.02, 0.01, 0.01), (0.2, 0.0, 0.0)))
+    s.index()
+    qi, rows, diff, dist = s.near([(0.0, 0.0, 0.0)])
+    assert sorted(rows) == [0, 1]
+    assert np.allclose(dist, np.sqrt((diff ** 2).sum(axis=1)))
+
+def test_repel_other_branches():
+    s = SpatialHash(size=0.05, repulsion=0.02, grace=2)
+    s.attach(cells((0.0, 0.0, 0.0), (0.02, 0.0, 0.0), (0.0, 0.02, 0.0), (0.0, 0.0, 0.5)))
+    s.tip[:4] = (0, 1, 0, 1)
+    s.order[:4] = (2, 3, 5, 0)
+    s.index()
+    s.repel(np.arange(4))
+    nv = s.engine.nv
+    # rows 0 and 1 are of different branches and push each other apart along x, by repulsion * (1 - distance / size)
+    assert nv[0, 0] < 0.0 < nv[1, 0]
+    assert np.allclose(nv[0], (-0.02 * (1.0 - 0.02 / 0.05), 0.0, 0.0))
+    # row 2 is near both but of row 0's branch, so only row 1 pushes it
+    assert nv[2, 1] > 0.0 and nv[2, 0] < 0.0
+    # row 3 is far away and in its branch's grace slices
+    assert (nv[3] == 0.0).all()
+    # the same cells in one branch don't push each other
+    s.tip[:4] = 0
+    s.engine.nv[:] = 0.0
+    s.repel(np.arange(4))
+    assert (s.engine.nv == 0.0).all()
+
+def test_repel_external():
+    s = SpatialHash(size=0.05, repulsion=0.02)
+    s.attach(cells((0.0, 0.0, 0.0)))
+    s.set_external([(0.0, 0.0, 0.03)])
+    s.index()
+    s.repel(np.arange(1))
+    assert s.engine.nv[0, 2] < 0.0
+
+def tip(loc, direction):
+    return types.SimpleNamespace(age=5, loc=Vector(loc), direction=Vector(direction), can_grow=lambda: True)
+
+def test_tips_avoid_other_branches():
+    s = SpatialHash(size=0.05, avoid=0.5)
+    s.attach(cells((0.02, 0.02, 0.0), (0.02, -0.02, 0.0)))
+    s.tip[:2] = (1, 0)
+    s.order[:2] = 3
+    s.index()
+    t = tip((0.0, 0.0, 0.0), (1.0, 0.0, 0.0))
+    other = tip((1.0, 1.0, 1.0), (0.0, 0.0, 1.0))
+    s.steer(types.SimpleNamespace(tips=[t, other], active=[t]))
+    # turned away from the cell of the other branch (+y), not from its own cell (-y)
+    assert t.direction[1] < 0.0
+    assert t.direction[0] > 0.0
+
+def test_tips_avoid_external():
+    s = SpatialHash(size=0.05, avoid=0.5)
+    s.attach(cells((1.0, 1.0, 1.0)))
+    s.set_external([(0.02, 0.0, 0.02)])
+    s.index()
+    t = tip((0.0, 0.0, 0.0), (0.0, 0.0, 1.0))
+    s.steer(types.SimpleNamespace(tips=[t], active=[t]))
+    assert t.direction[0] < 0.0
+
+def test_tree_grows_with_spatial_hash():
+    t = Tree(spatial=SpatialHash(size=0.05))
+    t.plant(growth_steps=10)
+    n = t.engine.count
+    assert (t.spatial.tip[:n] >= 0).all()
+    # frozen rows are in the static index exactly once, in key order
+    keys, rows = t.spatial.static
+    assert (np.diff(keys) >= 0).all()
+    assert sorted(rows) == sorted(np.nonzero(t.spatial.settled[:n])[0])
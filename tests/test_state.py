@@ -0,0 +1,45 @@
+# GrowF: Grow Function
+# Original Author: Nathaniel D. Gibson
+
+import os
+
+import numpy as np
+import pytest
+
+from growf import Tree, Settling
+from growf.mesh import mesh_buffers
+
+MODES = [{}, {"engine": True}, {"compact": True}]
+
+def settled(mode, settle):
+    return Tree(settling=None if settle is None else Settling(max_age=settle), **mode)
+
+def same_mesh(a, b):
+    a, b = mesh_buffers(a), mesh_buffers(b)
+    return all(np.array_equal(getattr(a, k), getattr(b, k)) for k in ("verts", "quads", "face_colors", "vert_colors"))
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("settle", [None, 4])
+def test_snapshot_grows_on_the_same(tmp_path, mode, settle):
+    whole = settled(mode, settle)
+    whole.plant(growth_steps=16)
+    t = settled(mode, settle)
+    t.plant(growth_steps=7)
+    t.snapshot(str(tmp_path / "tree.gfs"))
+    back = settled(mode, settle)
+    back.restore(str(tmp_path / "tree.gfs"))
+    back.grow(steps=9)
+    assert back.age == whole.age
+    assert same_mesh(back, whole)
+    assert back.rng.getstate() == whole.rng.getstate()
+
+@pytest.mark.parametrize("mode", MODES)
+def test_checkpoint_resumes(tmp_path, mode):
+    path = str(tmp_path / "run.gfs")
+    whole = Tree(**mode)
+    whole.plant(growth_steps=16)
+    Tree(**mode).plant(growth_steps=6, checkpoint=path, every=3)     # interrupted after 6 steps
+    assert os.path.exists(path)
+    t = Tree(**mode)
+    t.plant(growth_steps=16, checkpoint=path, every=3)
+    assert same_mesh(t, whole)